@@ -1,6 +1,6 @@
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
-from .models import User
+from .models import RevokedToken, User
 
 
 @admin.register(User)
@@ -49,3 +49,11 @@ class UserAdmin(BaseUserAdmin):
     )
 
     readonly_fields = ("created_at", "updated_at")
+
+
+@admin.register(RevokedToken)
+class RevokedTokenAdmin(admin.ModelAdmin):
+    list_display = ("jti", "expires_at", "revoked_at")
+    search_fields = ("jti",)
+    ordering = ("-revoked_at",)
+    readonly_fields = ("jti", "expires_at", "revoked_at")
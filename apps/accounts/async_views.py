@@ -0,0 +1,71 @@
+from asgiref.sync import sync_to_async
+from django.contrib.auth import aauthenticate, alogin
+from django.contrib.auth.hashers import make_password
+from rest_framework import status
+from rest_framework.exceptions import ValidationError
+from rest_framework.serializers import as_serializer_error
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from apps.main.async_api import async_api_view, parse_body, render
+from apps.main.budgets import query_budget
+from . import serializers
+from .hashing import hashing_pool
+
+
+def _profile(user):
+    return serializers.UserProfileSerializer(user).data
+
+
+@query_budget(5)
+@async_api_view(["POST"])
+async def register_view(request):
+    """Register a new user, hashing the password in the hashing pool."""
+
+    serializer = serializers.UserRegistrationSerializer(data=parse_body(request))
+    await sync_to_async(serializer.is_valid)(raise_exception=True)
+    encoded_password = await hashing_pool.arun(
+        make_password, serializer.validated_data["password"]
+    )
+    user = await sync_to_async(serializer.save)(encoded_password=encoded_password)
+
+    refresh = RefreshToken.for_user(user)
+    return render(
+        {
+            "user": await sync_to_async(_profile)(user),
+            "refresh": str(refresh),
+            "access": str(refresh.access_token),
+            "message": "User registered successfully.",
+        },
+        status=status.HTTP_201_CREATED,
+    )
+
+
+@query_budget(8)
+@async_api_view(["POST"])
+async def login_view(request):
+    """Login a user, checking the password in the hashing pool."""
+
+    serializer = serializers.UserLoginSerializer(
+        data=parse_body(request), context={"request": request, "authenticate": False}
+    )
+    serializer.is_valid(raise_exception=True)
+    user = await aauthenticate(
+        request,
+        username=serializer.validated_data["email"],
+        password=serializer.validated_data["password"],
+    )
+    try:
+        user = serializer.check_user(user)
+    except ValidationError as exc:
+        raise ValidationError(as_serializer_error(exc))
+
+    await alogin(request, user)
+    refresh = RefreshToken.for_user(user)
+    return render(
+        {
+            "user": await sync_to_async(_profile)(user),
+            "refresh": str(refresh),
+            "access": str(refresh.access_token),
+            "message": "User login successfully.",
+        }
+    )
@@ -0,0 +1,43 @@
+from django.core.files.storage import default_storage
+
+from apps.main.images import delete_variants, render_variants
+from .authentication import invalidate_user
+
+AVATAR_SIZES = {
+    "small": (48, 48),
+    "medium": (96, 96),
+    "large": (192, 192),
+}
+AVATAR_DEFAULT_SIZE = "medium"
+
+
+def generate_avatar_variants(user_id):
+    """Render square avatar sizes and store their names on the user"""
+
+    from .models import User
+
+    user = User.objects.filter(pk=user_id).only("avatar", "avatar_variants").first()
+    if user is None:
+        return
+    variants = (
+        render_variants(user.avatar, AVATAR_SIZES, square=True) if user.avatar else {}
+    )
+    updated = User.objects.filter(pk=user_id, avatar=user.avatar.name).update(
+        avatar_variants=variants
+    )
+    if updated:
+        # update() sends no post_save, cached request users would keep
+        # pointing at the old variants
+        invalidate_user(user_id)
+        delete_variants(user.avatar_variants, keep=variants)
+    else:
+        delete_variants(variants)
+
+
+def avatar_url(user):
+    """Normalized avatar url, the original upload until variants exist"""
+
+    variant = user.avatar_variants.get(AVATAR_DEFAULT_SIZE)
+    if variant:
+        return default_storage.url(variant["jpeg"])
+    return user.avatar.url if user.avatar else None
@@ -0,0 +1,37 @@
+from django.contrib.auth import backends, get_user_model
+from django.contrib.auth.hashers import make_password, verify_password
+
+from .hashing import hashing_pool
+
+UserModel = get_user_model()
+
+
+class ModelBackend(backends.ModelBackend):
+    """ModelBackend whose async path hashes in the hashing pool.
+
+    Django's own ``aauthenticate`` verifies passwords on the event loop;
+    here the user is looked up with the async ORM and only the hashing is
+    handed to the pool.
+    """
+
+    async def aauthenticate(self, request, username=None, password=None, **kwargs):
+        if username is None:
+            username = kwargs.get(UserModel.USERNAME_FIELD)
+        if username is None or password is None:
+            return None
+        try:
+            user = await UserModel._default_manager.aget_by_natural_key(username)
+        except UserModel.DoesNotExist:
+            # Hash anyway so unknown and known users take as long (#20760).
+            await hashing_pool.arun(make_password, password)
+            return None
+
+        is_correct, must_update = await hashing_pool.arun(
+            verify_password, password, user.password
+        )
+        if not is_correct:
+            return None
+        if must_update:
+            user.password = await hashing_pool.arun(make_password, password)
+            await user.asave(update_fields=["password"])
+        return user if self.user_can_authenticate(user) else None
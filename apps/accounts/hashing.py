@@ -0,0 +1,132 @@
+import asyncio
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth import hashers
+from rest_framework import status
+from rest_framework.exceptions import APIException
+
+logger = logging.getLogger(__name__)
+
+
+class HashingBusy(APIException):
+    status_code = status.HTTP_503_SERVICE_UNAVAILABLE
+    default_detail = "Too many password checks in progress, try again shortly."
+    default_code = "hashing_busy"
+    wait = 1
+
+
+class HashingPool:
+    """Bounded thread pool for password hashing.
+
+    At most ``workers`` hashes run at once and ``queue_size`` wait; further
+    jobs are rejected with HashingBusy (503) instead of piling up behind a
+    login storm. PBKDF2 releases the GIL, so the workers hash in parallel
+    while request threads and the event loop stay free. Jobs submitted from
+    inside a worker run inline.
+    """
+
+    def __init__(self, workers, queue_size):
+        self.workers = workers
+        self.queue_size = queue_size
+        self._slots = threading.BoundedSemaphore(workers + queue_size)
+        self._executor = ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="hashing"
+        )
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._in_flight = 0
+        self._rejected = 0
+        self._timings = {}
+
+    def submit(self, func, *args):
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self._rejected += 1
+            logger.warning(
+                "Password hashing queue is full, rejecting %s", func.__name__
+            )
+            raise HashingBusy()
+        with self._lock:
+            self._in_flight += 1
+        try:
+            return self._executor.submit(self._run, time.perf_counter(), func, *args)
+        except BaseException:
+            self._release()
+            raise
+
+    def run(self, func, *args):
+        """Hash in the pool and wait for the result"""
+
+        if getattr(self._local, "active", False):
+            return func(*args)
+        return self.submit(func, *args).result()
+
+    async def arun(self, func, *args):
+        """Hash in the pool without blocking the event loop"""
+
+        return await asyncio.wrap_future(self.submit(func, *args))
+
+    def stats(self):
+        with self._lock:
+            operations = {
+                name: {
+                    "count": count,
+                    "avg_ms": round(total / count * 1000, 2),
+                    "max_ms": round(longest * 1000, 2),
+                    "avg_wait_ms": round(waited / count * 1000, 2),
+                }
+                for name, (count, total, longest, waited) in self._timings.items()
+            }
+            return {
+                "workers": self.workers,
+                "queue_size": self.queue_size,
+                "in_flight": self._in_flight,
+                "rejected": self._rejected,
+                "operations": operations,
+            }
+
+    def _run(self, queued_at, func, *args):
+        started = time.perf_counter()
+        self._local.active = True
+        try:
+            return func(*args)
+        finally:
+            self._local.active = False
+            self._release()
+            self._record(
+                func.__name__, time.perf_counter() - started, started - queued_at
+            )
+
+    def _release(self):
+        with self._lock:
+            self._in_flight -= 1
+        self._slots.release()
+
+    def _record(self, name, duration, waited):
+        with self._lock:
+            count, total, longest, total_waited = self._timings.get(name, (0, 0, 0, 0))
+            self._timings[name] = (
+                count + 1,
+                total + duration,
+                max(longest, duration),
+                total_waited + waited,
+            )
+
+
+hashing_pool = HashingPool(settings.HASHING_WORKERS, settings.HASHING_QUEUE_SIZE)
+
+
+class PBKDF2PasswordHasher(hashers.PBKDF2PasswordHasher):
+    """PBKDF2 hasher that computes digests in the hashing pool.
+
+    Keeps the ``pbkdf2_sha256`` algorithm name, so existing hashes verify
+    unchanged; every sync caller (authenticate, create_user, set_password)
+    goes through the pool's concurrency limit.
+    """
+
+    def encode(self, password, salt, iterations=None):
+        return hashing_pool.run(super().encode, password, salt, iterations)
@@ -0,0 +1,11 @@
+from django.core.management.base import BaseCommand
+
+from apps.accounts.revocation import revoked_tokens
+
+
+class Command(BaseCommand):
+    help = "Delete revoked refresh tokens that have already expired."
+
+    def handle(self, *args, **options):
+        deleted = revoked_tokens.prune()
+        self.stdout.write(self.style.SUCCESS(f"Pruned {deleted} revoked tokens."))
@@ -0,0 +1,158 @@
+import hashlib
+import math
+import threading
+import time
+from datetime import datetime, timezone as dt_timezone
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import IntegrityError, transaction
+from django.utils import timezone
+from rest_framework_simplejwt.settings import api_settings
+
+from .models import RevokedToken
+
+
+class BloomFilter:
+    """Bloom filter over strings sized for a capacity and false positive rate"""
+
+    def __init__(self, capacity, error_rate):
+        self.capacity = max(capacity, 1)
+        self.size = max(
+            64, math.ceil(-self.capacity * math.log(error_rate) / math.log(2) ** 2)
+        )
+        self.hashes = max(1, round(self.size / self.capacity * math.log(2)))
+        self.bits = bytearray((self.size + 7) // 8)
+        self.count = 0
+
+    def _positions(self, value):
+        digest = hashlib.blake2b(value.encode(), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], "little")
+        step = int.from_bytes(digest[8:], "little") | 1
+        return ((first + i * step) % self.size for i in range(self.hashes))
+
+    def add(self, value):
+        for position in self._positions(value):
+            self.bits[position >> 3] |= 1 << (position & 7)
+        self.count += 1
+
+    def __contains__(self, value):
+        return all(
+            self.bits[position >> 3] & (1 << (position & 7))
+            for position in self._positions(value)
+        )
+
+
+class RevocationStore:
+    """Revoked refresh tokens keyed by ``jti``.
+
+    Revocations are written to the RevokedToken table and to an exact cache
+    key that lives until the token expires. Lookups try the cache key, then
+    an in-process Bloom filter of every revoked jti, and only query the
+    table when the filter reports a possible hit, so the common "not
+    revoked" answer costs no query however large the table grows.
+
+    The filter picks up rows added by other processes every
+    REVOKED_TOKENS_SYNC_INTERVAL seconds and is rebuilt from scratch every
+    REVOKED_TOKENS_REBUILD_INTERVAL seconds (or once it outgrows its
+    capacity), deleting expired rows first.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._filter = None
+        self._last_id = 0
+        self._synced_at = 0.0
+        self._built_at = 0.0
+
+    @staticmethod
+    def cache_key(jti):
+        return f"auth:revoked:{jti}"
+
+    def revoke(self, token):
+        """Revoke a token, False if it was already revoked.
+
+        The unique jti makes this a claim: of concurrent revocations of one
+        token exactly one returns True.
+        """
+
+        jti = token[api_settings.JTI_CLAIM]
+        expires_at = datetime.fromtimestamp(token["exp"], tz=dt_timezone.utc)
+        try:
+            with transaction.atomic():
+                RevokedToken.objects.create(jti=jti, expires_at=expires_at)
+            revoked = True
+        except IntegrityError:
+            revoked = False
+        cache.set(self.cache_key(jti), True, max(1, int(token["exp"] - time.time())))
+        with self._lock:
+            if self._filter is not None:
+                self._filter.add(jti)
+        return revoked
+
+    def is_revoked(self, jti):
+        if cache.get(self.cache_key(jti)):
+            return True
+        self._refresh()
+        if jti not in self._filter:
+            return False
+        expires_at = (
+            RevokedToken.objects.filter(jti=jti, expires_at__gt=timezone.now())
+            .values_list("expires_at", flat=True)
+            .first()
+        )
+        if expires_at is None:
+            return False
+        timeout = max(1, int((expires_at - timezone.now()).total_seconds()))
+        cache.set(self.cache_key(jti), True, timeout)
+        return True
+
+    def prune(self):
+        """Delete revocations of tokens that have expired anyway"""
+
+        deleted, _ = RevokedToken.objects.filter(
+            expires_at__lte=timezone.now()
+        ).delete()
+        return deleted
+
+    def _refresh(self):
+        now = time.monotonic()
+        if (
+            self._filter is not None
+            and now - self._synced_at < settings.REVOKED_TOKENS_SYNC_INTERVAL
+        ):
+            return
+        with self._lock:
+            if (
+                self._filter is None
+                or now - self._built_at >= settings.REVOKED_TOKENS_REBUILD_INTERVAL
+                or self._filter.count > self._filter.capacity
+            ):
+                self._rebuild()
+                self._built_at = now
+            elif now - self._synced_at >= settings.REVOKED_TOKENS_SYNC_INTERVAL:
+                self._sync(self._filter)
+            self._synced_at = now
+
+    def _rebuild(self):
+        self.prune()
+        capacity = max(
+            settings.REVOKED_TOKENS_CAPACITY, 2 * RevokedToken.objects.count()
+        )
+        bloom = BloomFilter(capacity, settings.REVOKED_TOKENS_ERROR_RATE)
+        self._last_id = 0
+        self._sync(bloom)
+        self._filter = bloom
+
+    def _sync(self, bloom):
+        rows = (
+            RevokedToken.objects.filter(pk__gt=self._last_id)
+            .order_by("pk")
+            .values_list("pk", "jti")
+        )
+        for pk, jti in rows.iterator(chunk_size=5000):
+            bloom.add(jti)
+            self._last_id = pk
+
+
+revoked_tokens = RevocationStore()
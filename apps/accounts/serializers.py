@@ -1,11 +1,32 @@
 from rest_framework import serializers
 from django.contrib.auth import get_user_model, authenticate
 from django.contrib.auth.password_validation import validate_password
+from rest_framework_simplejwt import serializers as jwt_serializers
+from rest_framework_simplejwt.exceptions import InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+from apps.main.images import ImageVariantsField
+from .avatars import avatar_url
+from .revocation import revoked_tokens
 
 
 User = get_user_model()
 
 
+def author_info(user, context=None):
+    """Author summary, built once per user within a serializer context"""
+
+    memo = context.setdefault("author_info", {}) if context is not None else {}
+    info = memo.get(user.pk)
+    if info is None:
+        info = memo[user.pk] = {
+            "id": user.id,
+            "username": user.username,
+            "full_name": user.full_name,
+            "avatar": avatar_url(user),
+        }
+    return info
+
+
 class UserRegistrationSerializer(serializers.ModelSerializer):
     """User registration serializer"""
 
@@ -32,7 +53,17 @@ class UserRegistrationSerializer(serializers.ModelSerializer):
 
     def create(self, validated_data):
         validated_data.pop('password_confirm')
-        user = User.objects.create_user(**validated_data)
+        password = validated_data.pop("password")
+        # The async register view hashes ahead of time, off the event loop
+        encoded_password = validated_data.pop("encoded_password", None)
+        user = User(**validated_data)
+        user.username = User.normalize_username(user.username)
+        user.email = User.objects.normalize_email(user.email)
+        if encoded_password is None:
+            user.set_password(password)
+        else:
+            user.password = encoded_password
+        user.save()
         return user
 
 
@@ -46,29 +77,35 @@ class UserLoginSerializer(serializers.Serializer):
         email = attrs.get("email")
         password = attrs.get("password")
         if email and password:
-            user = authenticate(
-                request=self.context.get("request"),
-                username=email,
-                password=password
-            )
-            if not user:
-                raise serializers.ValidationError({"message": "User not found."})
-            if not user.is_active:
-                raise serializers.ValidationError(
-                    {"message": "User account is disabled."}
+            # The async login view authenticates itself after validation
+            if self.context.get("authenticate", True):
+                user = authenticate(
+                    request=self.context.get("request"),
+                    username=email,
+                    password=password
                 )
-            attrs["user"] = user
+                attrs["user"] = self.check_user(user)
             return attrs
         else:
             raise serializers.ValidationError(
                 {"message": "Must provide email and password."}
             )
 
+    def check_user(self, user):
+        if not user:
+            raise serializers.ValidationError({"message": "User not found."})
+        if not user.is_active:
+            raise serializers.ValidationError(
+                {"message": "User account is disabled."}
+            )
+        return user
+
 
 class UserProfileSerializer(serializers.ModelSerializer):
     """User profile serializer"""
 
     full_name = serializers.ReadOnlyField()
+    avatar_variants = ImageVariantsField()
     posts_count = serializers.SerializerMethodField()
     comments_count = serializers.SerializerMethodField()
 
@@ -82,6 +119,7 @@ class UserProfileSerializer(serializers.ModelSerializer):
             "last_name",
             "full_name",
             "avatar",
+            "avatar_variants",
             "bio",
             "created_at",
             "updated_at",
@@ -146,4 +184,20 @@ class ChangePasswordSerializer(serializers.Serializer):
         user = self.context["request"].user
         user.set_password(self.validated_data["new_password"])
         user.save()
-        return user
\ No newline at end of file
+        return user
+
+
+class TokenRefreshSerializer(jwt_serializers.TokenRefreshSerializer):
+    """Token refresh checked against and recorded in the revocation store"""
+
+    def validate(self, attrs):
+        refresh = self.token_class(attrs["refresh"])
+        if revoked_tokens.is_revoked(refresh[api_settings.JTI_CLAIM]):
+            raise InvalidToken("Token is blacklisted")
+        data = super().validate(attrs)
+        if api_settings.ROTATE_REFRESH_TOKENS and api_settings.BLACKLIST_AFTER_ROTATION:
+            # Concurrent refreshes can all pass the check above, only the
+            # one whose revocation is recorded gets the new tokens
+            if not revoked_tokens.revoke(refresh):
+                raise InvalidToken("Token is blacklisted")
+        return data
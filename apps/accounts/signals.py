@@ -0,0 +1,30 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from apps.main.images import variant_pool
+from .authentication import invalidate_user
+from .avatars import generate_avatar_variants
+from .models import User
+
+
+@receiver(post_save, sender=User)
+def schedule_avatar_variants(sender, instance, using, update_fields=None, **kwargs):
+    if update_fields is not None and "avatar" not in update_fields:
+        return
+    if (instance.avatar.name or None) == (
+        getattr(instance, "_loaded_avatar", None) or None
+    ):
+        return
+    instance._loaded_avatar = instance.avatar.name
+    transaction.on_commit(
+        lambda: variant_pool.submit(generate_avatar_variants, instance.pk),
+        using=using,
+    )
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_cached_user(sender, instance, using, **kwargs):
+    invalidate_user(instance.pk)
+    transaction.on_commit(lambda: invalidate_user(instance.pk), using=using)
@@ -1,3 +1,143 @@
-from django.test import TestCase
+import tempfile
+from io import BytesIO
+from unittest import mock
 
-# Create your tests here.
+from django.core.cache import cache
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import connection
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from PIL import Image
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from apps.main.tests import authenticate, create_user
+from .authentication import user_cache_key
+from .avatars import (
+    AVATAR_DEFAULT_SIZE,
+    AVATAR_SIZES,
+    avatar_url,
+    generate_avatar_variants,
+)
+from .hashing import HashingBusy, hashing_pool
+from .models import User
+from .revocation import revoked_tokens
+from .serializers import author_info
+
+
+class TokenRefreshTests(TestCase):
+    def setUp(self):
+        self.refresh = RefreshToken.for_user(create_user("reader"))
+
+    def test_revoke_claims_a_token_once(self):
+        self.assertTrue(revoked_tokens.revoke(self.refresh))
+        self.assertFalse(revoked_tokens.revoke(self.refresh))
+
+    def test_concurrent_refresh_of_one_token_is_rejected(self):
+        url = reverse("token_refresh")
+        # Both requests pass the revocation check, as when they race
+        with mock.patch.object(revoked_tokens, "is_revoked", return_value=False):
+            first = self.client.post(url, {"refresh": str(self.refresh)})
+            second = self.client.post(url, {"refresh": str(self.refresh)})
+        self.assertEqual(first.status_code, 200)
+        self.assertEqual(second.status_code, 401)
+
+
+class HashingPoolTests(TestCase):
+    def test_busy_pool_is_unavailable_outside_drf(self):
+        create_user("admin", is_staff=True)
+        with mock.patch.object(hashing_pool, "run", side_effect=HashingBusy):
+            response = self.client.post(
+                reverse("admin:login"),
+                {"username": "admin", "password": "password-123"},
+            )
+        self.assertEqual(response.status_code, 503)
+        self.assertEqual(response["Retry-After"], "1")
+
+    def test_login_hashes_in_the_pool_and_is_unavailable_when_full(self):
+        create_user("hasher")
+        url = reverse("login")
+        data = {"email": "hasher@example.com", "password": "password-123"}
+        before = sum(
+            operation["count"]
+            for operation in hashing_pool.stats()["operations"].values()
+        )
+        self.assertEqual(self.client.post(url, data).status_code, 200)
+        after = hashing_pool.stats()
+        self.assertGreater(
+            sum(operation["count"] for operation in after["operations"].values()),
+            before,
+        )
+        self.assertEqual(after["in_flight"], 0)
+
+        with mock.patch.object(hashing_pool, "submit", side_effect=HashingBusy):
+            response = self.client.post(url, data)
+        self.assertEqual(response.status_code, 503)
+
+
+class AvatarTests(TestCase):
+    def setUp(self):
+        media = tempfile.TemporaryDirectory()
+        self.addCleanup(media.cleanup)
+        self.enterContext(override_settings(MEDIA_ROOT=media.name))
+
+    def test_avatar_is_square_and_served_from_the_default_size(self):
+        user = create_user("reader", first_name="Ann", last_name="Lee")
+        buffer = BytesIO()
+        Image.new("RGB", (300, 200), "blue").save(buffer, "PNG")
+        user.avatar.save("reader.png", ContentFile(buffer.getvalue()), save=False)
+        User.objects.filter(pk=user.pk).update(avatar=user.avatar.name)
+        self.assertEqual(avatar_url(user), user.avatar.url)
+
+        generate_avatar_variants(user.pk)
+        user.refresh_from_db()
+        medium = user.avatar_variants[AVATAR_DEFAULT_SIZE]["jpeg"]
+        with default_storage.open(medium) as image:
+            self.assertEqual(Image.open(image).size, AVATAR_SIZES[AVATAR_DEFAULT_SIZE])
+
+        context = {}
+        info = author_info(user, context)
+        self.assertEqual(
+            info,
+            {
+                "id": user.pk,
+                "username": "reader",
+                "full_name": "Ann Lee",
+                "avatar": default_storage.url(medium),
+            },
+        )
+        self.assertIs(author_info(user, context), info)
+
+    def test_new_variants_invalidate_the_cached_user(self):
+        user = create_user("reader")
+        user.avatar.save("reader.png", ContentFile(b""), save=False)
+        User.objects.filter(pk=user.pk).update(avatar=user.avatar.name)
+        key = user_cache_key(user.pk)
+        with mock.patch("apps.accounts.avatars.render_variants", return_value={}):
+            generate_avatar_variants(user.pk)
+        self.assertNotEqual(user_cache_key(user.pk), key)
+
+
+class CachedJWTAuthenticationTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = create_user("reader")
+        authenticate(self.client, self.user)
+
+    def profile(self):
+        return self.client.get(reverse("profile"))
+
+    def test_user_is_cached_until_saved(self):
+        self.assertEqual(self.profile().json()["username"], "reader")
+        with CaptureQueriesContext(connection) as captured:
+            self.assertEqual(self.profile().status_code, 200)
+        self.assertFalse(any('FROM "users"' in query["sql"] for query in captured))
+
+        self.user.first_name = "Ann"
+        self.user.save()
+        self.assertEqual(self.profile().json()["first_name"], "Ann")
+
+        self.user.is_active = False
+        self.user.save()
+        self.assertEqual(self.profile().status_code, 401)
@@ -1,12 +1,26 @@
+from django.conf import settings
 from django.urls import path
 from rest_framework_simplejwt.views import TokenRefreshView
-from . import views
+from apps.main.budgets import query_budget
+from . import async_views, views
+
+if settings.ASYNC_VIEWS:
+    register_view = async_views.register_view
+    login_view = async_views.login_view
+else:
+    register_view = views.RegisterView.as_view()
+    login_view = views.LoginView.as_view()
 
 urlpatterns = [
-    path("register/", views.RegisterView.as_view(), name="register"),
-    path("login/", views.LoginView.as_view(), name="login"),
+    path("register/", register_view, name="register"),
+    path("login/", login_view, name="login"),
     path("logout/", views.logout_view, name="logout"),
     path("profile/", views.ProfileView.as_view(), name="profile"),
     path("change-password/", views.ChangePasswordView.as_view(), name="change_password"),
-    path("token/refresh/", TokenRefreshView.as_view(), name="token_refresh"),
+    path(
+        "token/refresh/",
+        query_budget(5)(TokenRefreshView.as_view()),
+        name="token_refresh",
+    ),
+    path("hashing-stats/", views.hashing_stats, name="hashing_stats"),
 ]
\ No newline at end of file
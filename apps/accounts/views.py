@@ -3,13 +3,17 @@ from rest_framework.decorators import api_view, permission_classes
 from rest_framework.response import Response
 from rest_framework_simplejwt.tokens import RefreshToken
 from django.contrib.auth import login, logout
+from apps.main.budgets import query_budget
+from .hashing import hashing_pool
 from .models import User
 from . import serializers
+from .revocation import revoked_tokens
 
 
 class RegisterView(generics.CreateAPIView):
     """Register a new user."""
 
+    query_budget = 5
     queryset = User.objects.all()
     serializer_class = serializers.UserRegistrationSerializer
     permission_classes = (permissions.AllowAny,)
@@ -32,6 +36,7 @@ class RegisterView(generics.CreateAPIView):
 class LoginView(generics.GenericAPIView):
     """Login a user."""
 
+    query_budget = 8
     serializer_class = serializers.UserLoginSerializer
     permission_classes = (permissions.AllowAny,)
 
@@ -54,6 +59,7 @@ class LoginView(generics.GenericAPIView):
 class ProfileView(generics.RetrieveUpdateAPIView):
     """Profile view and update."""
 
+    query_budget = 3
     serializer_class = serializers.UserProfileSerializer
     permission_classes = (permissions.IsAuthenticated,)
 
@@ -69,6 +75,7 @@ class ProfileView(generics.RetrieveUpdateAPIView):
 class ChangePasswordView(generics.UpdateAPIView):
     """Password change view."""
 
+    query_budget = 2
     serializer_class = serializers.ChangePasswordSerializer
     permission_classes = (permissions.IsAuthenticated,)
 
@@ -85,6 +92,7 @@ class ChangePasswordView(generics.UpdateAPIView):
 
 
 
+@query_budget(2)
 @api_view(["POST"])
 @permission_classes([permissions.IsAuthenticated])
 def logout_view(request):
@@ -93,12 +101,20 @@ def logout_view(request):
     try:
         refresh_token = request.data.get("refresh_token")
         if refresh_token:
-            token = RefreshToken(refresh_token)
-            token.blacklist()
+            revoked_tokens.revoke(RefreshToken(refresh_token))
         return Response({
             "message": "User logout successfully."
         }, status=status.HTTP_200_OK)
     except Exception:
         return Response({
             "message": "Invalid token."
-        }, status=status.HTTP_400_BAD_REQUEST)
\ No newline at end of file
+        }, status=status.HTTP_400_BAD_REQUEST)
+
+
+@query_budget(1)
+@api_view(["GET"])
+@permission_classes([permissions.IsAdminUser])
+def hashing_stats(request):
+    """Password hashing pool load and timings."""
+
+    return Response(hashing_pool.stats())
@@ -1,5 +1,6 @@
 from django.contrib import admin
 from django.utils.html import format_html
+from .counters import set_active
 from .models import Comment
 
 
@@ -16,13 +17,13 @@ class CommentAdmin(admin.ModelAdmin):
     )
     list_filter = ("is_active", "created_at", "updated_at")
     search_fields = ("content", "author__username", "post__title")
-    readonly_fields = ("created_at", "updated_at")
+    readonly_fields = ("replies_count", "created_at", "updated_at")
     raw_id_fields = ("author", "post", "parent")
     list_editable = ("is_active",)
 
     fieldsets = (
         (None, {"fields": ("post", "author", "parent", "content")}),
-        ("Status", {"fields": ("is_active",)}),
+        ("Status", {"fields": ("is_active", "replies_count")}),
         (
             "Timestamps",
             {"fields": ("created_at", "updated_at"), "classes": ("collapse",)},
@@ -52,13 +53,13 @@ class CommentAdmin(admin.ModelAdmin):
     actions = ["make_active", "make_inactive"]
 
     def make_active(self, request, queryset):
-        updated = queryset.update(is_active=True)
+        updated = set_active(queryset, True)
         self.message_user(request, f"{updated} comments were marked as active.")
 
     make_active.short_description = "Mark selected comments as active"
 
     def make_inactive(self, request, queryset):
-        updated = queryset.update(is_active=False)
+        updated = set_active(queryset, False)
         self.message_user(request, f"{updated} comments were marked as inactive.")
 
     make_inactive.short_description = "Mark selected comments as inactive"
@@ -0,0 +1,60 @@
+from django.shortcuts import aget_object_or_404
+
+from apps.main.async_api import async_api_view, render
+from apps.main.budgets import query_budget
+from apps.main.models import Post
+from . import models
+from . import serializers
+
+
+@query_budget(3)
+@async_api_view(["GET"])
+async def post_comments(request, post_id):
+    post = await aget_object_or_404(Post, id=post_id, status="published")
+    comments = (
+        models.Comment.objects.filter(post=post, parent=None, is_active=True)
+        .select_related("author")
+        .order_by("-created_at")
+    )
+    serializer = serializers.CommentSerializer(
+        [comment async for comment in comments],
+        many=True,
+        context={"request": request},
+    )
+    return render(
+        {
+            "post": {
+                "id": post.id,
+                "title": post.title,
+                "slug": post.slug,
+            },
+            "comments": serializer.data,
+            "comments_count": post.comments_count,
+        }
+    )
+
+
+@query_budget(4)
+@async_api_view(["GET"])
+async def comment_replies(request, comment_id):
+    parent_comment = await aget_object_or_404(
+        models.Comment.objects.select_related("author"), id=comment_id, is_active=True
+    )
+    replies = (
+        models.Comment.objects.filter(parent=parent_comment, is_active=True)
+        .select_related("author")
+        .order_by("created_at")
+    )
+    context = {"request": request}
+    serializer = serializers.CommentSerializer(
+        [reply async for reply in replies], many=True, context=context
+    )
+    return render(
+        {
+            "parent_comment": serializers.CommentSerializer(
+                parent_comment, context=context
+            ).data,
+            "replies": serializer.data,
+            "replies_count": parent_comment.replies_count,
+        }
+    )
@@ -0,0 +1,227 @@
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.db import transaction
+from django.db.models import (
+    Case,
+    Count,
+    Exists,
+    F,
+    OuterRef,
+    Subquery,
+    Value,
+    When,
+)
+from django.db.models.functions import Coalesce, Greatest, Length, Substr
+from django.utils import timezone
+
+from apps.main.models import Post
+from .models import Comment
+from .search import comments_index
+
+
+def _apply(model, field, counts, chunk_size=500):
+    """Shift field by counts[pk] with one CASE update per chunk_size rows"""
+
+    counts = [
+        (pk, amount) for pk, amount in counts.items() if pk is not None and amount
+    ]
+    for start in range(0, len(counts), chunk_size):
+        chunk = dict(counts[start : start + chunk_size])
+        shift = Case(
+            *(When(pk=pk, then=Value(amount)) for pk, amount in chunk.items()),
+            default=Value(0),
+        )
+        model.objects.filter(pk__in=chunk).update(
+            **{field: Greatest(F(field) + shift, Value(0))}
+        )
+
+
+def adjust_counters(rows, delta):
+    """Shift post and parent counters for (post_id, parent_id) rows by delta"""
+
+    posts = Counter()
+    parents = Counter()
+    for post_id, parent_id in rows:
+        posts[post_id] += delta
+        parents[parent_id] += delta
+    _apply(Post, "comments_count", posts)
+    _apply(Comment, "replies_count", parents)
+
+
+def with_replies(queryset):
+    """Comments of queryset together with all of their descendant replies.
+
+    Descendants share the ancestor's materialized path as a prefix, so the
+    whole subtree is matched by one correlated EXISTS on (post, path).
+    """
+
+    roots = queryset.order_by()
+    ancestors = (
+        roots.filter(post_id=OuterRef("post_id"), path__gt="")
+        .annotate(prefix=Substr(OuterRef("path"), 1, Length("path")))
+        .filter(prefix=F("path"))
+    )
+    return Comment.objects.filter(post_id__in=roots.values("post_id")).filter(
+        Exists(ancestors)
+    )
+
+
+def set_active(queryset, is_active, cascade=None):
+    """Bulk (de)activate comments keeping counters in step, returns rows changed.
+
+    With ``cascade`` the replies of every comment are switched as well; it
+    defaults to deactivation only, so that activating a comment does not
+    bring back replies that were removed on their own. The rows are changed
+    with a single UPDATE, which also bumps ``updated_at``, and the counter
+    deltas are read per post and per parent beforehand, all in one
+    transaction.
+    """
+
+    if cascade is None:
+        cascade = not is_active
+    if cascade:
+        scope = with_replies(queryset)
+    else:
+        scope = Comment.objects.filter(pk__in=queryset.order_by().values("pk"))
+    changed = scope.exclude(is_active=is_active).order_by()
+    delta = 1 if is_active else -1
+
+    with transaction.atomic():
+        posts = {
+            post_id: total * delta
+            for post_id, total in changed.values("post_id")
+            .annotate(total=Count("pk"))
+            .values_list("post_id", "total")
+        }
+        parents = {
+            parent_id: total * delta
+            for parent_id, total in changed.exclude(parent=None)
+            .values("parent_id")
+            .annotate(total=Count("pk"))
+            .values_list("parent_id", "total")
+        }
+        updated = changed.update(is_active=is_active, updated_at=timezone.now())
+        _apply(Post, "comments_count", posts)
+        _apply(Comment, "replies_count", parents)
+    return updated
+
+
+_deleted = ContextVar("deleted_comments", default=None)
+
+
+def deleted_in_batch(instance, using):
+    """Queue a deleted comment on the enclosing batch_deletes(), if any.
+
+    Returns False outside a batch, where the post_delete receivers update
+    counters and the search index for the comment themselves. Every
+    receiver may queue the same comment, the batch settles it once.
+    """
+
+    batch = _deleted.get()
+    if batch is None:
+        return False
+    batch[using, instance.pk] = instance
+    return True
+
+
+@contextmanager
+def batch_deletes():
+    """Defer the post_delete receiver work of comments deleted in the block.
+
+    The collector sends post_delete once per comment, so deleting a post
+    with many comments would run one counter update and one index delete
+    each. Inside the block the receivers queue the comment instead and on
+    a clean exit the queue is settled with one update per counter table
+    and one index delete per database.
+    """
+
+    if _deleted.get() is not None:
+        yield
+        return
+    batch = {}
+    token = _deleted.set(batch)
+    try:
+        yield
+    finally:
+        _deleted.reset(token)
+    adjust_counters(
+        [
+            (comment.post_id, comment.parent_id)
+            for comment in batch.values()
+            if getattr(comment, "_loaded_is_active", comment.is_active)
+        ],
+        -1,
+    )
+    databases = {}
+    for using, pk in batch:
+        databases.setdefault(using, []).append(pk)
+    for using, pks in databases.items():
+        comments_index.remove(pks, using=using)
+
+
+def post_comments_subquery():
+    return Coalesce(
+        Subquery(
+            Comment.objects.filter(post=OuterRef("pk"), is_active=True)
+            .order_by()
+            .values("post")
+            .annotate(total=Count("pk"))
+            .values("total")
+        ),
+        0,
+    )
+
+
+def comment_replies_subquery():
+    return Coalesce(
+        Subquery(
+            Comment.objects.filter(parent=OuterRef("pk"), is_active=True)
+            .order_by()
+            .values("parent")
+            .annotate(total=Count("pk"))
+            .values("total")
+        ),
+        0,
+    )
+
+
+def _recount(queryset, field, actual, chunk_size):
+    fixed = 0
+    last_pk = 0
+    while True:
+        chunk = list(
+            queryset.filter(pk__gt=last_pk)
+            .order_by("pk")
+            .values_list("pk", flat=True)[:chunk_size]
+        )
+        if not chunk:
+            return fixed
+        last_pk = chunk[-1]
+        drifted = [
+            queryset.model(pk=pk, **{field: value})
+            for pk, value in queryset.filter(pk__in=chunk)
+            .annotate(actual=actual)
+            .exclude(**{field: F("actual")})
+            .values_list("pk", "actual")
+        ]
+        if drifted:
+            queryset.model.objects.bulk_update(drifted, [field])
+            fixed += len(drifted)
+
+
+def recount_posts(queryset=None, chunk_size=1000):
+    """Recompute drifted Post.comments_count values, returns rows fixed"""
+
+    if queryset is None:
+        queryset = Post.objects.all()
+    return _recount(queryset, "comments_count", post_comments_subquery(), chunk_size)
+
+
+def recount_comments(queryset=None, chunk_size=1000):
+    """Recompute drifted Comment.replies_count values, returns rows fixed"""
+
+    if queryset is None:
+        queryset = Comment.objects.all()
+    return _recount(queryset, "replies_count", comment_replies_subquery(), chunk_size)
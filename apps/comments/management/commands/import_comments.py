@@ -0,0 +1,131 @@
+from django.db.models import Q
+
+from apps.comments.counters import recount_comments, recount_posts
+from apps.comments.models import MAX_DEPTH, Comment
+from apps.comments.search import comments_index
+from apps.main.cache import invalidate_posts
+from apps.main.importing import (
+    ImportCommand,
+    RowError,
+    as_bool,
+    as_int,
+    keep_timestamps,
+    read_timestamps,
+    resolve_users,
+    value,
+)
+from apps.main.models import Post
+
+
+def resolve_posts(keys):
+    """Map post keys (id or slug) to ids in one query"""
+
+    keys = {str(key) for key in keys if key is not None}
+    if not keys:
+        return {}
+    ids = [int(key) for key in keys if key.isdigit()]
+    resolved = {}
+    posts = Post.objects.filter(Q(pk__in=ids) | Q(slug__in=keys))
+    for pk, slug in posts.values_list("pk", "slug"):
+        for key in (str(pk), slug):
+            if key in keys:
+                resolved[key] = pk
+    return resolved
+
+
+class Command(ImportCommand):
+    help = (
+        "Bulk import comments from JSONL or CSV. Columns: post (id or slug), "
+        "author (id, email or username), content, and optionally id, parent "
+        "(comment id, imported earlier in the file or already stored), "
+        "is_active, created_at and updated_at. Counters are recounted at the end."
+    )
+    model = Comment
+
+    def import_batch(self, rows):
+        authors = resolve_users(value(row, "author") for _, row in rows)
+        posts = resolve_posts(value(row, "post") for _, row in rows)
+        parent_ids = set()
+        for _, row in rows:
+            try:
+                parent_ids.add(as_int(value(row, "parent"), "parent"))
+            except RowError:
+                pass
+        # pk -> (post_id, path, depth) of stored parents
+        self.parents = {
+            pk: (post_id, path, depth)
+            for pk, post_id, path, depth in Comment.objects.filter(
+                pk__in=parent_ids - {None}
+            ).values_list("pk", "post_id", "path", "depth")
+        }
+        # pk -> (post_id, depth) of rows earlier in this batch with explicit ids
+        self.pending = {}
+
+        comments, errors = self.build_rows(
+            rows, lambda row: self.build_comment(row, authors, posts)
+        )
+        comments = Comment.objects.bulk_create(comments)
+
+        paths = {}
+        for comment in comments:
+            if comment.parent_id is None:
+                parent_path = ""
+            elif comment.parent_id in self.parents:
+                parent_path = self.parents[comment.parent_id][1]
+            else:
+                parent_path = paths[comment.parent_id]
+            comment.path = paths[comment.pk] = comment.build_path(parent_path)
+        if comments:
+            Comment.objects.bulk_update(comments, ["path"])
+        keep_timestamps(comments)
+        comments_index.update(comments)
+        return len(comments), errors
+
+    def finish(self):
+        recount_posts()
+        recount_comments()
+        invalidate_posts()
+
+    def build_comment(self, row, authors, posts):
+        author = value(row, "author")
+        if author is None:
+            raise RowError("author: This field is required.")
+        if str(author) not in authors:
+            raise RowError(f"author: Unknown user {author!r}.")
+        post = value(row, "post")
+        if post is None:
+            raise RowError("post: This field is required.")
+        if str(post) not in posts:
+            raise RowError(f"post: Unknown post {post!r}.")
+        post_id = posts[str(post)]
+
+        depth = 0
+        parent_id = as_int(value(row, "parent"), "parent")
+        if parent_id is not None:
+            if parent_id in self.parents:
+                parent_post_id, _, parent_depth = self.parents[parent_id]
+            elif parent_id in self.pending:
+                parent_post_id, parent_depth = self.pending[parent_id]
+            else:
+                raise RowError(f"parent: Unknown comment {parent_id}.")
+            if parent_post_id != post_id:
+                raise RowError("parent: Parent comment must belong to the same post.")
+            if parent_depth >= MAX_DEPTH:
+                raise RowError("parent: Maximum reply depth reached.")
+            depth = parent_depth + 1
+
+        comment = Comment(
+            pk=self.take_id(row),
+            post_id=post_id,
+            author_id=authors[str(author)],
+            parent_id=parent_id,
+            content=value(row, "content", ""),
+            is_active=as_bool(value(row, "is_active")),
+            depth=depth,
+        )
+        comment.clean_fields(exclude=["post", "author", "parent", "path"])
+        read_timestamps(comment, row)
+        # Only rows that will be created may become parents of later rows
+        if comment.pk is not None:
+            self.pending[comment.pk] = (post_id, depth)
+        return comment
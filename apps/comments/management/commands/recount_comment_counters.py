@@ -0,0 +1,25 @@
+from django.core.management.base import BaseCommand
+
+from apps.comments.counters import recount_comments, recount_posts
+
+
+class Command(BaseCommand):
+    help = "Recompute drifted Post.comments_count and Comment.replies_count values."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=1000,
+            help="Number of rows checked per query.",
+        )
+
+    def handle(self, *args, **options):
+        chunk_size = options["chunk_size"]
+        posts = recount_posts(chunk_size=chunk_size)
+        comments = recount_comments(chunk_size=chunk_size)
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Fixed {posts} post counters and {comments} comment counters."
+            )
+        )
@@ -0,0 +1,42 @@
+# Generated by Django 5.2.6 on 2026-10-18 02:54
+
+from django.db import migrations, models
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def backfill_counters(apps, schema_editor):
+    Comment = apps.get_model("comments", "Comment")
+    Post = apps.get_model("main", "Post")
+
+    def active_count(field):
+        return Coalesce(
+            Subquery(
+                Comment.objects.filter(**{field: OuterRef("pk"), "is_active": True})
+                .order_by()
+                .values(field)
+                .annotate(total=Count("pk"))
+                .values("total")
+            ),
+            0,
+        )
+
+    Post.objects.update(comments_count=active_count("post"))
+    Comment.objects.update(replies_count=active_count("parent"))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("comments", "0001_initial"),
+        ("main", "0002_comment_counters"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="comment",
+            name="replies_count",
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.RunPython(backfill_counters, migrations.RunPython.noop),
+    ]
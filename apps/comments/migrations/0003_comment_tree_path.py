@@ -0,0 +1,51 @@
+# Generated by Django 5.2.6 on 2026-10-18 02:57
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+def backfill_paths(apps, schema_editor):
+    Comment = apps.get_model("comments", "Comment")
+    level = Comment.objects.filter(parent__isnull=True)
+    depth = 0
+    while level.filter(path="").exists():
+        while True:
+            batch = list(level.filter(path="").select_related("parent")[:1000])
+            if not batch:
+                break
+            for comment in batch:
+                parent_path = comment.parent.path if comment.parent_id else ""
+                comment.path = f"{parent_path}{comment.pk:010d}/"
+                comment.depth = depth
+            Comment.objects.bulk_update(batch, ["path", "depth"])
+        depth += 1
+        level = Comment.objects.filter(parent__depth=depth - 1).exclude(parent__path="")
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("comments", "0002_comment_counters"),
+        ("main", "0002_comment_counters"),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="comment",
+            name="depth",
+            field=models.PositiveSmallIntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name="comment",
+            name="path",
+            field=models.CharField(blank=True, editable=False, max_length=990),
+        ),
+        migrations.AddIndex(
+            model_name="comment",
+            index=models.Index(
+                fields=["post", "path"], name="comments_post_id_5f9abc_idx"
+            ),
+        ),
+        migrations.RunPython(backfill_paths, migrations.RunPython.noop),
+    ]
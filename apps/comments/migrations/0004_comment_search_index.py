@@ -0,0 +1,24 @@
+from django.db import migrations
+
+
+def create_index(apps, schema_editor):
+    from apps.comments.search import comments_index
+
+    comments_index.create(schema_editor.connection)
+
+
+def drop_index(apps, schema_editor):
+    from apps.comments.search import comments_index
+
+    comments_index.drop(schema_editor.connection)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("comments", "0003_comment_tree_path"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_index, drop_index),
+    ]
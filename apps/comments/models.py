@@ -1,6 +1,10 @@
 from django.db import models
 from django.conf import settings
 
+PATH_SEGMENT_LENGTH = 10
+PATH_MAX_LENGTH = 990
+MAX_DEPTH = PATH_MAX_LENGTH // (PATH_SEGMENT_LENGTH + 1) - 1
+
 
 class Comment(models.Model):
     post = models.ForeignKey(
@@ -14,6 +18,9 @@ class Comment(models.Model):
     )
     content = models.TextField()
     is_active = models.BooleanField(default=True)
+    replies_count = models.PositiveIntegerField(default=0)
+    path = models.CharField(max_length=PATH_MAX_LENGTH, blank=True, editable=False)
+    depth = models.PositiveSmallIntegerField(default=0, editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
@@ -26,15 +33,27 @@ class Comment(models.Model):
             models.Index(fields=["post", "-created_at"]),
             models.Index(fields=["author", "-created_at"]),
             models.Index(fields=["parent", "-created_at"]),
+            models.Index(fields=["post", "path"]),
         ]
 
     def __str__(self):
         return f"Comment by {self.author.username} on {self.post.title}"
 
-    @property
-    def replies_count(self):
-        return self.replies.filter(is_active=True).count()
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_is_active = instance.__dict__.get("is_active")
+        return instance
 
     @property
     def is_reply(self):
-        return self.parent is not None
+        return self.parent_id is not None
+
+    @staticmethod
+    def path_segment(pk):
+        return f"{pk:0{PATH_SEGMENT_LENGTH}d}/"
+
+    def build_path(self, parent_path=""):
+        """Materialized path: zero padded ids of all ancestors and self"""
+
+        return parent_path + self.path_segment(self.pk)
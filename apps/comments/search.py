@@ -0,0 +1,3 @@
+from apps.main.search import SearchIndex
+
+comments_index = SearchIndex("comments.Comment", "comments_search", ("content",), (1,))
@@ -1,5 +1,6 @@
 from rest_framework import serializers
 from . import models
+from apps.accounts.serializers import author_info
 from apps.main.models import Post
 
 
@@ -23,12 +24,7 @@ class CommentSerializer(serializers.ModelSerializer):
         read_only_fields = ("author", "is_active")
 
     def get_author_info(self, obj):
-        return {
-            "id": obj.author.id,
-            "username": obj.author.username,
-            "full_name": obj.author.full_name,
-            "avatar": obj.author.avatar.url if obj.author.avatar else None,
-        }
+        return author_info(obj.author, self.context)
 
 
 class CommentCreateSerializer(serializers.ModelSerializer):
@@ -44,6 +40,8 @@ class CommentCreateSerializer(serializers.ModelSerializer):
 
     def validate_parent(self, value):
         if value:
+            if value.depth >= models.MAX_DEPTH:
+                raise serializers.ValidationError("Maximum reply depth reached.")
             post_data = self.initial_data.get("post")
             if post_data:
                 if value.post.id != int(post_data):
@@ -70,7 +68,44 @@ class CommentDetailSerializer(CommentSerializer):
         fields = CommentSerializer.Meta.fields + ("replies",)
 
     def get_replies(self, obj):
-        if obj.parent is None:
-            replies = obj.replies.filter(is_active=True).order_by("created_at")
+        if obj.parent_id is None:
+            replies = (
+                obj.replies.filter(is_active=True)
+                .select_related("author")
+                .order_by("created_at")
+            )
             return CommentSerializer(replies, many=True, context=self.context).data
         return []
+
+
+class CommentModerationSerializer(serializers.Serializer):
+    action = serializers.ChoiceField(choices=("deactivate", "activate"))
+    ids = serializers.ListField(
+        child=serializers.IntegerField(min_value=1),
+        required=False,
+        allow_empty=False,
+        max_length=1000,
+    )
+    author = serializers.IntegerField(required=False, min_value=1)
+    post = serializers.IntegerField(required=False, min_value=1)
+    # Defaults to cascading deactivations only, see set_active()
+    cascade = serializers.BooleanField(allow_null=True, default=None)
+
+    def validate(self, attrs):
+        if not {"ids", "author", "post"} & attrs.keys():
+            raise serializers.ValidationError(
+                "Provide ids, author or post to select comments."
+            )
+        return attrs
+
+    def get_queryset(self):
+        """Comments matching all of the given selectors"""
+
+        filters = {}
+        if "ids" in self.validated_data:
+            filters["pk__in"] = self.validated_data["ids"]
+        if "author" in self.validated_data:
+            filters["author_id"] = self.validated_data["author"]
+        if "post" in self.validated_data:
+            filters["post_id"] = self.validated_data["post"]
+        return models.Comment.objects.filter(**filters)
@@ -0,0 +1,57 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from apps.main.trending import record_activity
+from .counters import adjust_counters, deleted_in_batch
+from .models import Comment
+from .search import comments_index
+
+
+@receiver(post_save, sender=Comment)
+def set_tree_path(sender, instance, created, raw=False, **kwargs):
+    if raw or not created or instance.path:
+        return
+    parent = instance.parent if instance.parent_id else None
+    instance.path = instance.build_path(parent.path if parent else "")
+    instance.depth = parent.depth + 1 if parent else 0
+    Comment.objects.filter(pk=instance.pk).update(
+        path=instance.path, depth=instance.depth
+    )
+
+
+@receiver(post_save, sender=Comment)
+def update_counters_on_save(sender, instance, created, raw=False, **kwargs):
+    if raw:
+        return
+    was_active = False if created else getattr(instance, "_loaded_is_active", None)
+    if was_active is None:
+        was_active = instance.is_active
+    if instance.is_active != was_active:
+        adjust_counters(
+            [(instance.post_id, instance.parent_id)], 1 if instance.is_active else -1
+        )
+    if created and instance.is_active:
+        record_activity({instance.post_id: 1}, "comments")
+    instance._loaded_is_active = instance.is_active
+
+
+@receiver(post_delete, sender=Comment)
+def update_counters_on_delete(sender, instance, using, **kwargs):
+    if deleted_in_batch(instance, using):
+        return
+    if getattr(instance, "_loaded_is_active", instance.is_active):
+        adjust_counters([(instance.post_id, instance.parent_id)], -1)
+
+
+@receiver(post_save, sender=Comment)
+def update_search_index(sender, instance, using, update_fields=None, **kwargs):
+    if update_fields is not None and "content" not in update_fields:
+        return
+    comments_index.update([instance], using=using)
+
+
+@receiver(post_delete, sender=Comment)
+def remove_from_search_index(sender, instance, using, **kwargs):
+    if deleted_in_batch(instance, using):
+        return
+    comments_index.remove([instance.pk], using=using)
@@ -1,3 +1,266 @@
-from django.test import TestCase
+import json
+import os
+import tempfile
+from io import StringIO
 
-# Create your tests here.
+from django.core.management import call_command
+from django.db import connection
+from django.db.models.signals import post_delete
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils.http import http_date
+
+from apps.main.tests import authenticate, create_post, create_user
+from .counters import batch_deletes, set_active
+from .models import Comment
+from .search import comments_index
+
+
+class ConditionalCommentDetailTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = create_user("author")
+        cls.post = create_post(cls.author)
+        cls.comment = Comment.objects.create(
+            post=cls.post, author=cls.author, content="Parent"
+        )
+        cls.url = reverse("comment-detail", kwargs={"pk": cls.comment.pk})
+
+    def test_new_reply_is_modified(self):
+        response = self.client.get(self.url)
+        self.assertFalse(response.has_header("Last-Modified"))
+        Comment.objects.create(
+            post=self.post, author=self.author, parent=self.comment, content="Reply"
+        )
+        response = self.client.get(
+            self.url,
+            HTTP_IF_NONE_MATCH=response["ETag"],
+            HTTP_IF_MODIFIED_SINCE=http_date(),
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["replies_count"], 1)
+
+
+class ModerationTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = create_user("author")
+        cls.staff = create_user("staff", is_staff=True)
+        cls.post = create_post(cls.author)
+        cls.parent = Comment.objects.create(
+            post=cls.post, author=cls.author, content="Parent"
+        )
+        cls.reply = Comment.objects.create(
+            post=cls.post, author=cls.author, parent=cls.parent, content="Reply"
+        )
+        cls.nested = Comment.objects.create(
+            post=cls.post, author=cls.author, parent=cls.reply, content="Nested"
+        )
+
+    def assertActive(self, *expected):
+        self.assertEqual(
+            set(Comment.objects.filter(is_active=True).values_list("pk", flat=True)),
+            {comment.pk for comment in expected},
+        )
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.comments_count, len(expected))
+
+    def test_deactivation_cascades_to_replies(self):
+        self.assertEqual(set_active(Comment.objects.filter(pk=self.reply.pk), False), 2)
+        self.assertActive(self.parent)
+        self.parent.refresh_from_db()
+        self.assertEqual(self.parent.replies_count, 0)
+
+    def test_activation_keeps_separately_removed_replies(self):
+        set_active(Comment.objects.filter(pk=self.reply.pk), False)
+        set_active(Comment.objects.filter(pk=self.parent.pk), False)
+        set_active(Comment.objects.filter(pk=self.parent.pk), True)
+        self.assertActive(self.parent)
+
+    def test_moderation_activates_replies_with_cascade(self):
+        set_active(Comment.objects.filter(pk=self.parent.pk), False)
+        authenticate(self.client, self.staff)
+        url = reverse("comment-moderate")
+        response = self.client.post(
+            url, {"action": "activate", "ids": [self.parent.pk]}, "application/json"
+        )
+        self.assertEqual(response.json(), {"updated": 1})
+        response = self.client.post(
+            url,
+            {"action": "activate", "post": self.post.pk, "cascade": True},
+            "application/json",
+        )
+        self.assertEqual(response.json(), {"updated": 2})
+        self.assertActive(self.parent, self.reply, self.nested)
+
+    def test_delete_bumps_updated_at(self):
+        updated_at = self.reply.updated_at
+        authenticate(self.client, self.author)
+        response = self.client.delete(
+            reverse("comment-detail", kwargs={"pk": self.reply.pk})
+        )
+        self.assertEqual(response.status_code, 204)
+        self.reply.refresh_from_db()
+        self.assertFalse(self.reply.is_active)
+        self.assertGreater(self.reply.updated_at, updated_at)
+        self.assertActive(self.parent)
+
+
+class ImportCommentsTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = create_user("author")
+        cls.post = create_post(cls.author)
+
+    def import_rows(self, rows):
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "comments.jsonl")
+            with open(path, "w") as f:
+                f.writelines(json.dumps(row) + "\n" for row in rows)
+            stdout, stderr = StringIO(), StringIO()
+            call_command("import_comments", path, stdout=stdout, stderr=stderr)
+        return stdout.getvalue(), stderr.getvalue()
+
+    def test_replies_are_nested_under_earlier_rows(self):
+        row = {"post": self.post.slug, "author": "author"}
+        stdout, _ = self.import_rows(
+            [
+                {**row, "id": 100, "content": "Parent"},
+                {**row, "id": 101, "parent": 100, "content": "Reply"},
+            ]
+        )
+        self.assertIn("Imported 2 comments, skipped 0 rows.", stdout)
+        reply = Comment.objects.get(pk=101)
+        self.assertEqual(reply.depth, 1)
+        self.assertTrue(reply.path.startswith(Comment.objects.get(pk=100).path))
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.comments_count, 2)
+
+    def test_reply_to_skipped_row_is_skipped(self):
+        row = {"post": self.post.pk, "author": "author"}
+        stdout, stderr = self.import_rows(
+            [
+                {**row, "id": 100, "content": "Bad", "created_at": "yesterday"},
+                {**row, "id": 101, "parent": 100, "content": "Orphan"},
+                {**row, "content": "Fine"},
+            ]
+        )
+        self.assertIn("Imported 1 comments, skipped 2 rows.", stdout)
+        self.assertIn("Line 1: created_at", stderr)
+        self.assertIn("Line 2: parent: Unknown comment 100.", stderr)
+        self.assertEqual(
+            list(Comment.objects.values_list("content", flat=True)), ["Fine"]
+        )
+
+
+class CommentCountersTests(TestCase):
+    def test_counters_follow_active_comments(self):
+        author = create_user("author")
+        post = create_post(author)
+        root = Comment.objects.create(post=post, author=author, content="Root")
+        reply = Comment.objects.create(
+            post=post, author=author, parent=root, content="Reply"
+        )
+
+        def counts():
+            post.refresh_from_db()
+            root.refresh_from_db()
+            return post.comments_count, root.replies_count
+
+        self.assertEqual(counts(), (2, 1))
+        reply.is_active = False
+        reply.save()
+        self.assertEqual(counts(), (1, 0))
+        reply.delete()
+        self.assertEqual(counts(), (1, 0))
+        root.delete()
+        post.refresh_from_db()
+        self.assertEqual(post.comments_count, 0)
+
+
+class BatchDeleteTests(TestCase):
+    def setUp(self):
+        self.author = create_user("author")
+        self.post = create_post(self.author)
+        self.root = Comment.objects.create(
+            post=self.post, author=self.author, content="Root"
+        )
+        self.replies = [
+            Comment.objects.create(
+                post=self.post, author=self.author, parent=self.root, content="Reply"
+            )
+            for _ in range(3)
+        ]
+        self.pks = [self.root.pk] + [reply.pk for reply in self.replies]
+
+    def indexed(self):
+        with connection.cursor() as cursor:
+            cursor.execute(f"SELECT rowid FROM {comments_index.table}")
+            return {row[0] for row in cursor.fetchall()} & set(self.pks)
+
+    def test_post_delete_runs_every_receiver_once(self):
+        deleted = []
+
+        def receiver(sender, instance, **kwargs):
+            deleted.append(instance.pk)
+
+        post_delete.connect(receiver, sender=Comment)
+        self.addCleanup(post_delete.disconnect, receiver, sender=Comment)
+        self.assertEqual(self.indexed(), set(self.pks))
+        authenticate(self.client, self.author)
+        response = self.client.delete(
+            reverse("post-detail", kwargs={"slug": self.post.slug})
+        )
+        self.assertEqual(response.status_code, 204)
+        self.assertCountEqual(deleted, self.pks)
+        self.assertEqual(self.indexed(), set())
+
+    def test_batch_settles_counters_of_surviving_rows(self):
+        with self.assertNumQueries(6), batch_deletes():
+            Comment.objects.filter(parent=self.root).delete()
+        self.post.refresh_from_db()
+        self.root.refresh_from_db()
+        self.assertEqual((self.post.comments_count, self.root.replies_count), (1, 0))
+        self.assertEqual(self.indexed(), {self.root.pk})
+
+
+class CommentSearchTests(TestCase):
+    def test_search_matches_indexed_content(self):
+        author = create_user("author")
+        post = create_post(author)
+        Comment.objects.create(post=post, author=author, content="Great caching tips")
+        Comment.objects.create(post=post, author=author, content="Thanks")
+        response = self.client.get(reverse("comment-list-create"), {"search": "cach"})
+        self.assertEqual(
+            [comment["content"] for comment in response.json()["results"]],
+            ["Great caching tips"],
+        )
+
+
+class CommentThreadTests(TestCase):
+    def test_thread_nests_replies_and_drops_inactive_subtrees(self):
+        author = create_user("author")
+        post = create_post(author)
+
+        def comment(content, parent=None, **kwargs):
+            return Comment.objects.create(
+                post=post, author=author, parent=parent, content=content, **kwargs
+            )
+
+        first = comment("First")
+        reply = comment("Reply", first)
+        comment("Nested", reply)
+        hidden = comment("Hidden", first, is_active=False)
+        comment("Orphan", hidden)
+        comment("Second")
+
+        def contents(nodes):
+            return [(node["content"], contents(node["replies"])) for node in nodes]
+
+        url = reverse("post-thread", kwargs={"post_id": post.pk})
+        with self.assertNumQueries(2):
+            threads = self.client.get(url).json()["comments"]
+        self.assertEqual(
+            contents(threads),
+            [("Second", []), ("First", [("Reply", [("Nested", [])])])],
+        )
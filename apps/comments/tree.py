@@ -0,0 +1,20 @@
+def build_tree(comments, serialize, root_id=None):
+    """Nest comments ordered by path into reply lists in one pass.
+
+    Comments whose parent is missing from the rows (e.g. an inactive
+    ancestor) are dropped together with their subtree.
+    """
+
+    nodes = {}
+    roots = []
+    for comment in comments:
+        node = serialize(comment)
+        node["replies"] = []
+        if comment.pk == root_id or (root_id is None and comment.parent_id is None):
+            roots.append(node)
+        elif comment.parent_id in nodes:
+            nodes[comment.parent_id]["replies"].append(node)
+        else:
+            continue
+        nodes[comment.pk] = node
+    return roots
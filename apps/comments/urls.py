@@ -1,10 +1,21 @@
+from django.conf import settings
 from django.urls import path
 from . import views
 
+if settings.ASYNC_VIEWS:
+    from . import async_views as read_views
+else:
+    read_views = views
+
 urlpatterns = [
     path("", views.CommentListCreateAPIView.as_view(), name="comment-list-create"),
     path("<int:pk>/", views.CommentDetailAPIView.as_view(), name="comment-detail"),
     path("my-comments/", views.MyCommentsView.as_view(), name="my-comments"),
-    path("post/<int:post_id>/", views.post_comments, name="post-comments"),
-    path("<int:comment_id>/replies/", views.comment_replies, name="comment-replies"),
+    path("moderate/", views.moderate_comments, name="comment-moderate"),
+    path("post/<int:post_id>/", read_views.post_comments, name="post-comments"),
+    path("post/<int:post_id>/thread/", views.post_thread, name="post-thread"),
+    path(
+        "<int:comment_id>/replies/", read_views.comment_replies, name="comment-replies"
+    ),
+    path("<int:comment_id>/thread/", views.comment_thread, name="comment-thread"),
 ]
@@ -2,22 +2,33 @@ from rest_framework import generics, status, permissions, filters
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.response import Response
 from django_filters.rest_framework import DjangoFilterBackend
+from django.db.models import Max, Q
 from django.shortcuts import get_object_or_404
+from apps.main.budgets import query_budget
+from apps.main.mixins import ConditionalRetrieveMixin
 from apps.main.models import Post
-from permissions import IsAuthorOrReadOnly
+from apps.main.pagination import OptionalCursorPagination
+from apps.main.search import FullTextSearchFilter
+from .counters import set_active
+from .permissions import IsAuthorOrReadOnly
+from .search import comments_index
 from . import models
 from . import serializers
+from .tree import build_tree
 
 
 class CommentListCreateAPIView(generics.ListCreateAPIView):
+    query_budget = {"GET": 3, "POST": 13}
+    pagination_class = OptionalCursorPagination
     permission_classes = (permissions.IsAuthenticatedOrReadOnly, IsAuthorOrReadOnly)
     filter_backends = (
         DjangoFilterBackend,
-        filters.SearchFilter,
         filters.OrderingFilter,
+        FullTextSearchFilter,
     )
     filterset_fields = ("post", "author", "parent")
     search_fields = ("content",)
+    search_index = comments_index
     ordering_fields = ("created_at", "updated_at")
     ordering = ("-created_at",)
 
@@ -32,12 +43,23 @@ class CommentListCreateAPIView(generics.ListCreateAPIView):
         return serializers.CommentSerializer
 
 
-class CommentDetailAPIView(generics.RetrieveUpdateDestroyAPIView):
+class CommentDetailAPIView(
+    ConditionalRetrieveMixin, generics.RetrieveUpdateDestroyAPIView
+):
+    query_budget = {"GET": 4, "PUT": 5, "PATCH": 5, "DELETE": 7}
     queryset = models.Comment.objects.filter(is_active=True).select_related(
         "author", "post"
     )
     serializer_class = serializers.CommentDetailSerializer
     permission_classes = (IsAuthorOrReadOnly,)
+    etag_fields = ("updated_at", "replies_count")
+
+    def get_etag_annotations(self):
+        return {
+            "replies_updated_at": Max(
+                "replies__updated_at", filter=Q(replies__is_active=True)
+            )
+        }
 
     def get_serializer_class(self):
         if self.request.method in ["PUT", "PATCH"]:
@@ -45,29 +67,52 @@ class CommentDetailAPIView(generics.RetrieveUpdateDestroyAPIView):
         return serializers.CommentDetailSerializer
 
     def perform_destroy(self, instance):
-        instance.is_active = False
-        instance.save()
+        set_active(models.Comment.objects.filter(pk=instance.pk), False)
 
 
 class MyCommentsView(generics.ListAPIView):
+    query_budget = 3
     serializer_class = serializers.CommentSerializer
+    pagination_class = OptionalCursorPagination
     permission_classes = (permissions.IsAuthenticatedOrReadOnly,)
     filter_backends = (
         DjangoFilterBackend,
-        filters.SearchFilter,
         filters.OrderingFilter,
+        FullTextSearchFilter,
     )
     filterset_fields = ("post", "parent", "is_active")
     search_fields = ("content",)
+    search_index = comments_index
     ordering_fields = ("created_at", "updated_at")
     ordering = ("-created_at",)
 
     def get_queryset(self):
         return models.Comment.objects.filter(author=self.request.user).select_related(
-            "post", "parent"
+            "author", "post", "parent"
         )
 
 
+@query_budget(6)
+@api_view(["POST"])
+@permission_classes([permissions.IsAdminUser])
+def moderate_comments(request):
+    """Bulk (de)activate comments by ids, author or post.
+
+    Replies are deactivated with their comment; activation restores only
+    the selected comments unless ``cascade`` is true.
+    """
+
+    serializer = serializers.CommentModerationSerializer(data=request.data)
+    serializer.is_valid(raise_exception=True)
+    updated = set_active(
+        serializer.get_queryset(),
+        serializer.validated_data["action"] == "activate",
+        cascade=serializer.validated_data["cascade"],
+    )
+    return Response({"updated": updated})
+
+
+@query_budget(3)
 @api_view(["GET"])
 @permission_classes([permissions.AllowAny])
 def post_comments(request, post_id):
@@ -75,7 +120,6 @@ def post_comments(request, post_id):
     comments = (
         models.Comment.objects.filter(post=post, parent=None, is_active=True)
         .select_related("author")
-        .prefetch_related("replies__author")
         .order_by("-created_at")
     )
     serializer = serializers.CommentSerializer(
@@ -94,6 +138,7 @@ def post_comments(request, post_id):
     )
 
 
+@query_budget(4)
 @api_view(["GET"])
 @permission_classes([permissions.AllowAny])
 def comment_replies(request, comment_id):
@@ -115,3 +160,50 @@ def comment_replies(request, comment_id):
             "replies_count": parent_comment.replies_count,
         }
     )
+
+
+@query_budget(3)
+@api_view(["GET"])
+@permission_classes([permissions.AllowAny])
+def post_thread(request, post_id):
+    """All active comments of a post as nested threads, newest first"""
+
+    post = get_object_or_404(Post, id=post_id, status="published")
+    comments = (
+        models.Comment.objects.filter(post=post, is_active=True)
+        .select_related("author")
+        .order_by("path")
+    )
+    serializer = serializers.CommentSerializer(context={"request": request})
+    threads = build_tree(comments, serializer.to_representation)
+    threads.reverse()
+    return Response(
+        {
+            "post": {
+                "id": post.id,
+                "title": post.title,
+                "slug": post.slug,
+            },
+            "comments": threads,
+            "comments_count": post.comments_count,
+        }
+    )
+
+
+@query_budget(3)
+@api_view(["GET"])
+@permission_classes([permissions.AllowAny])
+def comment_thread(request, comment_id):
+    """A comment with all of its active descendants nested"""
+
+    root = get_object_or_404(models.Comment, id=comment_id, is_active=True)
+    comments = (
+        models.Comment.objects.filter(
+            post_id=root.post_id, path__startswith=root.path, is_active=True
+        )
+        .select_related("author")
+        .order_by("path")
+    )
+    serializer = serializers.CommentSerializer(context={"request": request})
+    thread = build_tree(comments, serializer.to_representation, root_id=root.pk)
+    return Response(thread[0])
@@ -1,20 +1,25 @@
 from django.contrib import admin
 from django.utils.html import format_html
+from django.db.models import Count
 from .models import Category, Post
 
 
 @admin.register(Category)
 class CategoryAdmin(admin.ModelAdmin):
-    list_display = ("name", "slug", "posts_count", "created_at")
+    list_display = ("name", "slug", "posts_count", "subscribers_count", "created_at")
     list_filter = ("created_at",)
     search_fields = ("name", "description")
     prepopulated_fields = {"slug": ("name",)}
-    readonly_fields = ("created_at",)
+    readonly_fields = ("subscribers_count", "created_at")
 
     def posts_count(self, obj):
-        return obj.posts.count()
+        return obj.posts_total
 
     posts_count.short_description = "Posts Count"
+    posts_count.admin_order_field = "posts_total"
+
+    def get_queryset(self, request):
+        return super().get_queryset(request).annotate(posts_total=Count("posts"))
 
 
 @admin.register(Post)
@@ -31,7 +36,7 @@ class PostAdmin(admin.ModelAdmin):
     list_filter = ("status", "category", "created_at", "updated_at")
     search_fields = ("title", "content", "author__username")
     prepopulated_fields = {"slug": ("title",)}
-    readonly_fields = ("created_at", "updated_at", "views_count")
+    readonly_fields = ("created_at", "updated_at", "views_count", "comments_count")
     raw_id_fields = ("author",)
 
     fieldsets = (
@@ -40,16 +45,16 @@ class PostAdmin(admin.ModelAdmin):
         (
             "Statistics",
             {
-                "fields": ("views_count", "created_at", "updated_at"),
+                "fields": (
+                    "views_count",
+                    "comments_count",
+                    "created_at",
+                    "updated_at",
+                ),
                 "classes": ("collapse",),
             },
         ),
     )
 
-    def comments_count(self, obj):
-        return obj.comments.count()
-
-    comments_count.short_description = "Comments"
-
     def get_queryset(self, request):
         return super().get_queryset(request).select_related("author", "category")
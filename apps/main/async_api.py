@@ -0,0 +1,92 @@
+import json
+from functools import wraps
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth.models import AnonymousUser
+from django.http import HttpResponse
+from django.views.decorators.csrf import csrf_exempt
+from rest_framework.exceptions import (
+    AuthenticationFailed,
+    MethodNotAllowed,
+    NotAuthenticated,
+    ParseError,
+)
+from rest_framework.renderers import JSONRenderer
+from rest_framework.settings import api_settings
+
+renderer = JSONRenderer()
+
+
+def render(data, status=200, headers=None):
+    """JSON response rendered exactly like a DRF Response"""
+
+    return HttpResponse(
+        renderer.render(data),
+        status=status,
+        content_type=renderer.media_type,
+        headers=headers,
+    )
+
+
+def parse_body(request):
+    if request.content_type == "application/json":
+        try:
+            return json.loads(request.body or b"{}")
+        except ValueError as e:
+            raise ParseError(f"JSON parse error - {e}")
+    return request.POST
+
+
+def _authenticate(request):
+    authenticators = [cls() for cls in api_settings.DEFAULT_AUTHENTICATION_CLASSES]
+    for authenticator in authenticators:
+        try:
+            result = authenticator.authenticate(request)
+        except (AuthenticationFailed, NotAuthenticated) as exc:
+            exc.auth_header = authenticators[0].authenticate_header(request)
+            raise
+        if result is not None:
+            return result[0]
+    return AnonymousUser()
+
+
+async def authenticate(request):
+    """The user DRF would authenticate; anonymous without credentials"""
+
+    if "HTTP_AUTHORIZATION" not in request.META:
+        return AnonymousUser()
+    return await sync_to_async(_authenticate)(request)
+
+
+def async_api_view(methods):
+    """Async counterpart of ``@api_view`` for views outside DRF.
+
+    Rejects other methods with 405, authenticates ``request.user`` with the
+    DRF authentication classes, skips CSRF like APIView does and turns
+    APIException, Http404 and PermissionDenied into the same responses as
+    the DRF exception handler.
+    """
+
+    def decorator(view):
+        @wraps(view)
+        async def wrapped(request, *args, **kwargs):
+            try:
+                if request.method not in methods:
+                    raise MethodNotAllowed(request.method)
+                request.user = await authenticate(request)
+                return await view(request, *args, **kwargs)
+            except Exception as exc:
+                handler = api_settings.EXCEPTION_HANDLER
+                response = handler(exc, {"request": request, "args": args})
+                if response is None:
+                    raise
+                headers = {
+                    name: response[name]
+                    for name in ("WWW-Authenticate", "Retry-After")
+                    if response.has_header(name)
+                }
+                return render(response.data, response.status_code, headers)
+
+        return csrf_exempt(wrapped)
+
+    return decorator
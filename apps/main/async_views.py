@@ -0,0 +1,129 @@
+from asgiref.sync import sync_to_async
+from django.http import HttpResponse, StreamingHttpResponse
+from django.shortcuts import aget_object_or_404
+from django.utils.cache import get_conditional_response
+from django.views.decorators.csrf import csrf_exempt
+from rest_framework.request import Request
+
+from . import models
+from . import serializers
+from .async_api import async_api_view, render
+from .budgets import query_budget
+from .cache import aget_or_build, aposts_cache_key
+from .counters import view_counts
+from .mixins import set_validator_headers, version_etag
+from .pagination import KeysetPagination
+from .streaming import ajson_array_stream
+from .views import STREAM_CHUNK_SIZE, PostDetailAPIView
+
+sync_post_detail = sync_to_async(PostDetailAPIView.as_view())
+
+
+async def _latest_posts(request, name, ordering):
+    async def build():
+        posts = (
+            models.Post.objects.filter(status="published")
+            .select_related("author", "category")
+            .defer("content")
+            .order_by(ordering)[:10]
+        )
+        serializer = serializers.PostSerializer(
+            [post async for post in posts], many=True, context={"request": request}
+        )
+        return list(serializer.data)
+
+    return render(await aget_or_build(await aposts_cache_key(name, request), build))
+
+
+@query_budget(2)
+@async_api_view(["GET"])
+async def popular_posts(request):
+    return await _latest_posts(request, "popular", "-views_count")
+
+
+@query_budget(2)
+@async_api_view(["GET"])
+async def recent_posts(request):
+    return await _latest_posts(request, "recent", "-created_at")
+
+
+@query_budget(3)
+@async_api_view(["GET"])
+async def post_by_category(request, slug):
+    """Category posts, keyset paginated or streamed whole with ``?stream=1``"""
+
+    category = await aget_object_or_404(
+        models.Category.objects.with_posts_count(), slug=slug
+    )
+    posts = (
+        models.Post.objects.filter(category=category, status="published")
+        .select_related("author", "category")
+        .defer("content")
+    )
+    category_data = serializers.CategorySerializer(category).data
+
+    if request.GET.get("stream") in ("1", "true"):
+        serializer = serializers.PostSerializer(context={"request": request})
+        prefix = b'{"category":' + render(category_data).content + b',"posts":['
+        return StreamingHttpResponse(
+            ajson_array_stream(
+                posts.order_by("-created_at", "-pk").aiterator(
+                    chunk_size=STREAM_CHUNK_SIZE
+                ),
+                serializer.to_representation,
+                prefix=prefix,
+                suffix=b"]}",
+            ),
+            content_type="application/json",
+        )
+
+    paginator = KeysetPagination()
+    window = paginator.get_window(posts, Request(request))
+    page = paginator.build_page([post async for post in window])
+    serializer = serializers.PostSerializer(
+        page, many=True, context={"request": request}
+    )
+    return render(
+        {
+            "category": category_data,
+            "next": paginator.get_next_link(),
+            "previous": paginator.get_previous_link(),
+            "posts": serializer.data,
+        }
+    )
+
+
+@async_api_view(["GET", "HEAD"])
+async def _read_post(request, slug):
+    queryset = models.Post.objects.visible_to(request.user).select_related(
+        "author", "category"
+    )
+    version = await (
+        queryset.filter(slug=slug).values("pk", *PostDetailAPIView.etag_fields).afirst()
+    )
+    if version is not None:
+        if get_conditional_response(request, etag=version_etag(version)):
+            if request.method == "GET":
+                await view_counts.aadd(version["pk"])
+            return set_validator_headers(
+                HttpResponse(status=304, content_type="application/json"), version
+            )
+
+    post = await aget_object_or_404(queryset, slug=slug)
+    if request.method == "GET":
+        await post.aincrease_views_count()
+    serializer = serializers.PostDetailSerializer(post, context={"request": request})
+    response = render(serializer.data)
+    if version is not None:
+        set_validator_headers(response, version)
+    return response
+
+
+@query_budget(PostDetailAPIView.query_budget)
+@csrf_exempt
+async def post_detail(request, slug):
+    """Reads served from the async ORM, writes by the DRF detail view"""
+
+    if request.method in ("GET", "HEAD"):
+        return await _read_post(request, slug)
+    return await sync_post_detail(request, slug=slug)
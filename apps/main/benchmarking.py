@@ -0,0 +1,470 @@
+import gc
+import json
+import math
+import random
+import threading
+import tracemalloc
+from collections import Counter, defaultdict
+from time import perf_counter
+
+from django.db import (
+    OperationalError,
+    close_old_connections,
+    connection,
+    connections,
+    transaction,
+)
+from django.test import Client
+from django.test.utils import CaptureQueriesContext
+from django.urls import URLPattern, URLResolver, get_resolver, reverse
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from apps.comments.models import Comment
+from .counters import view_counts
+from .feeds import fan_out
+from .models import Post
+from .seeding import SEED_PASSWORD
+from .streaming import read_stream
+
+# URLconfs whose every named route needs a benchmark case
+BENCHMARKED_URLCONFS = ("apps.main.urls", "apps.comments.urls", "apps.accounts.urls")
+
+
+class Case:
+    """One request to benchmark.
+
+    ``kwargs`` and ``data`` are dicts or callables taking the fixture, and
+    ``user`` names the fixture user the request is authenticated as.
+    """
+
+    def __init__(self, name, method="GET", kwargs=None, query="", data=None, user=None):
+        self.name = name
+        self.method = method
+        self.kwargs = kwargs
+        self.query = query
+        self.data = data
+        self.user = user
+
+    @property
+    def label(self):
+        label = f"{self.method} {self.name}"
+        return f"{label}?{self.query}" if self.query else label
+
+    def request(self, fixture):
+        kwargs = self.kwargs(fixture) if callable(self.kwargs) else self.kwargs
+        url = reverse(self.name, kwargs=kwargs)
+        if self.query:
+            url = f"{url}?{self.query}"
+        data = self.data(fixture) if callable(self.data) else self.data
+        headers = {}
+        if self.user:
+            headers["HTTP_AUTHORIZATION"] = f"Bearer {fixture.access(self.user)}"
+        return url, data, headers
+
+
+def slug(fixture):
+    return {"slug": fixture.post.slug}
+
+
+def category(fixture):
+    return {"slug": fixture.post.category.slug}
+
+
+def post_id(fixture):
+    return {"post_id": fixture.post.pk}
+
+
+def comment_pk(fixture):
+    return {"pk": fixture.comment.pk}
+
+
+def comment_id(fixture):
+    return {"comment_id": fixture.comment.pk}
+
+
+def refresh_token(fixture):
+    return {"refresh": str(RefreshToken.for_user(fixture.reader))}
+
+
+def logout_token(fixture):
+    return {"refresh_token": str(RefreshToken.for_user(fixture.reader))}
+
+
+CASES = [
+    # apps/main/urls.py
+    Case("category-list-create"),
+    Case(
+        "category-list-create",
+        "POST",
+        data={"name": "Benchmark category"},
+        user="staff",
+    ),
+    Case("subscribed-categories", user="reader"),
+    Case("category-detail", kwargs=category),
+    Case("post-by-category", kwargs=category),
+    Case("post-by-category", kwargs=category, query="stream=1"),
+    Case("category-subscription", "POST", kwargs=category, user="reader"),
+    Case("category-subscription", "DELETE", kwargs=category, user="reader"),
+    Case("post-list"),
+    Case("post-list", query="pagination=cursor"),
+    Case("post-list", query="search=cache"),
+    Case(
+        "post-list",
+        "POST",
+        data={"title": "Benchmark post", "content": "Benchmark content."},
+        user="reader",
+    ),
+    Case("my-posts", user="author"),
+    Case("feed", user="reader"),
+    Case("popular-posts"),
+    Case("recent-posts"),
+    Case("trending-posts"),
+    Case("export-posts", user="staff"),
+    Case("export-posts", query="comments=1", user="staff"),
+    Case("post-detail", kwargs=slug),
+    Case("post-detail", "PATCH", kwargs=slug, data={"title": "Edited"}, user="author"),
+    Case("post-detail", "DELETE", kwargs=slug, user="author"),
+    # apps/comments/urls.py
+    Case("comment-list-create"),
+    Case(
+        "comment-list-create",
+        "POST",
+        data=lambda fixture: {"post": fixture.post.pk, "content": "Benchmark"},
+        user="reader",
+    ),
+    Case("comment-detail", kwargs=comment_pk),
+    Case(
+        "comment-detail",
+        "PATCH",
+        kwargs=comment_pk,
+        data={"content": "Edited"},
+        user="commenter",
+    ),
+    Case("comment-detail", "DELETE", kwargs=comment_pk, user="commenter"),
+    Case(
+        "comment-moderate",
+        "POST",
+        data=lambda fixture: {"action": "deactivate", "post": fixture.post.pk},
+        user="staff",
+    ),
+    Case("my-comments", user="commenter"),
+    Case("post-comments", kwargs=post_id),
+    Case("post-thread", kwargs=post_id),
+    Case("comment-replies", kwargs=comment_id),
+    Case("comment-thread", kwargs=comment_id),
+    # apps/accounts/urls.py
+    Case(
+        "register",
+        "POST",
+        data={
+            "username": "benchmark",
+            "email": "benchmark@example.com",
+            "password": SEED_PASSWORD,
+            "password_confirm": SEED_PASSWORD,
+        },
+    ),
+    Case(
+        "login",
+        "POST",
+        data=lambda fixture: {"email": fixture.reader.email, "password": SEED_PASSWORD},
+    ),
+    Case("token_refresh", "POST", data=refresh_token),
+    Case("logout", "POST", data=logout_token, user="reader"),
+    Case("profile", user="reader"),
+    Case("profile", "PATCH", data={"bio": "Benchmarking"}, user="reader"),
+    Case(
+        "change_password",
+        "PUT",
+        data={
+            "old_password": SEED_PASSWORD,
+            "new_password": "another-password-456",
+            "new_password_confirm": "another-password-456",
+        },
+        user="reader",
+    ),
+    Case("hashing_stats", user="staff"),
+]
+
+
+class Fixture:
+    """Seeded rows the cases point at: the published post with the most
+    comments, its most replied-to comment and the users acting on them"""
+
+    def __init__(self, prefix="seed"):
+        self.post = (
+            Post.objects.filter(
+                slug__startswith=f"{prefix}-",
+                status="published",
+                category__isnull=False,
+            )
+            .select_related("author", "category")
+            .order_by("-comments_count", "pk")
+            .first()
+        )
+        if self.post is None:
+            raise ValueError("The dataset has no published posts to benchmark.")
+        self.comment = (
+            Comment.objects.filter(post=self.post, parent=None, is_active=True)
+            .select_related("author")
+            .order_by("-replies_count", "pk")
+            .first()
+        )
+        if self.comment is None:
+            raise ValueError("The benchmarked post has no comments.")
+        User = type(self.post.author)
+        self.users = {
+            "staff": User.objects.get(username=f"{prefix}0"),
+            "reader": User.objects.exclude(username=f"{prefix}0")
+            .filter(username__startswith=prefix, is_staff=False)
+            .order_by("pk")
+            .first(),
+            "author": self.post.author,
+            "commenter": self.comment.author,
+        }
+        self.reader = self.users["reader"]
+        self._access = {}
+        self._added = 0
+
+    def add_rows(self, count=5):
+        """More rows under everything the cases read: posts in the post's
+        category, comments on the post and replies to the comment"""
+
+        users = list(self.users.values())
+        posts = []
+        for i in range(count):
+            user = users[i % len(users)]
+            self._added += 1
+            posts.append(
+                Post.objects.create(
+                    title=f"Added post {self._added}",
+                    content="Added content.",
+                    author=user,
+                    category=self.post.category,
+                    status="published",
+                )
+            )
+            Comment.objects.create(post=self.post, author=user, content="Added")
+            Comment.objects.create(
+                post=self.post, author=user, parent=self.comment, content="Added"
+            )
+        fan_out(post.pk for post in posts)
+
+    def access(self, user):
+        if user not in self._access:
+            self._access[user] = str(
+                RefreshToken.for_user(self.users[user]).access_token
+            )
+        return self._access[user]
+
+
+def named_routes(urlconf):
+    """Names of all routes in a URLconf, including nested includes"""
+
+    names = set()
+    for pattern in get_resolver(urlconf).url_patterns:
+        if isinstance(pattern, URLResolver):
+            names |= named_routes(pattern.urlconf_name)
+        elif isinstance(pattern, URLPattern) and pattern.name:
+            names.add(pattern.name)
+    return names
+
+
+def uncovered_routes(cases=CASES, urlconfs=BENCHMARKED_URLCONFS):
+    covered = {case.name for case in cases}
+    return sorted(
+        name for urlconf in urlconfs for name in named_routes(urlconf) - covered
+    )
+
+
+def percentile(values, pct):
+    ordered = sorted(values)
+    return ordered[max(math.ceil(pct / 100 * len(ordered)) - 1, 0)]
+
+
+def perform(client, case, fixture):
+    """Send the case's request inside a rolled back transaction"""
+
+    url, data, headers = case.request(fixture)
+    with transaction.atomic():
+        response = client.generic(
+            case.method,
+            url,
+            data="" if data is None else json.dumps(data),
+            content_type="application/json",
+            **headers,
+        )
+        if response.streaming:
+            read_stream(response)
+        transaction.set_rollback(True)
+    return response
+
+
+def measure(case, fixture, iterations=20, warmup=2):
+    """Latency percentiles, query count and allocation peak of one case.
+
+    Timings, queries and allocations are taken in separate runs so that
+    query capture and tracemalloc do not slow down the timed requests.
+    """
+
+    client = Client()
+    for _ in range(warmup):
+        perform(client, case, fixture)
+
+    # Like timeit, keep garbage collection pauses out of the timed requests
+    durations = []
+    gc.collect()
+    gc.disable()
+    try:
+        for _ in range(iterations):
+            started = perf_counter()
+            response = perform(client, case, fixture)
+            durations.append((perf_counter() - started) * 1000)
+    finally:
+        gc.enable()
+
+    with CaptureQueriesContext(connection) as queries:
+        perform(client, case, fixture)
+    # The rollback savepoint statements are not the endpoint's
+    query_count = sum(
+        1 for query in queries.captured_queries if "SAVEPOINT" not in query["sql"]
+    )
+
+    tracemalloc.start()
+    try:
+        perform(client, case, fixture)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {
+        "status": response.status_code,
+        "p50_ms": round(percentile(durations, 50), 3),
+        "p95_ms": round(percentile(durations, 95), 3),
+        "queries": query_count,
+        "alloc_kb": round(peak / 1024, 1),
+    }
+
+
+def compare(results, baseline, tolerance=0.5, slack_ms=2.0):
+    """Regressions of results against a baseline, as readable lines.
+
+    A changed status or any extra query is a regression. Latency is judged
+    on p50, which is far steadier than p95 over a few dozen requests, and
+    like the allocation peak may grow by ``tolerance`` (latency also by
+    ``slack_ms``) before it counts.
+    """
+
+    regressions = []
+    for label, result in results.items():
+        base = baseline.get(label)
+        if base is None:
+            continue
+        if result["status"] != base["status"]:
+            regressions.append(
+                f"{label}: status {base['status']} -> {result['status']}"
+            )
+        if result["queries"] > base["queries"]:
+            regressions.append(
+                f"{label}: queries {base['queries']} -> {result['queries']}"
+            )
+        if result["p50_ms"] > base["p50_ms"] * (1 + tolerance) + slack_ms:
+            regressions.append(
+                f"{label}: p50 {base['p50_ms']}ms -> {result['p50_ms']}ms"
+            )
+        if result["alloc_kb"] > base["alloc_kb"] * (1 + tolerance):
+            regressions.append(
+                f"{label}: allocations {base['alloc_kb']}KiB -> {result['alloc_kb']}KiB"
+            )
+    return regressions
+
+
+# Share of each operation in the concurrent workload of write_throughput
+WORKLOAD = (("read", 50), ("view", 35), ("comment", 15))
+
+
+def run_operation(kind, rng, post_ids, user_ids):
+    """One request's worth of database work, run like the views run it: a
+    post list read, a view count flush or a comment with its signals"""
+
+    if kind == "read":
+        list(
+            Post.objects.filter(status="published")
+            .select_related("author", "category")
+            .defer("content")
+            .order_by("-created_at")[:20]
+        )
+    elif kind == "view":
+        view_counts.write({rng.choice(post_ids): 1})
+    else:
+        Comment.objects.create(
+            post_id=rng.choice(post_ids),
+            author_id=rng.choice(user_ids),
+            content="Benchmark comment",
+        )
+
+
+def write_throughput(threads=8, duration=5.0, random_seed=42):
+    """Run the WORKLOAD from concurrent threads for ``duration`` seconds.
+
+    Each operation stands for a request: connections are released after it
+    like at the end of a request, so CONN_MAX_AGE and pooling take effect.
+    Returns operations per second, failures such as "database is locked"
+    and latency percentiles per operation kind.
+    """
+
+    published = Post.objects.filter(status="published")
+    post_ids = list(published.values_list("pk", flat=True))
+    user_ids = list(published.values_list("author_id", flat=True).distinct())
+    if not post_ids:
+        raise ValueError("The dataset has no published posts to write to.")
+    kinds, weights = zip(*WORKLOAD)
+    durations = defaultdict(list)
+    errors = Counter()
+    lock = threading.Lock()
+    deadline = perf_counter() + duration
+
+    def worker(index):
+        rng = random.Random(random_seed + index)
+        mine, failed = defaultdict(list), Counter()
+        try:
+            while perf_counter() < deadline:
+                kind = rng.choices(kinds, weights)[0]
+                started = perf_counter()
+                try:
+                    run_operation(kind, rng, post_ids, user_ids)
+                except OperationalError as e:
+                    failed[f"{kind}: {e}"] += 1
+                else:
+                    mine[kind].append((perf_counter() - started) * 1000)
+                finally:
+                    close_old_connections()
+        finally:
+            connections.close_all()
+        with lock:
+            for kind, values in mine.items():
+                durations[kind].extend(values)
+            errors.update(failed)
+
+    started = perf_counter()
+    workers = [threading.Thread(target=worker, args=(i,)) for i in range(threads)]
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    elapsed = perf_counter() - started
+
+    completed = sum(len(values) for values in durations.values())
+    return {
+        "ops_per_s": round(completed / elapsed, 1),
+        "completed": completed,
+        "failed": sum(errors.values()),
+        "errors": dict(errors),
+        "kinds": {
+            kind: {
+                "count": len(values),
+                "p50_ms": round(percentile(values, 50), 2),
+                "p95_ms": round(percentile(values, 95), 2),
+            }
+            for kind, values in sorted(durations.items())
+        },
+    }
@@ -0,0 +1,169 @@
+import json
+import re
+from collections import Counter
+from unittest import mock
+
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.test.utils import CaptureQueriesContext
+from django.urls import URLPattern, URLResolver, get_resolver, resolve
+
+from config.middleware import sql_template
+from .pagination import KeysetPagination, OptionalCursorPagination
+from .streaming import read_stream
+
+SAVEPOINT = re.compile(r"(?:RELEASE |ROLLBACK TO )?SAVEPOINT ")
+
+
+class QueryBudgetExceeded(Exception):
+    pass
+
+
+def query_budget(budget):
+    """Declare the most SQL queries a function view may run per request.
+
+    ``budget`` is a number for every method or a dict keyed by method;
+    class-based views set a ``query_budget`` attribute of the same shape.
+    """
+
+    def decorator(view):
+        view.query_budget = budget
+        return view
+
+    return decorator
+
+
+def budget_for(view, method):
+    """Query budget of a resolved view callable for an HTTP method, or None"""
+
+    budget = getattr(view, "query_budget", None)
+    if budget is None:
+        view_class = getattr(view, "view_class", None) or getattr(view, "cls", None)
+        budget = getattr(view_class, "query_budget", None)
+    if isinstance(budget, dict):
+        return budget.get("GET" if method == "HEAD" else method)
+    return budget
+
+
+def view_methods(view):
+    """HTTP methods a view handles, GET for plain function views"""
+
+    view_class = getattr(view, "view_class", None)
+    if view_class is None:
+        return ["GET"]
+    return [
+        method
+        for method in ("GET", "POST", "PUT", "PATCH", "DELETE")
+        if hasattr(view_class, method.lower())
+    ]
+
+
+def unbudgeted_routes(urlconf):
+    """(route name, method) pairs of a URLconf without a query budget"""
+
+    missing = []
+    for pattern in get_resolver(urlconf).url_patterns:
+        if isinstance(pattern, URLResolver):
+            missing += unbudgeted_routes(pattern.urlconf_name)
+        elif isinstance(pattern, URLPattern):
+            missing += [
+                (pattern.name, method)
+                for method in view_methods(pattern.callback)
+                if budget_for(pattern.callback, method) is None
+            ]
+    return missing
+
+
+def budgeted(templates):
+    """Queries that count against a budget, leaving out savepoints: whether
+    an atomic block needs one depends on the caller's transaction"""
+
+    return Counter(
+        {
+            template: count
+            for template, count in templates.items()
+            if not SAVEPOINT.match(template)
+        }
+    )
+
+
+def budget_report(label, templates, budget):
+    """Over-budget report from a Counter of queries by SQL template"""
+
+    total = sum(templates.values())
+    lines = [f"{label} ran {total} queries, its budget is {budget}:"]
+    lines += [
+        f"  {count:>4} x {template}" for template, count in templates.most_common()
+    ]
+    return "\n".join(lines)
+
+
+class QueryBudgetTestMixin:
+    """TestCase helpers checking requests against their view's query budget"""
+
+    def request_queries(self, method, path, data=None, **extra):
+        """Send a request with a cold cache, returns (response, SQL templates)"""
+
+        cache.clear()
+        with CaptureQueriesContext(connection) as captured:
+            response = self.client.generic(
+                method,
+                path,
+                data="" if data is None else json.dumps(data),
+                content_type="application/json",
+                **extra,
+            )
+            if response.streaming:
+                read_stream(response)
+        return response, budgeted(
+            Counter(sql_template(query["sql"]) for query in captured.captured_queries)
+        )
+
+    def assertQueryBudget(self, method, path, data=None, **extra):
+        """Assert a request stays within its view's budget, returns the
+        request's SQL templates"""
+
+        match = resolve(path.split("?")[0])
+        budget = budget_for(match.func, method)
+        self.assertIsNotNone(budget, f"{method} {match.view_name} has no query budget")
+        label = f"{method} {path}"
+
+        response, templates = self.request_queries(method, path, data, **extra)
+        self.assertLess(response.status_code, 500, label)
+        if sum(templates.values()) > budget:
+            self.fail(budget_report(label, templates, budget))
+        return templates
+
+    def assertCasesWithinBudget(self, cases, fixture, page_sizes=(1, 50)):
+        """Check benchmark cases at every page size, then again after
+        fixture.add_rows(), failing if the query count grew.
+
+        Every request runs in its own rolled back transaction with no cookies
+        left from earlier requests.
+        """
+
+        for case in cases:
+            for page_size in page_sizes:
+                with (
+                    self.subTest(case.label, page_size=page_size),
+                    mock.patch.object(KeysetPagination, "page_size", page_size),
+                    mock.patch.object(OptionalCursorPagination, "page_size", page_size),
+                ):
+                    count = sum(self.case_queries(case, fixture).values())
+                    grown = self.case_queries(case, fixture, grow=True)
+                    if sum(grown.values()) > count:
+                        self.fail(
+                            f"{case.label} grew from {count} to "
+                            f"{sum(grown.values())} queries with more rows:\n"
+                            + budget_report(case.label, grown, count)
+                        )
+
+    def case_queries(self, case, fixture, grow=False):
+        self.client.cookies.clear()
+        with transaction.atomic():
+            if grow:
+                fixture.add_rows()
+            url, data, headers = case.request(fixture)
+            templates = self.assertQueryBudget(case.method, url, data, **headers)
+            transaction.set_rollback(True)
+        return templates
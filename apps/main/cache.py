@@ -0,0 +1,111 @@
+import asyncio
+import time
+
+from django.conf import settings
+from django.core.cache import cache
+
+VERSION_KEY = "posts:version"
+
+
+def posts_version():
+    return cache.get_or_set(VERSION_KEY, 1, None)
+
+
+def invalidate_posts():
+    """Drop every cached post response by moving to a new key version"""
+
+    try:
+        cache.incr(VERSION_KEY)
+    except ValueError:
+        cache.add(VERSION_KEY, 1, None)
+
+
+async def aposts_version():
+    return await cache.aget_or_set(VERSION_KEY, 1, None)
+
+
+def posts_cache_key(name, request):
+    return f"posts:v{posts_version()}:{name}:{request.scheme}://{request.get_host()}"
+
+
+async def aposts_cache_key(name, request):
+    version = await aposts_version()
+    return f"posts:v{version}:{name}:{request.scheme}://{request.get_host()}"
+
+
+def get_or_build(key, build, timeout=None):
+    """Return the cached value for key, building it at most once at a time.
+
+    Entries stay in the cache past their freshness deadline. The first
+    caller to see a stale entry takes a short lock and rebuilds it while the
+    others keep serving the stale copy; on a cold key the others wait for
+    the lock holder instead of all querying the database.
+    """
+
+    if timeout is None:
+        timeout = settings.POSTS_CACHE_TIMEOUT
+    lock_key = f"{key}:lock"
+    lock_timeout = settings.POSTS_CACHE_LOCK_TIMEOUT
+
+    entry = cache.get(key)
+    if entry is not None:
+        value, fresh_until = entry
+        if fresh_until > time.time() or not cache.add(lock_key, 1, lock_timeout):
+            return value
+        return _rebuild(key, lock_key, build, timeout)
+
+    if cache.add(lock_key, 1, lock_timeout):
+        return _rebuild(key, lock_key, build, timeout)
+
+    deadline = time.time() + lock_timeout
+    while time.time() < deadline:
+        time.sleep(0.05)
+        entry = cache.get(key)
+        if entry is not None:
+            return entry[0]
+    return build()
+
+
+def _rebuild(key, lock_key, build, timeout):
+    try:
+        value = build()
+        cache.set(key, (value, time.time() + timeout), timeout * 2)
+        return value
+    finally:
+        cache.delete(lock_key)
+
+
+async def aget_or_build(key, build, timeout=None):
+    """get_or_build() for async views; build is a coroutine function"""
+
+    if timeout is None:
+        timeout = settings.POSTS_CACHE_TIMEOUT
+    lock_key = f"{key}:lock"
+    lock_timeout = settings.POSTS_CACHE_LOCK_TIMEOUT
+
+    entry = await cache.aget(key)
+    if entry is not None:
+        value, fresh_until = entry
+        if fresh_until > time.time() or not await cache.aadd(lock_key, 1, lock_timeout):
+            return value
+        return await _arebuild(key, lock_key, build, timeout)
+
+    if await cache.aadd(lock_key, 1, lock_timeout):
+        return await _arebuild(key, lock_key, build, timeout)
+
+    deadline = time.time() + lock_timeout
+    while time.time() < deadline:
+        await asyncio.sleep(0.05)
+        entry = await cache.aget(key)
+        if entry is not None:
+            return entry[0]
+    return await build()
+
+
+async def _arebuild(key, lock_key, build, timeout):
+    try:
+        value = await build()
+        await cache.aset(key, (value, time.time() + timeout), timeout * 2)
+        return value
+    finally:
+        await cache.adelete(lock_key)
@@ -0,0 +1,118 @@
+import atexit
+import logging
+import threading
+import time
+from collections import Counter, defaultdict
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.db import close_old_connections, transaction
+from django.db.models import F
+
+logger = logging.getLogger(__name__)
+
+
+def group_by_amount(counts):
+    """{amount: [ids]} of {id: amount}, for one UPDATE per distinct amount"""
+
+    by_amount = defaultdict(list)
+    for pk, amount in counts.items():
+        if amount:
+            by_amount[amount].append(pk)
+    return by_amount
+
+
+class ViewCountBuffer:
+    """Write-behind accumulator for post views.
+
+    Increments are collected in process memory and written as batched
+    ``F("views_count") + n`` updates, grouped by increment size, so a page
+    view never waits on a row write.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._pending = Counter()
+        self._worker = None
+
+    @property
+    def interval(self):
+        return getattr(settings, "VIEW_COUNT_FLUSH_INTERVAL", 10)
+
+    def add(self, post_id, amount=1):
+        if self.interval <= 0:
+            self.write({post_id: amount})
+            return
+        with self._lock:
+            self._pending[post_id] += amount
+        self._ensure_worker()
+
+    async def aadd(self, post_id, amount=1):
+        """add() for async views, writing through off the event loop"""
+
+        if self.interval <= 0:
+            await sync_to_async(self.write)({post_id: amount})
+            return
+        self.add(post_id, amount)
+
+    def pending(self, post_id):
+        with self._lock:
+            return self._pending.get(post_id, 0)
+
+    def drain(self):
+        with self._lock:
+            pending, self._pending = self._pending, Counter()
+        return dict(pending)
+
+    def flush(self):
+        """Write all buffered increments, returns the number of views written"""
+
+        pending = self.drain()
+        if pending:
+            try:
+                self.write(pending)
+            except Exception:
+                with self._lock:
+                    self._pending.update(pending)
+                raise
+        return sum(pending.values())
+
+    def write(self, pending):
+        from .models import Post
+        from .trending import record_activity
+
+        # One transaction, so a failed flush re-queues views none of which
+        # were counted
+        with transaction.atomic():
+            for amount, post_ids in group_by_amount(pending).items():
+                Post.objects.filter(pk__in=post_ids).update(
+                    views_count=F("views_count") + amount
+                )
+            record_activity(pending, "views")
+
+    def _ensure_worker(self):
+        if self._worker is not None and self._worker.is_alive():
+            return
+        with self._lock:
+            if self._worker is not None and self._worker.is_alive():
+                return
+            self._worker = threading.Thread(
+                target=self._run, name="view-count-flusher", daemon=True
+            )
+            self._worker.start()
+
+    def _run(self):
+        while True:
+            time.sleep(max(self.interval, 1))
+            close_old_connections()
+            self.flush_quietly()
+
+    def flush_quietly(self):
+        try:
+            self.flush()
+        except Exception:
+            logger.exception("Failed to flush buffered post views")
+
+
+view_counts = ViewCountBuffer()
+atexit.register(view_counts.flush_quietly)
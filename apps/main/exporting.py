@@ -0,0 +1,97 @@
+import django_filters
+from rest_framework.utils.encoders import JSONEncoder
+
+from apps.comments.models import Comment
+from apps.comments.tree import build_tree
+from .importing import batched
+from .models import Post
+
+EXPORT_CHUNK_SIZE = 1000
+
+
+class PostExportFilter(django_filters.FilterSet):
+    """The post list filters plus a created_at range"""
+
+    class Meta:
+        model = Post
+        fields = {
+            "category": ["exact"],
+            "author": ["exact"],
+            "status": ["exact"],
+            "created_at": ["gte", "lte"],
+        }
+
+
+def export_post(post):
+    """Export row for a post, using the columns import_posts reads"""
+
+    return {
+        "id": post.pk,
+        "title": post.title,
+        "slug": post.slug,
+        "content": post.content,
+        "status": post.status,
+        "author": post.author.username,
+        "author_id": post.author_id,
+        "category": post.category.slug if post.category_id else None,
+        "image": post.image.name or None,
+        "views_count": post.views_count,
+        "comments_count": post.comments_count,
+        "created_at": post.created_at,
+        "updated_at": post.updated_at,
+    }
+
+
+def export_comment(comment):
+    """Export row for a comment, using the columns import_comments reads"""
+
+    return {
+        "id": comment.pk,
+        "parent": comment.parent_id,
+        "author": comment.author.username,
+        "author_id": comment.author_id,
+        "content": comment.content,
+        "is_active": comment.is_active,
+        "created_at": comment.created_at,
+        "updated_at": comment.updated_at,
+    }
+
+
+def export_rows(queryset, comments=False, chunk_size=EXPORT_CHUNK_SIZE):
+    """Yield export rows for the posts of queryset in primary key order.
+
+    Posts are read through ``iterator(chunk_size=...)``; with ``comments``
+    every chunk of posts streams all of its comments (active or not) from
+    one query and attaches them as nested threads.
+    """
+
+    posts = (
+        queryset.select_related("author", "category")
+        .order_by("pk")
+        .iterator(chunk_size=chunk_size)
+    )
+    if not comments:
+        for post in posts:
+            yield export_post(post)
+        return
+
+    for chunk in batched(posts, chunk_size):
+        by_post = {post.pk: [] for post in chunk}
+        rows = (
+            Comment.objects.filter(post_id__in=by_post)
+            .select_related("author")
+            .order_by("post_id", "path")
+            .iterator(chunk_size=chunk_size)
+        )
+        for comment in rows:
+            by_post[comment.post_id].append(comment)
+        for post in chunk:
+            row = export_post(post)
+            row["comments"] = build_tree(by_post[post.pk], export_comment)
+            yield row
+
+
+def ndjson_lines(rows):
+    encoder = JSONEncoder(ensure_ascii=False, separators=(",", ":"))
+    for row in rows:
+        yield (encoder.encode(row) + "\n").encode()
@@ -0,0 +1,201 @@
+import heapq
+from collections import defaultdict
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F, Value
+from django.db.models.functions import Greatest
+
+from .importing import batched
+from .models import Category, CategorySubscription, FeedEntry, Post
+from .pagination import KeysetPagination
+
+FANOUT_CHUNK_SIZE = 1000
+
+
+def fans_out_on_write(subscribers_count):
+    """Whether new posts of a category are copied into subscriber timelines.
+
+    Categories with more than FEED_FANOUT_LIMIT subscribers are merged into
+    each feed when it is read instead.
+    """
+
+    return subscribers_count <= settings.FEED_FANOUT_LIMIT
+
+
+def backfill(user_ids, category_id):
+    """Copy the category's latest FEED_BACKFILL posts into the timelines of
+    user_ids, in chunks of FANOUT_CHUNK_SIZE rows"""
+
+    posts = list(
+        Post.objects.filter(category_id=category_id, status="published")
+        .order_by("-created_at", "-pk")
+        .values_list("pk", "created_at")[: settings.FEED_BACKFILL]
+    )
+    if not posts:
+        return
+    for users in batched(user_ids, max(FANOUT_CHUNK_SIZE // len(posts), 1)):
+        FeedEntry.objects.bulk_create(
+            [
+                FeedEntry(
+                    user_id=user_id,
+                    post_id=post_id,
+                    category_id=category_id,
+                    created_at=created_at,
+                )
+                for user_id in users
+                for post_id, created_at in posts
+            ],
+            ignore_conflicts=True,
+        )
+
+
+def subscriber_ids(category_id):
+    """User ids of a category's subscribers, read in chunks"""
+
+    return (
+        CategorySubscription.objects.filter(category_id=category_id)
+        .order_by("pk")
+        .values_list("user_id", flat=True)
+        .iterator(chunk_size=FANOUT_CHUNK_SIZE)
+    )
+
+
+def subscribe(user, category):
+    """Subscribe user to category, returns False if already subscribed"""
+
+    with transaction.atomic():
+        _, created = CategorySubscription.objects.get_or_create(
+            user=user, category=category
+        )
+        if not created:
+            return False
+        Category.objects.filter(pk=category.pk).update(
+            subscribers_count=F("subscribers_count") + 1
+        )
+        category.refresh_from_db(fields=["subscribers_count"])
+        if fans_out_on_write(category.subscribers_count):
+            backfill([user.pk], category.pk)
+    return True
+
+
+def unsubscribe(user, category):
+    """Drop a subscription and its timeline entries, False if there was none.
+
+    When the category drops back to FEED_FANOUT_LIMIT subscribers its posts
+    are copied on write again, and the timelines of the remaining
+    subscribers, which have none of the posts published in the meantime,
+    are backfilled.
+    """
+
+    with transaction.atomic():
+        deleted, _ = CategorySubscription.objects.filter(
+            user=user, category=category
+        ).delete()
+        if not deleted:
+            return False
+        Category.objects.filter(pk=category.pk).update(
+            subscribers_count=Greatest(F("subscribers_count") - 1, Value(0))
+        )
+        FeedEntry.objects.filter(user=user, category=category).delete()
+        category.refresh_from_db(fields=["subscribers_count"])
+        if category.subscribers_count == settings.FEED_FANOUT_LIMIT:
+            backfill(subscriber_ids(category.pk), category.pk)
+    return True
+
+
+def fan_out(post_ids):
+    """Bring timeline entries of the posts in line with their status and
+    category, returns entries written.
+
+    Entries of unpublished posts, or of a category the post has left, are
+    removed; published posts of fan-out-on-write categories are copied to
+    every subscriber in chunks of FANOUT_CHUNK_SIZE rows.
+    """
+
+    post_ids = list(post_ids)
+    by_category = defaultdict(list)
+    posts = Post.objects.filter(
+        pk__in=post_ids, status="published", category__isnull=False
+    ).values_list("pk", "created_at", "category_id", "category__subscribers_count")
+    for post_id, created_at, category_id, subscribers_count in posts:
+        by_category[category_id, subscribers_count].append((post_id, created_at))
+
+    written = 0
+    with transaction.atomic():
+        published = [post_id for group in by_category.values() for post_id, _ in group]
+        FeedEntry.objects.filter(post_id__in=post_ids).exclude(
+            post_id__in=published
+        ).delete()
+        for (category_id, subscribers_count), group in by_category.items():
+            FeedEntry.objects.filter(post_id__in=[pk for pk, _ in group]).exclude(
+                category_id=category_id
+            ).delete()
+            if not fans_out_on_write(subscribers_count):
+                continue
+            for users in batched(
+                subscriber_ids(category_id), max(FANOUT_CHUNK_SIZE // len(group), 1)
+            ):
+                entries = [
+                    FeedEntry(
+                        user_id=user_id,
+                        post_id=post_id,
+                        category_id=category_id,
+                        created_at=created_at,
+                    )
+                    for user_id in users
+                    for post_id, created_at in group
+                ]
+                FeedEntry.objects.bulk_create(entries, ignore_conflicts=True)
+                written += len(entries)
+    return written
+
+
+class FeedPagination(KeysetPagination):
+    """Keyset pages of a user's timeline.
+
+    One page reads at most ``page_size + 1`` timeline entries plus as many
+    posts of each subscribed fan-out-on-read category, all from their
+    (-created_at) indexes, merges the keys and loads only the posts shown.
+    """
+
+    def paginate_feed(self, user, queryset, request):
+        sources = [
+            self.get_window(
+                FeedEntry.objects.filter(user=user).values_list(
+                    "created_at", "post_id"
+                ),
+                request,
+                ("created_at", "post_id"),
+            )
+        ]
+        large = Category.objects.filter(
+            subscriptions__user=user,
+            subscribers_count__gt=settings.FEED_FANOUT_LIMIT,
+        ).values_list("pk", flat=True)
+        for category_id in large:
+            sources.append(
+                self.window(
+                    Post.objects.filter(
+                        category_id=category_id, status="published"
+                    ).values_list("created_at", "pk")
+                )
+            )
+
+        keys = {}
+        merged = heapq.merge(*map(list, sources), reverse=not self.reverse)
+        for key in merged:
+            keys.setdefault(key[1], key)
+            if len(keys) > self.page_size:
+                break
+        posts = queryset.in_bulk(keys)
+        page = []
+        for post_id, key in keys.items():
+            if post_id in posts:
+                posts[post_id].feed_key = key
+                page.append(posts[post_id])
+        return self.build_page(page)
+
+    @staticmethod
+    def key(obj):
+        return obj.feed_key
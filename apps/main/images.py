@@ -0,0 +1,153 @@
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import close_old_connections
+from PIL import Image, ImageOps
+from rest_framework import serializers
+
+logger = logging.getLogger(__name__)
+
+POST_IMAGE_SIZES = {
+    "thumb": (320, 320),
+    "medium": (800, 800),
+    "large": (1600, 1600),
+}
+
+IMAGE_FORMATS = {
+    "webp": ("WEBP", {"quality": 80, "method": 4}),
+    "jpeg": ("JPEG", {"quality": 82, "optimize": True, "progressive": True}),
+}
+
+
+def render_variants(field_file, sizes, square=False, storage=None):
+    """Save resized copies of field_file in every format.
+
+    Returns ``{size_name: {format: storage_name}}``. Images are fitted
+    inside each size and never scaled up, unless ``square`` is set, in which
+    case they are center-cropped to exactly that size.
+    """
+
+    storage = storage or default_storage
+    stem, _ = os.path.splitext(field_file.name)
+    directory, filename = os.path.split(stem)
+
+    field_file.open("rb")
+    try:
+        with Image.open(field_file) as source:
+            source = ImageOps.exif_transpose(source).convert("RGB")
+    finally:
+        field_file.close()
+
+    variants = {}
+    for name, size in sizes.items():
+        if square:
+            image = ImageOps.fit(source, size, Image.Resampling.LANCZOS)
+        else:
+            image = source.copy()
+            image.thumbnail(size, Image.Resampling.LANCZOS)
+        variants[name] = {}
+        for extension, (image_format, options) in IMAGE_FORMATS.items():
+            buffer = BytesIO()
+            image.save(buffer, image_format, **options)
+            path = os.path.join(directory, "variants", f"{filename}_{name}.{extension}")
+            if storage.exists(path):
+                storage.delete(path)
+            variants[name][extension] = storage.save(
+                path, ContentFile(buffer.getvalue())
+            )
+    return variants
+
+
+def delete_variants(variants, keep=None, storage=None):
+    storage = storage or default_storage
+    keep = {path for formats in (keep or {}).values() for path in formats.values()}
+    for formats in (variants or {}).values():
+        for path in formats.values():
+            if path not in keep:
+                storage.delete(path)
+
+
+class VariantPool:
+    """Bounded thread pool for image processing off the request thread.
+
+    At most ``workers`` jobs run and ``queue_size`` wait; further jobs are
+    dropped with a warning (the regenerate command catches them up). With
+    zero workers jobs run inline, which is what tests and commands use.
+    """
+
+    def __init__(self, workers, queue_size):
+        self.workers = workers
+        self._slots = threading.BoundedSemaphore(workers + queue_size)
+        self._executor = (
+            ThreadPoolExecutor(max_workers=workers, thread_name_prefix="images")
+            if workers
+            else None
+        )
+
+    def submit(self, func, *args):
+        if self._executor is None:
+            self._call(func, *args)
+            return True
+        if not self._slots.acquire(blocking=False):
+            logger.warning("Image queue is full, skipping %s%r", func.__name__, args)
+            return False
+        self._executor.submit(self._run, func, *args)
+        return True
+
+    def _call(self, func, *args):
+        try:
+            func(*args)
+        except Exception:
+            logger.exception("Image job %s%r failed", func.__name__, args)
+
+    def _run(self, func, *args):
+        try:
+            self._call(func, *args)
+        finally:
+            close_old_connections()
+            self._slots.release()
+
+
+variant_pool = VariantPool(settings.IMAGE_WORKERS, settings.IMAGE_QUEUE_SIZE)
+
+
+def generate_post_variants(post_id):
+    """Render the variants of a post image and store their names on the post"""
+
+    from .cache import invalidate_posts
+    from .models import Post
+
+    post = Post.objects.filter(pk=post_id).only("image", "image_variants").first()
+    if post is None:
+        return
+    variants = render_variants(post.image, POST_IMAGE_SIZES) if post.image else {}
+    updated = Post.objects.filter(pk=post_id, image=post.image.name).update(
+        image_variants=variants
+    )
+    if updated:
+        delete_variants(post.image_variants, keep=variants)
+        invalidate_posts()
+    else:
+        delete_variants(variants)
+
+
+class ImageVariantsField(serializers.ReadOnlyField):
+    """Stored variant names rendered as {size: {format: url}}"""
+
+    def to_representation(self, value):
+        request = self.context.get("request")
+        urls = {}
+        for name, formats in (value or {}).items():
+            urls[name] = {}
+            for extension, path in formats.items():
+                url = default_storage.url(path)
+                urls[name][extension] = (
+                    request.build_absolute_uri(url) if request is not None else url
+                )
+        return urls
@@ -0,0 +1,328 @@
+import csv
+import json
+import os
+import sys
+from abc import ABCMeta, abstractmethod
+from collections import Counter
+from contextlib import contextmanager
+from functools import reduce
+from itertools import islice
+from operator import or_
+
+from django.contrib.auth import get_user_model
+from django.core.exceptions import ValidationError
+from django.core.management.base import BaseCommand, CommandError
+from django.core.management.color import no_style
+from django.db import connections, router, transaction
+from django.db.models import Q
+from django.utils.text import slugify
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+FORMATS = ("jsonl", "csv")
+TRUE_VALUES = ("1", "true", "yes", "y", "t")
+
+
+class RowError(Exception):
+    pass
+
+
+def read_rows(stream, format):
+    """Yield (line number, row dict) from a JSONL or CSV stream.
+
+    Rows are read one at a time; a line that is not a JSON object is
+    yielded as a RowError instead of a dict.
+    """
+
+    if format == "csv":
+        reader = csv.DictReader(stream)
+        for row in reader:
+            yield reader.line_num, row
+        return
+    for number, line in enumerate(stream, 1):
+        if not line.strip():
+            continue
+        try:
+            row = json.loads(line)
+        except ValueError as e:
+            yield number, RowError(f"Invalid JSON: {e}")
+            continue
+        if not isinstance(row, dict):
+            row = RowError("Expected a JSON object")
+        yield number, row
+
+
+def batched(iterable, size):
+    iterator = iter(iterable)
+    while batch := list(islice(iterator, size)):
+        yield batch
+
+
+def value(row, name, default=None):
+    """Stripped row value, default when missing or empty"""
+
+    raw = row.get(name)
+    if raw is None:
+        return default
+    if isinstance(raw, str):
+        raw = raw.strip()
+        if not raw:
+            return default
+    return raw
+
+
+def as_int(raw, name):
+    if raw is None:
+        return None
+    try:
+        return int(raw)
+    except (TypeError, ValueError):
+        raise RowError(f"{name}: expected an integer, got {raw!r}")
+
+
+def as_bool(raw, default=True):
+    if raw is None:
+        return default
+    if isinstance(raw, bool):
+        return raw
+    return str(raw).strip().lower() in TRUE_VALUES
+
+
+def as_datetime(raw, name):
+    if raw is None:
+        return None
+    parsed = parse_datetime(str(raw))
+    if parsed is None:
+        raise RowError(f"{name}: expected an ISO 8601 datetime, got {raw!r}")
+    if timezone.is_naive(parsed):
+        parsed = timezone.make_aware(parsed)
+    return parsed
+
+
+def validation_message(error):
+    if hasattr(error, "message_dict"):
+        return "; ".join(
+            f"{field}: {' '.join(messages)}"
+            for field, messages in error.message_dict.items()
+        )
+    return " ".join(error.messages)
+
+
+def resolve_users(keys):
+    """Map author keys (id, email or username) to user ids in one query"""
+
+    keys = {str(key) for key in keys if key is not None}
+    if not keys:
+        return {}
+    ids = [int(key) for key in keys if key.isdigit()]
+    users = get_user_model().objects.filter(
+        Q(email__in=keys) | Q(username__in=keys) | Q(pk__in=ids)
+    )
+    resolved = {}
+    for pk, email, username in users.values_list("pk", "email", "username"):
+        for key in (str(pk), email, username):
+            if key in keys:
+                resolved[key] = pk
+    return resolved
+
+
+def assign_slugs(objects, source, chunk_size=100):
+    """Give objects unique slugs derived from ``source``.
+
+    Existing slugs are read with one query for the exact candidates and,
+    for bases that collide (in the table or within the batch), one prefix
+    query per ``chunk_size`` bases; collisions get a numeric suffix like
+    ``title-2``.
+    """
+
+    if not objects:
+        return
+    model = type(objects[0])
+    max_length = model._meta.get_field("slug").max_length
+    bases = [
+        obj.slug or slugify(getattr(obj, source))[:max_length] or model._meta.model_name
+        for obj in objects
+    ]
+    taken = set(
+        model.objects.filter(slug__in=set(bases)).values_list("slug", flat=True)
+    )
+    counts = Counter(bases)
+    prefixes = sorted(
+        {base[: max_length - 8] for base in bases if base in taken or counts[base] > 1}
+    )
+    for start in range(0, len(prefixes), chunk_size):
+        condition = reduce(
+            or_,
+            (
+                Q(slug__startswith=prefix)
+                for prefix in prefixes[start : start + chunk_size]
+            ),
+        )
+        taken.update(model.objects.filter(condition).values_list("slug", flat=True))
+
+    for obj, base in zip(objects, bases):
+        slug, number = base, 1
+        while slug in taken:
+            number += 1
+            suffix = f"-{number}"
+            slug = base[: max_length - len(suffix)] + suffix
+        obj.slug = slug
+        taken.add(slug)
+
+
+def read_timestamps(obj, row):
+    """Remember the row's created_at/updated_at for keep_timestamps()"""
+
+    created_at = as_datetime(value(row, "created_at"), "created_at")
+    updated_at = as_datetime(value(row, "updated_at"), "updated_at")
+    if created_at or updated_at:
+        obj._imported_timestamps = {
+            "created_at": created_at or updated_at,
+            "updated_at": updated_at or created_at,
+        }
+
+
+def keep_timestamps(objects, fields=("created_at", "updated_at")):
+    """Write imported timestamps that bulk_create replaced with now()"""
+
+    changed = []
+    for obj in objects:
+        imported = getattr(obj, "_imported_timestamps", {})
+        for field, when in imported.items():
+            setattr(obj, field, when)
+        if imported:
+            changed.append(obj)
+    if changed:
+        type(changed[0]).objects.bulk_update(changed, fields)
+
+
+class ImportCommand(BaseCommand, metaclass=ABCMeta):
+    """Streaming bulk import of one model from a JSONL or CSV file.
+
+    Rows are read lazily and handed to :meth:`import_batch` in batches of
+    ``--batch-size``; each batch is validated together, resolves its
+    foreign keys with one query per relation and is written with
+    ``bulk_create`` in its own transaction. Invalid rows are reported with
+    their line number and skipped. :meth:`finish` runs once at the end.
+    """
+
+    model = None
+
+    def add_arguments(self, parser):
+        parser.add_argument("path", help="Input file, or - for stdin.")
+        parser.add_argument(
+            "--format",
+            choices=FORMATS,
+            help="Input format; guessed from the file extension by default.",
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=500,
+            help="Number of rows validated and written per transaction.",
+        )
+
+    @abstractmethod
+    def import_batch(self, rows):
+        """Validate and insert [(line, row)], return (created, [(line, error)])"""
+
+    def finish(self):
+        pass
+
+    @contextmanager
+    def open_input(self, path):
+        if path == "-":
+            yield sys.stdin
+            return
+        try:
+            stream = open(path, newline="", encoding="utf-8-sig")
+        except OSError as e:
+            raise CommandError(f"Cannot open {path}: {e}")
+        with stream:
+            yield stream
+
+    def handle(self, *args, **options):
+        path = options["path"]
+        format = options["format"] or os.path.splitext(path)[1].lstrip(".").lower()
+        if format in ("json", "ndjson"):
+            format = "jsonl"
+        if format not in FORMATS:
+            raise CommandError("Cannot guess the input format, pass --format.")
+        if options["batch_size"] < 1:
+            raise CommandError("--batch-size must be at least 1.")
+
+        self.explicit_ids = False
+        created = skipped = 0
+        with self.open_input(path) as stream:
+            for batch in batched(read_rows(stream, format), options["batch_size"]):
+                rows = []
+                for number, row in batch:
+                    if isinstance(row, RowError):
+                        self.stderr.write(f"Line {number}: {row}")
+                        skipped += 1
+                    else:
+                        rows.append((number, row))
+                with transaction.atomic():
+                    self.taken_ids = self.existing_ids(rows)
+                    count, errors = self.import_batch(rows)
+                created += count
+                skipped += len(errors)
+                for number, message in errors:
+                    self.stderr.write(f"Line {number}: {message}")
+                if options["verbosity"] > 1:
+                    self.stdout.write(f"{created} imported, {skipped} skipped")
+
+        if self.explicit_ids:
+            self.reset_sequence()
+        self.finish()
+        name = str(self.model._meta.verbose_name_plural).lower()
+        self.stdout.write(
+            self.style.SUCCESS(f"Imported {created} {name}, skipped {skipped} rows.")
+        )
+
+    def build_rows(self, rows, build):
+        """Call build(row) for every row, collecting RowError/ValidationError"""
+
+        built, errors = [], []
+        for number, row in rows:
+            try:
+                obj = build(row)
+            except RowError as e:
+                errors.append((number, str(e)))
+            except ValidationError as e:
+                errors.append((number, validation_message(e)))
+            else:
+                built.append(obj)
+        return built, errors
+
+    def existing_ids(self, rows):
+        ids = set()
+        for _, row in rows:
+            try:
+                ids.add(as_int(value(row, "id"), "id"))
+            except RowError:
+                pass
+        ids.discard(None)
+        if not ids:
+            return set()
+        return set(self.model.objects.filter(pk__in=ids).values_list("pk", flat=True))
+
+    def take_id(self, row):
+        """Explicit primary key of a row, refusing ids already in use"""
+
+        pk = as_int(value(row, "id"), "id")
+        if pk is None:
+            return None
+        if pk in self.taken_ids:
+            raise RowError(f"id: {pk} already exists.")
+        self.taken_ids.add(pk)
+        self.explicit_ids = True
+        return pk
+
+    def reset_sequence(self):
+        connection = connections[router.db_for_write(self.model)]
+        statements = connection.ops.sequence_reset_sql(no_style(), [self.model])
+        if statements:
+            with connection.cursor() as cursor:
+                for sql in statements:
+                    cursor.execute(sql)
@@ -0,0 +1,149 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+from django.test.utils import (
+    override_settings,
+    setup_databases,
+    setup_test_environment,
+    teardown_databases,
+    teardown_test_environment,
+)
+
+from apps.main.benchmarking import CASES, Fixture, compare, measure, uncovered_routes
+from apps.main.counters import view_counts
+from apps.main.seeding import seed
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed a throwaway test database and benchmark every API route: p50/p95 "
+        "latency, SQL queries and allocation peak per endpoint, optionally "
+        "compared against a baseline JSON file."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=50)
+        parser.add_argument("--categories", type=int, default=8)
+        parser.add_argument("--posts", type=int, default=500)
+        parser.add_argument("--comments", type=int, default=3000)
+        parser.add_argument("--depth", type=int, default=4)
+        parser.add_argument("--seed", type=int, default=42)
+        parser.add_argument("--iterations", type=int, default=20)
+        parser.add_argument("--warmup", type=int, default=2)
+        parser.add_argument(
+            "--only", help="Only run cases whose label contains this text."
+        )
+        parser.add_argument("--baseline", help="Baseline JSON to compare against.")
+        parser.add_argument(
+            "--save-baseline", help="Write the results to this baseline JSON file."
+        )
+        parser.add_argument(
+            "--tolerance",
+            type=float,
+            default=0.5,
+            help="Allowed relative growth of p50 latency and allocations.",
+        )
+        parser.add_argument(
+            "--slack-ms",
+            type=float,
+            default=2.0,
+            help="Allowed absolute growth of p50 latency.",
+        )
+
+    def handle(self, *args, **options):
+        if options["iterations"] < 1:
+            raise CommandError("--iterations must be at least 1.")
+        missing = uncovered_routes()
+        if missing:
+            raise CommandError(f"No benchmark case for: {', '.join(missing)}")
+        baseline = None
+        if options["baseline"]:
+            try:
+                with open(options["baseline"]) as f:
+                    baseline = json.load(f)
+            except (OSError, ValueError) as e:
+                raise CommandError(f"Cannot read {options['baseline']}: {e}")
+
+        dataset = {
+            name: options[name]
+            for name in ("users", "categories", "posts", "comments", "depth", "seed")
+        }
+        cases = [
+            case
+            for case in CASES
+            if not options["only"] or options["only"] in case.label
+        ]
+
+        setup_test_environment()
+        old_config = setup_databases(verbosity=0, interactive=False)
+        try:
+            with override_settings(INSTRUMENTATION_SAMPLE_RATE=0):
+                results = self.run(dataset, cases, options)
+        finally:
+            view_counts.flush_quietly()
+            teardown_databases(old_config, verbosity=0)
+            teardown_test_environment()
+
+        report = {"dataset": dataset, "results": results}
+        if options["save_baseline"]:
+            with open(options["save_baseline"], "w") as f:
+                json.dump(report, f, indent=2, sort_keys=True)
+                f.write("\n")
+            self.stdout.write(f"Baseline written to {options['save_baseline']}.")
+
+        failures = [
+            f"{label}: status {result['status']}"
+            for label, result in results.items()
+            if result["status"] >= 500
+        ]
+        if baseline is not None:
+            if baseline.get("dataset") != dataset:
+                self.stderr.write(
+                    self.style.WARNING(
+                        "The baseline was recorded with a different dataset."
+                    )
+                )
+            failures += compare(
+                results,
+                baseline.get("results", {}),
+                tolerance=options["tolerance"],
+                slack_ms=options["slack_ms"],
+            )
+        if failures:
+            for failure in failures:
+                self.stderr.write(self.style.ERROR(failure))
+            raise CommandError(f"{len(failures)} benchmark regressions.")
+        self.stdout.write(self.style.SUCCESS(f"Benchmarked {len(results)} cases."))
+
+    def run(self, dataset, cases, options):
+        counts = seed(
+            users=dataset["users"],
+            categories=dataset["categories"],
+            posts=dataset["posts"],
+            comments=dataset["comments"],
+            depth=dataset["depth"],
+            random_seed=dataset["seed"],
+        )
+        self.stdout.write(
+            "Seeded " + ", ".join(f"{count} {name}" for name, count in counts.items())
+        )
+        fixture = Fixture()
+
+        width = max(len(case.label) for case in cases)
+        self.stdout.write(
+            f"{'endpoint':<{width}}  status  p50 ms    p95 ms  queries  alloc KiB"
+        )
+        results = {}
+        for case in cases:
+            result = results[case.label] = measure(
+                case,
+                fixture,
+                iterations=options["iterations"],
+                warmup=options["warmup"],
+            )
+            self.stdout.write(
+                f"{case.label:<{width}}  {result['status']:>6}  "
+                f"{result['p50_ms']:>6.2f}  {result['p95_ms']:>8.2f}  "
+                f"{result['queries']:>7}  {result['alloc_kb']:>9.1f}"
+            )
+        return results
@@ -0,0 +1,104 @@
+import os
+import tempfile
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import (
+    override_settings,
+    setup_databases,
+    setup_test_environment,
+    teardown_databases,
+    teardown_test_environment,
+)
+
+from apps.main.benchmarking import write_throughput
+from apps.main.counters import view_counts
+from apps.main.seeding import seed
+
+
+class Command(BaseCommand):
+    help = (
+        "Seed a throwaway test database with the configured DATABASES profile "
+        "and measure throughput of concurrent reads, view counts and comments. "
+        "Run it once per profile to compare them, e.g. with SQLITE_TUNING=False "
+        "CONN_MAX_AGE=0 for Django's default SQLite settings."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--threads", type=int, default=8)
+        parser.add_argument("--duration", type=float, default=5.0)
+        parser.add_argument("--users", type=int, default=20)
+        parser.add_argument("--posts", type=int, default=200)
+        parser.add_argument("--comments", type=int, default=500)
+        parser.add_argument("--seed", type=int, default=42)
+
+    def handle(self, *args, **options):
+        if options["threads"] < 1 or options["duration"] <= 0:
+            raise CommandError("--threads and --duration must be positive.")
+
+        settings_dict = connection.settings_dict
+        self.stdout.write(self.describe(settings_dict))
+        with tempfile.TemporaryDirectory() as directory:
+            if connection.vendor == "sqlite":
+                # An in-memory test database has no locking to measure
+                settings_dict["TEST"]["NAME"] = os.path.join(directory, "bench.sqlite3")
+            setup_test_environment()
+            old_config = setup_databases(verbosity=0, interactive=False)
+            try:
+                with override_settings(
+                    INSTRUMENTATION_SAMPLE_RATE=0, QUERY_BUDGETS="off"
+                ):
+                    result = self.run(options)
+            finally:
+                view_counts.flush_quietly()
+                teardown_databases(old_config, verbosity=0)
+                teardown_test_environment()
+
+        self.stdout.write(
+            f"{'operation':<10}  {'count':>7}  {'p50 ms':>8}  {'p95 ms':>8}"
+        )
+        for kind, stats in result["kinds"].items():
+            self.stdout.write(
+                f"{kind:<10}  {stats['count']:>7}  "
+                f"{stats['p50_ms']:>8.2f}  {stats['p95_ms']:>8.2f}"
+            )
+        for error, count in sorted(result["errors"].items()):
+            self.stderr.write(self.style.WARNING(f"{count} x {error}"))
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"{result['ops_per_s']} operations/s, {result['completed']} "
+                f"completed, {result['failed']} failed."
+            )
+        )
+
+    @staticmethod
+    def describe(settings_dict):
+        options = settings_dict.get("OPTIONS", {})
+        parts = [
+            settings_dict["ENGINE"].rsplit(".", 1)[-1],
+            f"CONN_MAX_AGE={settings_dict['CONN_MAX_AGE']}",
+        ]
+        if "init_command" in options:
+            parts.append(options["init_command"])
+        if options.get("transaction_mode"):
+            parts.append(f"transaction_mode={options['transaction_mode']}")
+        if "pool" in options:
+            parts.append(f"pool={options['pool']}")
+        return "Profile: " + ", ".join(parts)
+
+    def run(self, options):
+        counts = seed(
+            users=options["users"],
+            categories=4,
+            posts=options["posts"],
+            comments=options["comments"],
+            random_seed=options["seed"],
+        )
+        self.stdout.write(
+            "Seeded " + ", ".join(f"{count} {name}" for name, count in counts.items())
+        )
+        return write_throughput(
+            threads=options["threads"],
+            duration=options["duration"],
+            random_seed=options["seed"],
+        )
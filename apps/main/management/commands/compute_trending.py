@@ -0,0 +1,19 @@
+from django.core.management.base import BaseCommand
+
+from apps.main.trending import compute_scores
+
+
+class Command(BaseCommand):
+    help = "Recompute trending post scores from recent views and comments."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=1000,
+            help="Number of rows read or written per query.",
+        )
+
+    def handle(self, *args, **options):
+        scored = compute_scores(chunk_size=options["chunk_size"])
+        self.stdout.write(self.style.SUCCESS(f"Scored {scored} trending posts."))
@@ -0,0 +1,81 @@
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.main.exporting import (
+    EXPORT_CHUNK_SIZE,
+    PostExportFilter,
+    export_rows,
+    ndjson_lines,
+)
+from apps.main.models import Post
+
+
+class Command(BaseCommand):
+    help = "Export posts, optionally with their comment threads, as NDJSON."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--output", "-o", default="-", help="Output file, or - for stdout."
+        )
+        parser.add_argument("--category", help="Category id.")
+        parser.add_argument("--author", help="Author id.")
+        parser.add_argument("--status", choices=("draft", "published"))
+        parser.add_argument(
+            "--created-after", help="Only posts created at or after this time."
+        )
+        parser.add_argument(
+            "--created-before", help="Only posts created at or before this time."
+        )
+        parser.add_argument(
+            "--comments",
+            action="store_true",
+            help="Include each post's comments as nested threads.",
+        )
+        parser.add_argument(
+            "--chunk-size",
+            type=int,
+            default=EXPORT_CHUNK_SIZE,
+            help="Number of posts fetched per query.",
+        )
+
+    def handle(self, *args, **options):
+        data = {
+            "category": options["category"],
+            "author": options["author"],
+            "status": options["status"],
+            "created_at__gte": options["created_after"],
+            "created_at__lte": options["created_before"],
+        }
+        filterset = PostExportFilter(
+            {name: value for name, value in data.items() if value is not None},
+            queryset=Post.objects.all(),
+        )
+        if not filterset.is_valid():
+            raise CommandError(
+                "; ".join(
+                    f"{name}: {' '.join(errors)}"
+                    for name, errors in filterset.errors.items()
+                )
+            )
+
+        lines = ndjson_lines(
+            export_rows(
+                filterset.qs,
+                comments=options["comments"],
+                chunk_size=options["chunk_size"],
+            )
+        )
+        exported = 0
+        if options["output"] == "-":
+            # Through self.stdout so call_command(stdout=...) captures it
+            for line in lines:
+                self.stdout.write(line.decode(), ending="")
+                exported += 1
+            self.stdout.flush()
+        else:
+            with open(options["output"], "wb") as output:
+                for line in lines:
+                    output.write(line)
+                    exported += 1
+            self.stdout.write(
+                self.style.SUCCESS(f"Exported {exported} posts to {options['output']}.")
+            )
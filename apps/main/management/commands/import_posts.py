@@ -0,0 +1,102 @@
+from django.db.models import Q
+from django.utils.text import slugify
+
+from apps.main.cache import invalidate_posts
+from apps.main.feeds import fan_out
+from apps.main.importing import (
+    ImportCommand,
+    RowError,
+    assign_slugs,
+    keep_timestamps,
+    read_timestamps,
+    resolve_users,
+    value,
+)
+from apps.main.models import Category, Post, make_excerpt
+from apps.main.search import posts_index
+
+
+class Command(ImportCommand):
+    help = (
+        "Bulk import posts from JSONL or CSV. Columns: title, content, author "
+        "(id, email or username), and optionally id, slug, status, category "
+        "(slug or name), created_at and updated_at."
+    )
+    model = Post
+
+    def add_arguments(self, parser):
+        super().add_arguments(parser)
+        parser.add_argument(
+            "--create-categories",
+            action="store_true",
+            help="Create unknown categories instead of skipping their rows.",
+        )
+
+    def handle(self, *args, **options):
+        self.create_categories = options["create_categories"]
+        super().handle(*args, **options)
+
+    def import_batch(self, rows):
+        authors = resolve_users(value(row, "author") for _, row in rows)
+        categories = self.resolve_categories(value(row, "category") for _, row in rows)
+        posts, errors = self.build_rows(
+            rows, lambda row: self.build_post(row, authors, categories)
+        )
+        assign_slugs(posts, "title")
+        posts = Post.objects.bulk_create(posts)
+        keep_timestamps(posts)
+        posts_index.update(posts)
+        fan_out(post.pk for post in posts)
+        return len(posts), errors
+
+    def finish(self):
+        invalidate_posts()
+
+    def resolve_categories(self, keys):
+        """Map category keys (slug or name) to ids in one query"""
+
+        keys = {str(key) for key in keys if key is not None}
+        if not keys:
+            return {}
+        resolved = self._find_categories(keys)
+        missing = keys - resolved.keys()
+        if missing and self.create_categories:
+            Category.objects.bulk_create(
+                [Category(name=name, slug=slugify(name)) for name in missing],
+                ignore_conflicts=True,
+            )
+            resolved.update(self._find_categories(missing))
+        return resolved
+
+    def _find_categories(self, keys):
+        resolved = {}
+        categories = Category.objects.filter(Q(slug__in=keys) | Q(name__in=keys))
+        for pk, slug, name in categories.values_list("pk", "slug", "name"):
+            for key in (slug, name):
+                if key in keys:
+                    resolved[key] = pk
+        return resolved
+
+    def build_post(self, row, authors, categories):
+        author = value(row, "author")
+        if author is None:
+            raise RowError("author: This field is required.")
+        if str(author) not in authors:
+            raise RowError(f"author: Unknown user {author!r}.")
+        category = value(row, "category")
+        if category is not None and str(category) not in categories:
+            raise RowError(f"category: Unknown category {category!r}.")
+
+        post = Post(
+            pk=self.take_id(row),
+            title=value(row, "title", ""),
+            slug=value(row, "slug", ""),
+            content=value(row, "content", ""),
+            status=value(row, "status", "published"),
+            author_id=authors[str(author)],
+            category_id=categories.get(str(category)),
+        )
+        post.clean_fields(exclude=["author", "category", "slug"])
+        post.excerpt = make_excerpt(post.content)
+        read_timestamps(post, row)
+        return post
@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+from django.db import connections, transaction
+
+from apps.comments.search import comments_index
+from apps.main.search import posts_index
+
+
+class Command(BaseCommand):
+    help = "Rebuild the full-text search index for posts and comments."
+
+    def add_arguments(self, parser):
+        parser.add_argument("--database", default="default")
+
+    def handle(self, *args, **options):
+        connection = connections[options["database"]]
+        if not posts_index.supported(connection):
+            self.stdout.write(
+                self.style.WARNING(
+                    f"Full-text search is not supported on {connection.vendor}."
+                )
+            )
+            return
+        with transaction.atomic(using=options["database"]):
+            posts_index.rebuild(connection)
+            comments_index.rebuild(connection)
+        self.stdout.write(self.style.SUCCESS("Search index rebuilt."))
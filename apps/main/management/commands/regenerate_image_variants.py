@@ -0,0 +1,37 @@
+from django.core.management.base import BaseCommand
+
+from apps.main.images import generate_post_variants
+from apps.main.models import Post
+
+
+class Command(BaseCommand):
+    help = "Render resized WebP/JPEG variants for existing post images."
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--missing",
+            action="store_true",
+            help="Only process posts that have no variants yet.",
+        )
+        parser.add_argument("--post", type=int, help="Only process this post id.")
+
+    def handle(self, *args, **options):
+        posts = Post.objects.exclude(image="").exclude(image__isnull=True)
+        if options["missing"]:
+            posts = posts.filter(image_variants={})
+        if options["post"]:
+            posts = posts.filter(pk=options["post"])
+
+        done = failed = 0
+        for post_id in posts.values_list("pk", flat=True).iterator(chunk_size=500):
+            try:
+                generate_post_variants(post_id)
+                done += 1
+            except Exception as exc:
+                failed += 1
+                self.stderr.write(f"Post {post_id}: {exc}")
+        self.stdout.write(
+            self.style.SUCCESS(
+                f"Regenerated variants for {done} posts ({failed} failed)."
+            )
+        )
@@ -0,0 +1,61 @@
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.main.seeding import SEED_PASSWORD, seed
+
+
+class Command(BaseCommand):
+    help = (
+        "Bulk create a reproducible synthetic dataset of users, categories, "
+        "posts, comment threads and subscriptions."
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument("--users", type=int, default=50)
+        parser.add_argument("--categories", type=int, default=8)
+        parser.add_argument("--posts", type=int, default=500)
+        parser.add_argument("--comments", type=int, default=3000)
+        parser.add_argument(
+            "--depth", type=int, default=4, help="Deepest reply level of threads."
+        )
+        parser.add_argument(
+            "--subscriptions",
+            type=int,
+            default=3,
+            help="Categories each user subscribes to.",
+        )
+        parser.add_argument(
+            "--days", type=int, default=90, help="Age of the oldest post."
+        )
+        parser.add_argument(
+            "--prefix", default="seed", help="Prefix of usernames and slugs."
+        )
+        parser.add_argument(
+            "--seed", type=int, default=42, help="Random seed of the dataset."
+        )
+
+    def handle(self, *args, **options):
+        if options["users"] < 1:
+            raise CommandError("--users must be at least 1.")
+        prefix = options["prefix"]
+        if get_user_model().objects.filter(username=f"{prefix}0").exists():
+            raise CommandError(
+                f"The {prefix!r} dataset already exists, pass another --prefix."
+            )
+
+        counts = seed(
+            users=options["users"],
+            categories=options["categories"],
+            posts=options["posts"],
+            comments=options["comments"],
+            depth=options["depth"],
+            subscriptions=options["subscriptions"],
+            days=options["days"],
+            prefix=prefix,
+            random_seed=options["seed"],
+        )
+        summary = ", ".join(f"{count} {name}" for name, count in counts.items())
+        self.stdout.write(self.style.SUCCESS(f"Seeded {summary}."))
+        self.stdout.write(
+            f"Log in as {prefix}0@example.com (staff) with password {SEED_PASSWORD}."
+        )
@@ -0,0 +1,24 @@
+from django.db import migrations
+
+
+def create_index(apps, schema_editor):
+    from apps.main.search import posts_index
+
+    posts_index.create(schema_editor.connection)
+
+
+def drop_index(apps, schema_editor):
+    from apps.main.search import posts_index
+
+    posts_index.drop(schema_editor.connection)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("main", "0002_comment_counters"),
+    ]
+
+    operations = [
+        migrations.RunPython(create_index, drop_index),
+    ]
@@ -0,0 +1,80 @@
+# Generated by Django 5.2.6 on 2026-10-18 03:00
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ("main", "0003_post_search_index"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="TrendingScore",
+            fields=[
+                (
+                    "post",
+                    models.OneToOneField(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        primary_key=True,
+                        related_name="trending_score",
+                        serialize=False,
+                        to="main.post",
+                    ),
+                ),
+                ("score", models.FloatField(default=0)),
+                ("updated_at", models.DateTimeField()),
+            ],
+            options={
+                "verbose_name": "Trending score",
+                "verbose_name_plural": "Trending scores",
+                "db_table": "trending_scores",
+                "ordering": ("-score",),
+                "indexes": [
+                    models.Index(fields=["-score"], name="trending_sc_score_14c32f_idx")
+                ],
+            },
+        ),
+        migrations.CreateModel(
+            name="PostActivity",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("bucket", models.DateTimeField()),
+                ("views", models.PositiveIntegerField(default=0)),
+                ("comments", models.PositiveIntegerField(default=0)),
+                (
+                    "post",
+                    models.ForeignKey(
+                        on_delete=django.db.models.deletion.CASCADE,
+                        related_name="activity",
+                        to="main.post",
+                    ),
+                ),
+            ],
+            options={
+                "verbose_name": "Post activity",
+                "verbose_name_plural": "Post activity",
+                "db_table": "post_activity",
+                "indexes": [
+                    models.Index(
+                        fields=["bucket"], name="post_activi_bucket_1dcadc_idx"
+                    )
+                ],
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("post", "bucket"), name="post_activity_unique_bucket"
+                    )
+                ],
+            },
+        ),
+    ]
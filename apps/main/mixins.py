@@ -0,0 +1,74 @@
+import hashlib
+
+from django.utils.cache import get_conditional_response
+from django.utils.http import quote_etag
+from rest_framework import status
+from rest_framework.response import Response
+
+
+def version_etag(version):
+    """ETag of a version row"""
+
+    key = "|".join(str(version[name]) for name in sorted(version))
+    return quote_etag(hashlib.md5(key.encode()).hexdigest())
+
+
+def set_validator_headers(response, version):
+    response["ETag"] = version_etag(version)
+    return response
+
+
+class ConditionalRetrieveMixin:
+    """ETag support for retrieve views.
+
+    The ETag comes from a ``values()`` query over ``etag_fields`` (and
+    ``get_etag_annotations()``), so ``If-None-Match`` is answered with 304
+    without loading or serializing the object. No Last-Modified is sent:
+    versions include counters such as ``comments_count`` that change
+    without any timestamp moving.
+    """
+
+    etag_fields = ("updated_at",)
+
+    def get_etag_annotations(self):
+        return {}
+
+    def get_version(self):
+        """Version row of the requested object or None when it does not exist"""
+
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        annotations = self.get_etag_annotations()
+        return (
+            self.filter_queryset(self.get_queryset())
+            .filter(**{self.lookup_field: self.kwargs[lookup_url_kwarg]})
+            .annotate(**annotations)
+            .values("pk", *self.etag_fields, *annotations)
+            .first()
+        )
+
+    def get_etag(self, version):
+        return version_etag(version)
+
+    def get_not_modified_response(self, request, version):
+        if version is None:
+            return None
+        response = get_conditional_response(request, etag=self.get_etag(version))
+        if response is None:
+            return None
+        return self.set_validators(Response(status=response.status_code), version)
+
+    def set_validators(self, response, version):
+        if version is not None and response.status_code in (
+            status.HTTP_200_OK,
+            status.HTTP_304_NOT_MODIFIED,
+        ):
+            set_validator_headers(response, version)
+        return response
+
+    def retrieve(self, request, *args, **kwargs):
+        version = self.get_version()
+        not_modified = self.get_not_modified_response(request, version)
+        if not_modified is not None:
+            return not_modified
+        response = super().retrieve(request, *args, **kwargs)
+        return self.set_validators(response, version)
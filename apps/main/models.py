@@ -1,7 +1,39 @@
 from django.db import models
+from django.db.models import Count, Q
 from django.conf import settings
 from django.utils.text import slugify
 from django.urls import reverse
+from .counters import view_counts
+
+EXCERPT_LENGTH = 200
+
+# Post columns only changed by F() updates of the counters, left out of full
+# saves so a loaded post cannot write back stale counts
+COUNTER_FIELDS = ("views_count", "comments_count")
+
+
+def make_excerpt(content):
+    if len(content) > EXCERPT_LENGTH:
+        return content[:EXCERPT_LENGTH] + "..."
+    return content
+
+
+class CategoryQuerySet(models.QuerySet):
+    def with_posts_count(self):
+        """Annotate published posts count in the same query"""
+
+        return self.annotate(
+            published_posts_count=Count("posts", filter=Q(posts__status="published"))
+        )
+
+
+class PostQuerySet(models.QuerySet):
+    def visible_to(self, user):
+        """Published posts plus the user's own drafts"""
+
+        if user.is_authenticated:
+            return self.filter(Q(author=user) | Q(status="published"))
+        return self.filter(status="published")
 
 
 class Category(models.Model):
@@ -9,6 +41,9 @@ class Category(models.Model):
     slug = models.SlugField(max_length=100, unique=True, blank=True)
     description = models.TextField(blank=True)
     created_at = models.DateTimeField(auto_now_add=True)
+    subscribers_count = models.PositiveIntegerField(default=0, editable=False)
+
+    objects = CategoryQuerySet.as_manager()
 
     class Meta:
         db_table = "categories"
@@ -33,7 +68,11 @@ class Post(models.Model):
     title = models.CharField(max_length=100)
     slug = models.SlugField(max_length=100, unique=True, blank=True)
     content = models.TextField()
+    excerpt = models.CharField(
+        max_length=EXCERPT_LENGTH + 3, blank=True, editable=False
+    )
     image = models.ImageField(upload_to="posts/", null=True, blank=True)
+    image_variants = models.JSONField(default=dict, blank=True, editable=False)
     status = models.CharField(
         max_length=10, choices=STATUS_CHOICES, default="published"
     )
@@ -50,6 +89,9 @@ class Post(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     views_count = models.PositiveIntegerField(default=0)
+    comments_count = models.PositiveIntegerField(default=0)
+
+    objects = PostQuerySet.as_manager()
 
     class Meta:
         db_table = "posts"
@@ -66,22 +108,149 @@ class Post(models.Model):
     def __str__(self):
         return str(self.title)
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_image = instance.__dict__.get("image")
+        instance._loaded_feed_key = (
+            instance.__dict__.get("status"),
+            instance.__dict__.get("category_id"),
+        )
+        return instance
+
     def save(self, *args, **kwargs):
         if not self.slug:
             self.slug = slugify(self.title)
+        update_fields = kwargs.get("update_fields")
+        if update_fields is None and not self._state.adding:
+            deferred = self.get_deferred_fields()
+            update_fields = kwargs["update_fields"] = [
+                field.name
+                for field in self._meta.concrete_fields
+                if not field.primary_key
+                and field.attname not in deferred
+                and field.name not in COUNTER_FIELDS
+            ]
+        if update_fields is None or "content" in update_fields:
+            self.excerpt = make_excerpt(self.content)
+            if update_fields is not None:
+                kwargs["update_fields"] = {*update_fields, "excerpt"}
         super().save(*args, **kwargs)
 
     def get_absolute_url(self):
         return reverse("posts:detail", kwargs={"slug": self.slug})
 
-    @property
-    def comments_count(self):
-        """Post comments count"""
-
-        return self.comments.filter(is_active=True).count()
-
     def increase_views_count(self):
-        """Post views count"""
+        """Post views count, buffered and written in batches"""
 
+        view_counts.add(self.pk)
         self.views_count += 1
-        self.save(update_fields=["views_count"])
+
+    async def aincrease_views_count(self):
+        await view_counts.aadd(self.pk)
+        self.views_count += 1
+
+
+class PostActivity(models.Model):
+    """Views and new comments of a post within one hour bucket"""
+
+    post = models.ForeignKey("Post", on_delete=models.CASCADE, related_name="activity")
+    bucket = models.DateTimeField()
+    views = models.PositiveIntegerField(default=0)
+    comments = models.PositiveIntegerField(default=0)
+
+    class Meta:
+        db_table = "post_activity"
+        verbose_name = "Post activity"
+        verbose_name_plural = "Post activity"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["post", "bucket"], name="post_activity_unique_bucket"
+            ),
+        ]
+        indexes = [
+            models.Index(fields=["bucket"]),
+        ]
+
+    def __str__(self):
+        return f"{self.post_id} @ {self.bucket:%Y-%m-%d %H:00}"
+
+
+class TrendingScore(models.Model):
+    """Time-decayed popularity of a published post"""
+
+    post = models.OneToOneField(
+        "Post",
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name="trending_score",
+    )
+    score = models.FloatField(default=0)
+    updated_at = models.DateTimeField()
+
+    class Meta:
+        db_table = "trending_scores"
+        ordering = ("-score",)
+        verbose_name = "Trending score"
+        verbose_name_plural = "Trending scores"
+        indexes = [
+            models.Index(fields=["-score"]),
+        ]
+
+    def __str__(self):
+        return f"{self.post_id}: {self.score:.2f}"
+
+
+class CategorySubscription(models.Model):
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name="category_subscriptions",
+    )
+    category = models.ForeignKey(
+        "Category", on_delete=models.CASCADE, related_name="subscriptions"
+    )
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = "category_subscriptions"
+        ordering = ("-created_at",)
+        verbose_name = "Category subscription"
+        verbose_name_plural = "Category subscriptions"
+        constraints = [
+            models.UniqueConstraint(
+                fields=["user", "category"], name="category_subscription_unique"
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.user_id} -> {self.category_id}"
+
+
+class FeedEntry(models.Model):
+    """A published post in a subscriber's precomputed timeline.
+
+    ``created_at`` copies the post's so a page of the feed is one range scan
+    of the (user, -created_at, -post) index.
+    """
+
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL, on_delete=models.CASCADE, related_name="feed"
+    )
+    post = models.ForeignKey("Post", on_delete=models.CASCADE, related_name="+")
+    category = models.ForeignKey("Category", on_delete=models.CASCADE, related_name="+")
+    created_at = models.DateTimeField()
+
+    class Meta:
+        db_table = "feed_entries"
+        verbose_name = "Feed entry"
+        verbose_name_plural = "Feed entries"
+        constraints = [
+            models.UniqueConstraint(fields=["user", "post"], name="feed_entry_unique"),
+        ]
+        indexes = [
+            models.Index(fields=["user", "-created_at", "-post"]),
+        ]
+
+    def __str__(self):
+        return f"{self.user_id}: {self.post_id}"
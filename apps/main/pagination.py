@@ -0,0 +1,159 @@
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from datetime import datetime
+from urllib import parse
+
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import remove_query_param, replace_query_param
+
+
+class KeysetPagination(BasePagination):
+    """Cursor pagination keyed on (-created_at, -id).
+
+    Pages are selected with a ``WHERE (created_at, id) < cursor`` range on
+    the created_at indexes instead of OFFSET, so any page costs the same and
+    no COUNT(*) is run. Cursors are opaque and stay valid as rows are added.
+    """
+
+    page_size = api_settings.PAGE_SIZE
+    cursor_query_param = "cursor"
+    invalid_cursor_message = "Invalid cursor"
+
+    def paginate_queryset(self, queryset, request, view=None):
+        return self.build_page(list(self.get_window(queryset, request)))
+
+    def get_window(self, queryset, request, key_fields=("created_at", "pk")):
+        """Filter and slice the queryset to the rows of the requested page"""
+
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+        self.position, self.reverse = self.decode_cursor(request)
+        return self.window(queryset, key_fields)
+
+    def window(self, queryset, key_fields=("created_at", "pk")):
+        """Rows of queryset past the decoded cursor, keyed on key_fields"""
+
+        created_field, pk_field = key_fields
+        if self.position is not None:
+            created_at, pk = self.position
+            direction = "gt" if self.reverse else "lt"
+            queryset = queryset.filter(
+                Q(**{f"{created_field}__{direction}": created_at})
+                | Q(**{created_field: created_at, f"{pk_field}__{direction}": pk})
+            )
+        if self.reverse:
+            queryset = queryset.order_by(created_field, pk_field)
+        else:
+            queryset = queryset.order_by(f"-{created_field}", f"-{pk_field}")
+        return queryset[: self.page_size + 1]
+
+    def build_page(self, rows):
+        has_more = len(rows) > self.page_size
+        page = rows[: self.page_size]
+        if self.reverse:
+            page.reverse()
+
+        self.next_position = self.previous_position = None
+        if self.reverse:
+            if page:
+                self.next_position = self.key(page[-1])
+                if has_more:
+                    self.previous_position = self.key(page[0])
+            else:
+                self.next_position = self.position
+        else:
+            if has_more:
+                self.next_position = self.key(page[-1])
+            if self.position is not None:
+                self.previous_position = self.key(page[0]) if page else self.position
+        return page
+
+    def get_paginated_response(self, data):
+        return Response(
+            {
+                "next": self.get_next_link(),
+                "previous": self.get_previous_link(),
+                "results": data,
+            }
+        )
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            "type": "object",
+            "required": ["results"],
+            "properties": {
+                "next": {"type": "string", "nullable": True, "format": "uri"},
+                "previous": {"type": "string", "nullable": True, "format": "uri"},
+                "results": schema,
+            },
+        }
+
+    def get_next_link(self):
+        if self.next_position is None:
+            return None
+        return self.encode_cursor(self.next_position, reverse=False)
+
+    def get_previous_link(self):
+        if self.previous_position is None:
+            return None
+        return self.encode_cursor(self.previous_position, reverse=True)
+
+    @staticmethod
+    def key(obj):
+        return obj.created_at, obj.pk
+
+    @classmethod
+    def requested(cls, request):
+        params = request.query_params
+        return cls.cursor_query_param in params or params.get("pagination") == "cursor"
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None, False
+        try:
+            querystring = urlsafe_b64decode(encoded.encode("ascii")).decode("ascii")
+            tokens = parse.parse_qs(querystring, keep_blank_values=True)
+            created_at, pk = tokens["p"][0].split("|")
+            position = datetime.fromisoformat(created_at), int(pk)
+            reverse = bool(int(tokens.get("r", ["0"])[0]))
+        except (TypeError, ValueError, KeyError, UnicodeError):
+            raise NotFound(self.invalid_cursor_message)
+        return position, reverse
+
+    def encode_cursor(self, position, reverse):
+        created_at, pk = position
+        tokens = {"p": f"{created_at.isoformat()}|{pk}"}
+        if reverse:
+            tokens["r"] = "1"
+        encoded = urlsafe_b64encode(parse.urlencode(tokens).encode("ascii")).decode(
+            "ascii"
+        )
+        url = remove_query_param(self.base_url, "pagination")
+        return replace_query_param(url, self.cursor_query_param, encoded)
+
+
+class OptionalCursorPagination(PageNumberPagination):
+    """Page numbers by default, keyset pages with ``?pagination=cursor``.
+
+    Page-number mode keeps ``count`` for clients that need totals; cursor
+    mode is selected by the ``pagination=cursor`` flag or any ``cursor``
+    parameter and always orders by newest first.
+    """
+
+    cursor_class = KeysetPagination
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.cursor = None
+        if self.cursor_class.requested(request):
+            self.cursor = self.cursor_class()
+            return self.cursor.paginate_queryset(queryset, request, view)
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if self.cursor is not None:
+            return self.cursor.get_paginated_response(data)
+        return super().get_paginated_response(data)
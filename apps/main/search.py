@@ -0,0 +1,196 @@
+import re
+
+from django.db import connections, router
+from django.db.models import FloatField, Value
+from django.db.models.expressions import RawSQL
+from rest_framework import filters
+
+WEIGHT_LABELS = "ABCD"
+
+
+class SearchIndex:
+    """Full-text index kept in a side table next to the model table.
+
+    SQLite uses an FTS5 virtual table keyed by rowid, PostgreSQL a table of
+    weighted ``tsvector`` documents with a GIN index. Both are written from
+    model signals and queried through :meth:`filter`, which matches every
+    term as a prefix and annotates ``search_rank`` (higher is better).
+    """
+
+    vendors = ("sqlite", "postgresql")
+
+    def __init__(self, model_label, table, columns, weights):
+        self.model_label = model_label
+        self.table = table
+        self.columns = columns
+        self.weights = weights
+
+    @property
+    def model(self):
+        from django.apps import apps
+
+        return apps.get_model(self.model_label)
+
+    def supported(self, connection):
+        return connection.vendor in self.vendors
+
+    def _source(self, connection):
+        qn = connection.ops.quote_name
+        meta = self.model._meta
+        return qn(meta.db_table), qn(meta.pk.column)
+
+    def _document(self, columns):
+        return " || ".join(
+            f"setweight(to_tsvector('simple', coalesce({column}, '')), "
+            f"'{WEIGHT_LABELS[position]}')"
+            for position, column in enumerate(columns)
+        )
+
+    def create(self, connection):
+        if not self.supported(connection):
+            return
+        source, pk = self._source(connection)
+        with connection.cursor() as cursor:
+            if connection.vendor == "sqlite":
+                cursor.execute(
+                    f"CREATE VIRTUAL TABLE {self.table} USING fts5("
+                    f"{', '.join(self.columns)}, "
+                    f"tokenize='unicode61 remove_diacritics 2')"
+                )
+            else:
+                cursor.execute(
+                    f"CREATE TABLE {self.table} ("
+                    f"id bigint PRIMARY KEY REFERENCES {source} ({pk}) "
+                    f"ON DELETE CASCADE DEFERRABLE INITIALLY DEFERRED, "
+                    f"document tsvector NOT NULL)"
+                )
+                cursor.execute(
+                    f"CREATE INDEX {self.table}_document_idx "
+                    f"ON {self.table} USING GIN (document)"
+                )
+        self.rebuild(connection)
+
+    def drop(self, connection):
+        if not self.supported(connection):
+            return
+        with connection.cursor() as cursor:
+            cursor.execute(f"DROP TABLE IF EXISTS {self.table}")
+
+    def rebuild(self, connection):
+        """Reindex every row of the source table"""
+
+        if not self.supported(connection):
+            return
+        source, pk = self._source(connection)
+        columns = ", ".join(self.columns)
+        with connection.cursor() as cursor:
+            cursor.execute(f"DELETE FROM {self.table}")
+            if connection.vendor == "sqlite":
+                cursor.execute(
+                    f"INSERT INTO {self.table} (rowid, {columns}) "
+                    f"SELECT {pk}, {columns} FROM {source}"
+                )
+            else:
+                cursor.execute(
+                    f"INSERT INTO {self.table} (id, document) "
+                    f"SELECT {pk}, {self._document(self.columns)} FROM {source}"
+                )
+
+    def update(self, instances, using=None):
+        """Write the index rows for the given model instances"""
+
+        connection = connections[using or router.db_for_write(self.model)]
+        if not self.supported(connection) or not instances:
+            return
+        rows = [
+            [instance.pk, *(getattr(instance, column) for column in self.columns)]
+            for instance in instances
+        ]
+        placeholders = ", ".join(["%s"] * len(self.columns))
+        with connection.cursor() as cursor:
+            if connection.vendor == "sqlite":
+                cursor.executemany(
+                    f"DELETE FROM {self.table} WHERE rowid = %s",
+                    [row[:1] for row in rows],
+                )
+                cursor.executemany(
+                    f"INSERT INTO {self.table} (rowid, {', '.join(self.columns)}) "
+                    f"VALUES (%s, {placeholders})",
+                    rows,
+                )
+            else:
+                cursor.executemany(
+                    f"INSERT INTO {self.table} (id, document) "
+                    f"VALUES (%s, {self._document(['%s'] * len(self.columns))}) "
+                    f"ON CONFLICT (id) DO UPDATE SET document = EXCLUDED.document",
+                    rows,
+                )
+
+    def remove(self, pks, using=None):
+        connection = connections[using or router.db_for_write(self.model)]
+        if not self.supported(connection):
+            return
+        key = "rowid" if connection.vendor == "sqlite" else "id"
+        with connection.cursor() as cursor:
+            cursor.executemany(
+                f"DELETE FROM {self.table} WHERE {key} = %s", [[pk] for pk in pks]
+            )
+
+    def filter(self, queryset, query):
+        """Restrict queryset to rows matching every term, annotate search_rank"""
+
+        terms = re.findall(r"\w+", query)
+        if not terms:
+            return queryset.none().annotate(search_rank=Value(0.0, FloatField()))
+        connection = connections[queryset.db]
+        source, pk = self._source(connection)
+        if connection.vendor == "sqlite":
+            match = " ".join(f'"{term}"*' for term in terms)
+            weights = ", ".join(str(weight) for weight in self.weights)
+            matching = RawSQL(
+                f"SELECT rowid FROM {self.table} WHERE {self.table} MATCH %s", [match]
+            )
+            rank = RawSQL(
+                f"SELECT -bm25({self.table}, {weights}) FROM {self.table} "
+                f"WHERE {self.table} MATCH %s AND rowid = {source}.{pk}",
+                [match],
+                output_field=FloatField(),
+            )
+        else:
+            tsquery = " & ".join(f"{term}:*" for term in terms)
+            matching = RawSQL(
+                f"SELECT id FROM {self.table} "
+                f"WHERE document @@ to_tsquery('simple', %s)",
+                [tsquery],
+            )
+            rank = RawSQL(
+                f"SELECT ts_rank(document, to_tsquery('simple', %s)) "
+                f"FROM {self.table} WHERE id = {source}.{pk}",
+                [tsquery],
+                output_field=FloatField(),
+            )
+        return queryset.filter(pk__in=matching).annotate(search_rank=rank)
+
+
+class FullTextSearchFilter(filters.SearchFilter):
+    """SearchFilter backed by the view's ``search_index``.
+
+    Results are ordered by relevance unless the client asks for an explicit
+    ordering; backends without an index fall back to ``search_fields``.
+    """
+
+    def filter_queryset(self, request, queryset, view):
+        index = getattr(view, "search_index", None)
+        terms = self.get_search_terms(request)
+        if not terms:
+            return queryset
+        if index is None or not index.supported(connections[queryset.db]):
+            return super().filter_queryset(request, queryset, view)
+
+        queryset = index.filter(queryset, " ".join(terms))
+        if not request.query_params.get(filters.OrderingFilter.ordering_param):
+            queryset = queryset.order_by("-search_rank", "-pk")
+        return queryset
+
+
+posts_index = SearchIndex("main.Post", "posts_search", ("title", "content"), (10, 1))
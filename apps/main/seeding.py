@@ -0,0 +1,208 @@
+import random
+from collections import Counter
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.db import connections, router, transaction
+from django.utils import timezone
+
+from apps.comments.counters import recount_comments, recount_posts
+from apps.comments.models import MAX_DEPTH, Comment
+from apps.comments.search import comments_index
+from .cache import invalidate_posts
+from .feeds import fan_out
+from .importing import batched
+from .models import Category, CategorySubscription, Post, make_excerpt
+from .search import posts_index
+
+SEED_PASSWORD = "seed-password-123"
+BATCH_SIZE = 1000
+
+WORDS = (
+    "alpha beta cache query index thread reply django python feed async "
+    "stream token latency budget cursor category post comment review "
+    "release server client worker batch signal model view render page "
+    "search vector merge timeline buffer queue pool lock commit schema"
+).split()
+
+
+def sentence(rng, words):
+    return " ".join(rng.choice(WORDS) for _ in range(words)).capitalize()
+
+
+def paragraphs(rng, count):
+    return "\n\n".join(
+        ". ".join(sentence(rng, rng.randint(6, 14)) for _ in range(rng.randint(3, 6)))
+        + "."
+        for _ in range(count)
+    )
+
+
+def level_sizes(total, depth):
+    """Split total comments over depth + 1 levels, halving at each level"""
+
+    weights = [2 ** (depth - level) for level in range(depth + 1)]
+    sizes = [total * weight // sum(weights) for weight in weights]
+    sizes[0] += total - sum(sizes)
+    return sizes
+
+
+def seed(
+    users=50,
+    categories=8,
+    posts=500,
+    comments=3000,
+    depth=4,
+    subscriptions=3,
+    days=90,
+    prefix="seed",
+    random_seed=42,
+):
+    """Bulk create a reproducible synthetic dataset, returns created counts.
+
+    The same arguments always produce the same rows: users ``<prefix>0``...
+    (``<prefix>0`` is staff, every password is SEED_PASSWORD), categories,
+    posts spread over ``days`` with 10% drafts, and comment threads up to
+    ``depth`` levels deep. Counters, search indexes and feeds are rebuilt.
+    """
+
+    rng = random.Random(random_seed)
+    now = timezone.now().replace(microsecond=0)
+    depth = min(depth, MAX_DEPTH)
+    User = get_user_model()
+    connection = connections[router.db_for_write(Post)]
+
+    with transaction.atomic():
+        password = make_password(SEED_PASSWORD)
+        user_objs = User.objects.bulk_create(
+            [
+                User(
+                    username=f"{prefix}{i}",
+                    email=f"{prefix}{i}@example.com",
+                    first_name=sentence(rng, 1),
+                    last_name=sentence(rng, 1),
+                    password=password,
+                    is_staff=i == 0,
+                )
+                for i in range(users)
+            ],
+            batch_size=BATCH_SIZE,
+        )
+        user_ids = [user.pk for user in user_objs]
+
+        category_ids = [
+            category.pk
+            for category in Category.objects.bulk_create(
+                [
+                    Category(
+                        name=f"{prefix.capitalize()} category {i}",
+                        slug=f"{prefix}-category-{i}",
+                        description=sentence(rng, 12),
+                    )
+                    for i in range(categories)
+                ]
+            )
+        ]
+
+        post_objs = []
+        for i in range(posts):
+            content = paragraphs(rng, rng.randint(2, 5))
+            post = Post(
+                title=sentence(rng, rng.randint(3, 8))[:100],
+                slug=f"{prefix}-post-{i}",
+                content=content,
+                excerpt=make_excerpt(content),
+                status="draft" if rng.random() < 0.1 else "published",
+                author_id=rng.choice(user_ids),
+                category_id=(
+                    rng.choice(category_ids)
+                    if category_ids and rng.random() < 0.9
+                    else None
+                ),
+                views_count=int(rng.paretovariate(1.2) * 10),
+            )
+            post.created_at = post.updated_at = now - timedelta(
+                seconds=rng.randint(0, days * 86400)
+            )
+            post_objs.append(post)
+        post_objs = Post.objects.bulk_create(post_objs, batch_size=BATCH_SIZE)
+        # auto_now(_add) replaced the spread timestamps
+        Post.objects.bulk_update(
+            post_objs, ["created_at", "updated_at"], batch_size=BATCH_SIZE
+        )
+        published = [post for post in post_objs if post.status == "published"]
+
+        comment_count = 0
+        parents = []
+        for level, size in enumerate(level_sizes(comments if published else 0, depth)):
+            if level and not parents:
+                break
+            created = []
+            for _ in range(size):
+                if level:
+                    parent = rng.choice(parents)
+                    post_id, after = parent.post_id, parent.created_at
+                else:
+                    parent = None
+                    post = rng.choice(published)
+                    post_id, after = post.pk, post.created_at
+                comment = Comment(
+                    post_id=post_id,
+                    author_id=rng.choice(user_ids),
+                    parent=parent,
+                    content=sentence(rng, rng.randint(5, 30)),
+                    is_active=rng.random() > 0.02,
+                    depth=level,
+                )
+                comment.created_at = comment.updated_at = min(
+                    after + timedelta(seconds=rng.randint(60, 3 * 86400)), now
+                )
+                created.append(comment)
+            created = Comment.objects.bulk_create(created, batch_size=BATCH_SIZE)
+            for comment in created:
+                comment.path = comment.build_path(
+                    comment.parent.path if comment.parent else ""
+                )
+            Comment.objects.bulk_update(
+                created, ["path", "created_at", "updated_at"], batch_size=BATCH_SIZE
+            )
+            comment_count += len(created)
+            parents = created
+
+        subscribed = set()
+        for user_id in user_ids:
+            for category_id in rng.sample(
+                category_ids, min(subscriptions, len(category_ids))
+            ):
+                subscribed.add((user_id, category_id))
+        CategorySubscription.objects.bulk_create(
+            [
+                CategorySubscription(user_id=user_id, category_id=category_id)
+                for user_id, category_id in sorted(subscribed)
+            ],
+            batch_size=BATCH_SIZE,
+        )
+        for category_id, count in Counter(
+            category_id for _, category_id in subscribed
+        ).items():
+            Category.objects.filter(pk=category_id).update(subscribers_count=count)
+
+        recount_posts()
+        recount_comments()
+        posts_index.rebuild(connection)
+        comments_index.rebuild(connection)
+        feed_entries = sum(
+            fan_out(post.pk for post in chunk)
+            for chunk in batched(published, BATCH_SIZE)
+        )
+    invalidate_posts()
+
+    return {
+        "users": len(user_ids),
+        "categories": len(category_ids),
+        "posts": len(post_objs),
+        "comments": comment_count,
+        "subscriptions": len(subscribed),
+        "feed entries": feed_entries,
+    }
@@ -1,6 +1,8 @@
 from rest_framework import serializers
 from django.utils.text import slugify
+from apps.accounts.serializers import author_info
 from . import models
+from .images import ImageVariantsField
 
 
 class CategorySerializer(serializers.ModelSerializer):
@@ -12,7 +14,10 @@ class CategorySerializer(serializers.ModelSerializer):
         read_only_fields = ("id", "slug", "created_at")
 
     def get_posts_count(self, obj):
-        return obj.posts.filter(status="published").count()
+        count = getattr(obj, "published_posts_count", None)
+        if count is None:
+            count = obj.posts.filter(status="published").count()
+        return count
 
     def create(self, validated_data):
         validated_data["slug"] = slugify(validated_data["name"])
@@ -23,6 +28,8 @@ class PostSerializer(serializers.ModelSerializer):
     author = serializers.StringRelatedField()
     category = serializers.StringRelatedField()
     comments_count = serializers.ReadOnlyField()
+    content = serializers.CharField(source="excerpt", read_only=True)
+    image_variants = ImageVariantsField()
 
     class Meta:
         model = models.Post
@@ -32,6 +39,7 @@ class PostSerializer(serializers.ModelSerializer):
             "slug",
             "content",
             "image",
+            "image_variants",
             "status",
             "author",
             "category",
@@ -42,17 +50,12 @@ class PostSerializer(serializers.ModelSerializer):
         )
         read_only_fields = ("slug", "author", "category", "views_count")
 
-    def to_representation(self, instance):
-        data = super().to_representation(instance)
-        if len(data["content"]) > 200:
-            data["content"] = data["content"][:200] + "..."
-        return data
-
 
 class PostDetailSerializer(serializers.ModelSerializer):
     author_info = serializers.SerializerMethodField()
     category_info = serializers.SerializerMethodField()
     comments_count = serializers.ReadOnlyField()
+    image_variants = ImageVariantsField()
 
     class Meta:
         model = models.Post
@@ -62,6 +65,7 @@ class PostDetailSerializer(serializers.ModelSerializer):
             "slug",
             "content",
             "image",
+            "image_variants",
             "status",
             "author",
             "author_info",
@@ -75,13 +79,7 @@ class PostDetailSerializer(serializers.ModelSerializer):
         read_only_fields = ("slug", "author", "category", "views_count")
 
     def get_author_info(self, obj):
-        author = obj.author
-        return {
-            "id": author.id,
-            "username": author.username,
-            "full_name": author.full_name,
-            "avatar": author.avatar.url if author.avatar else None,
-        }
+        return author_info(obj.author, self.context)
 
     def get_category_info(self, obj):
         if obj.category:
@@ -0,0 +1,54 @@
+from django.db import transaction
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from .cache import invalidate_posts
+from .feeds import fan_out
+from .images import generate_post_variants, variant_pool
+from .models import Post
+from .search import posts_index
+
+
+@receiver(post_save, sender=Post)
+def update_search_index(sender, instance, using, update_fields=None, **kwargs):
+    if update_fields is not None and not set(update_fields) & set(posts_index.columns):
+        return
+    posts_index.update([instance], using=using)
+
+
+@receiver(post_delete, sender=Post)
+def remove_from_search_index(sender, instance, using, **kwargs):
+    posts_index.remove([instance.pk], using=using)
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def invalidate_cached_posts(sender, instance, using, **kwargs):
+    transaction.on_commit(invalidate_posts, using=using)
+
+
+@receiver(post_save, sender=Post)
+def schedule_image_variants(sender, instance, using, update_fields=None, **kwargs):
+    if update_fields is not None and "image" not in update_fields:
+        return
+    if (instance.image.name or None) == (
+        getattr(instance, "_loaded_image", None) or None
+    ):
+        return
+    instance._loaded_image = instance.image.name
+    transaction.on_commit(
+        lambda: variant_pool.submit(generate_post_variants, instance.pk), using=using
+    )
+
+
+@receiver(post_save, sender=Post)
+def schedule_fan_out(sender, instance, created, using, raw=False, **kwargs):
+    if raw:
+        return
+    feed_key = (instance.status, instance.category_id)
+    if feed_key == getattr(instance, "_loaded_feed_key", None):
+        return
+    instance._loaded_feed_key = feed_key
+    if created and instance.status != "published":
+        return
+    transaction.on_commit(lambda: fan_out([instance.pk]), using=using)
@@ -0,0 +1,63 @@
+from asgiref.sync import async_to_sync, sync_to_async
+from django.core.handlers.asgi import ASGIRequest
+from django.http import StreamingHttpResponse
+from rest_framework.renderers import JSONRenderer
+
+
+def json_array_stream(items, serialize, prefix=b"[", suffix=b"]"):
+    """Yield a JSON array one rendered item at a time"""
+
+    renderer = JSONRenderer()
+    yield prefix
+    separator = b""
+    for item in items:
+        yield separator + renderer.render(serialize(item))
+        separator = b","
+    yield suffix
+
+
+async def ajson_array_stream(items, serialize, prefix=b"[", suffix=b"]"):
+    """json_array_stream() over an async iterable"""
+
+    renderer = JSONRenderer()
+    yield prefix
+    separator = b""
+    async for item in items:
+        yield separator + renderer.render(serialize(item))
+        separator = b","
+    yield suffix
+
+
+async def aiterate(iterable):
+    """Async iterator advancing a sync one in the sync thread, where its
+    database queries run"""
+
+    iterator = iter(iterable)
+    next_item = sync_to_async(next)
+    done = object()
+    while (item := await next_item(iterator, done)) is not done:
+        yield item
+
+
+def streaming_response(request, content, **kwargs):
+    """StreamingHttpResponse over a sync iterator of a sync view.
+
+    Under ASGI Django reads a sync iterator into a list before sending
+    anything, so the content is handed over as an async iterator instead.
+    """
+
+    if isinstance(getattr(request, "_request", request), ASGIRequest):
+        content = aiterate(content)
+    return StreamingHttpResponse(content, **kwargs)
+
+
+def read_stream(response):
+    """Body of a streaming response, whether its iterator is sync or async"""
+
+    if not response.is_async:
+        return b"".join(response.streaming_content)
+
+    async def read():
+        return b"".join([chunk async for chunk in response.streaming_content])
+
+    return async_to_sync(read)()
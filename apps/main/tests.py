@@ -1,3 +1,679 @@
-from django.test import TestCase
+import csv
+import importlib
+import json
+import os
+import tempfile
+from datetime import timedelta
+from io import BytesIO, StringIO
+from pathlib import Path
+from unittest import mock
 
-# Create your tests here.
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.files.storage import default_storage
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import DatabaseError, connection
+from django.db.models import Count, F, Q
+from django.test import TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import clear_url_caches, reverse
+from django.utils.http import http_date
+from PIL import Image
+from rest_framework_simplejwt.tokens import RefreshToken
+
+from apps.comments.models import Comment
+from config.database import connection_settings, databases
+from .benchmarking import (
+    BENCHMARKED_URLCONFS,
+    CASES,
+    Fixture,
+    perform,
+    uncovered_routes,
+)
+from .budgets import (
+    QueryBudgetExceeded,
+    QueryBudgetTestMixin,
+    budget_for,
+    query_budget,
+    unbudgeted_routes,
+)
+from .counters import view_counts
+from .feeds import fan_out, subscribe, unsubscribe
+from .images import POST_IMAGE_SIZES, variant_pool
+from .models import (
+    EXCERPT_LENGTH,
+    Category,
+    FeedEntry,
+    Post,
+    PostActivity,
+    TrendingScore,
+)
+from .pagination import KeysetPagination
+from .seeding import seed
+from .trending import compute_scores, hour_bucket, record_activity
+from .views import PostListCreateAPIView
+
+
+def reload_urlconfs():
+    """Re-import the URLconfs, which pick views by ASYNC_VIEWS on import"""
+
+    for name in (
+        "apps.main.urls",
+        "apps.comments.urls",
+        "apps.accounts.urls",
+        settings.ROOT_URLCONF,
+    ):
+        importlib.reload(importlib.import_module(name))
+    clear_url_caches()
+
+
+class AsyncViewsMixin:
+    """Serve requests by the ASYNC_VIEWS implementations, as under ASGI"""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.addClassCleanup(reload_urlconfs)
+        cls.enterClassContext(override_settings(ASYNC_VIEWS=True))
+        reload_urlconfs()
+
+
+def create_post(author, **kwargs):
+    kwargs.setdefault("title", f"Post {Post.objects.count()}")
+    kwargs.setdefault("content", "Some content.")
+    kwargs.setdefault("status", "published")
+    return Post.objects.create(author=author, **kwargs)
+
+
+def authenticate(client, user):
+    """Send the client's requests with a JWT access token of user"""
+
+    token = RefreshToken.for_user(user).access_token
+    client.defaults["HTTP_AUTHORIZATION"] = f"Bearer {token}"
+
+
+def create_user(username, **kwargs):
+    return get_user_model().objects.create_user(
+        username=username,
+        email=f"{username}@example.com",
+        password="password-123",
+        **kwargs,
+    )
+
+
+@override_settings(VIEW_COUNT_FLUSH_INTERVAL=0)
+class QueryBudgetTests(QueryBudgetTestMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        seed(users=6, categories=3, posts=12, comments=40, prefix="budget")
+
+    def setUp(self):
+        self.fixture = Fixture("budget")
+
+    def test_every_route_has_a_budget(self):
+        for urlconf in BENCHMARKED_URLCONFS:
+            with self.subTest(urlconf):
+                self.assertEqual(unbudgeted_routes(urlconf), [])
+
+    def test_every_route_has_a_case(self):
+        self.assertEqual(uncovered_routes(), [])
+
+    def test_endpoints_stay_within_budget(self):
+        self.assertCasesWithinBudget(CASES, self.fixture)
+
+    def test_budget_for_methods(self):
+        @query_budget({"GET": 2, "POST": 4})
+        def view(request):
+            pass
+
+        self.assertEqual(budget_for(view, "GET"), 2)
+        self.assertEqual(budget_for(view, "HEAD"), 2)
+        self.assertEqual(budget_for(view, "POST"), 4)
+        self.assertIsNone(budget_for(view, "DELETE"))
+        self.assertEqual(budget_for(PostListCreateAPIView.as_view(), "GET"), 3)
+
+    @override_settings(QUERY_BUDGETS="raise")
+    def test_middleware_raises_report_grouped_by_template(self):
+        with mock.patch.object(PostListCreateAPIView, "query_budget", 1):
+            with self.assertRaises(QueryBudgetExceeded) as raised:
+                self.client.get(reverse("post-list"))
+        report = str(raised.exception)
+        self.assertIn("GET post-list ran 2 queries, its budget is 1:", report)
+        self.assertIn('   1 x SELECT COUNT(*) AS "__count" FROM "posts"', report)
+
+    @override_settings(QUERY_BUDGETS="warn")
+    def test_middleware_logs_over_budget_requests(self):
+        with mock.patch.object(PostListCreateAPIView, "query_budget", 1):
+            with self.assertLogs("config.middleware", "ERROR") as logs:
+                response = self.client.get(reverse("post-list"))
+        self.assertEqual(response.status_code, 200)
+        self.assertIn("GET post-list ran 2 queries", logs.output[0])
+
+
+@override_settings(VIEW_COUNT_FLUSH_INTERVAL=0)
+class AsyncQueryBudgetTests(AsyncViewsMixin, QueryBudgetTestMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        seed(users=6, categories=3, posts=12, comments=40, prefix="budget")
+
+    def test_streaming_endpoints_stay_within_budget(self):
+        self.assertCasesWithinBudget(
+            [
+                case
+                for case in CASES
+                if case.name in ("post-by-category", "export-posts")
+            ],
+            Fixture("budget"),
+        )
+
+    def test_benchmark_reads_streaming_responses(self):
+        for case in CASES:
+            if case.query == "stream=1":
+                response = perform(self.client, case, Fixture("budget"))
+                self.assertTrue(response.is_async)
+                self.assertEqual(response.status_code, 200)
+
+
+@override_settings(VIEW_COUNT_FLUSH_INTERVAL=0)
+class AsyncPostDetailTests(AsyncViewsMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.post = create_post(create_user("author"))
+
+    def test_views_are_written_through(self):
+        url = reverse("post-detail", kwargs={"slug": self.post.slug})
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        response = self.client.get(url, HTTP_IF_NONE_MATCH=response["ETag"])
+        self.assertEqual(response.status_code, 304)
+        self.post.refresh_from_db()
+        self.assertEqual(self.post.views_count, 2)
+
+    def test_drafts_are_visible_to_their_author_only(self):
+        draft = create_post(self.post.author, status="draft")
+        url = reverse("post-detail", kwargs={"slug": draft.slug})
+        self.assertEqual(self.client.get(url).status_code, 404)
+        authenticate(self.client, self.post.author)
+        response = self.client.get(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["status"], "draft")
+
+    def test_recent_posts_are_newest_first(self):
+        cache.clear()
+        create_post(self.post.author, title="Newer")
+        self.assertEqual(
+            [post["title"] for post in self.client.get(reverse("recent-posts")).json()],
+            ["Newer", self.post.title],
+        )
+
+
+@override_settings(VIEW_COUNT_FLUSH_INTERVAL=0)
+class ConditionalPostDetailTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.author = create_user("author")
+        cls.post = create_post(cls.author)
+        cls.url = reverse("post-detail", kwargs={"slug": cls.post.slug})
+
+    def test_unchanged_post_is_not_modified(self):
+        etag = self.client.get(self.url)["ETag"]
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response["ETag"], etag)
+
+    def test_new_comment_is_modified(self):
+        response = self.client.get(self.url)
+        self.assertFalse(response.has_header("Last-Modified"))
+        Comment.objects.create(post=self.post, author=self.author, content="New")
+        response = self.client.get(
+            self.url,
+            HTTP_IF_NONE_MATCH=response["ETag"],
+            HTTP_IF_MODIFIED_SINCE=http_date(),
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()["comments_count"], 1)
+
+
+class DatabaseSettingsTests(TestCase):
+    def test_asgi_disables_persistent_connections(self):
+        with mock.patch.dict("os.environ", {"CONN_MAX_AGE": "60"}):
+            self.assertEqual(connection_settings()["CONN_MAX_AGE"], 60)
+            with mock.patch.dict("os.environ", {"ASGI": "true"}):
+                self.assertEqual(
+                    connection_settings(),
+                    {"CONN_MAX_AGE": 0, "CONN_HEALTH_CHECKS": False},
+                )
+
+    def test_sqlite_profile_is_tuned_unless_disabled(self):
+        with mock.patch.dict("os.environ", {"DATABASE_ENGINE": "sqlite"}):
+            options = databases(Path("/srv"))["default"]["OPTIONS"]
+            with mock.patch.dict("os.environ", {"SQLITE_TUNING": "False"}):
+                self.assertNotIn("OPTIONS", databases(Path("/srv"))["default"])
+        self.assertRegex(options["init_command"], r"^PRAGMA busy_timeout=\d+;")
+        self.assertIn("PRAGMA journal_mode=WAL", options["init_command"])
+        self.assertEqual(options["transaction_mode"], "IMMEDIATE")
+
+    def test_postgresql_profile_pools_only_with_psycopg_pool(self):
+        environ = {"DATABASE_ENGINE": "postgresql", "CONN_MAX_AGE": "60"}
+        with mock.patch.dict("os.environ", environ):
+            with mock.patch("config.database.find_spec", return_value=None):
+                persistent = databases(Path("/srv"))["default"]
+            with mock.patch("config.database.find_spec", return_value=object()):
+                pooled = databases(Path("/srv"))["default"]
+        self.assertNotIn("pool", persistent["OPTIONS"])
+        self.assertEqual(persistent["CONN_MAX_AGE"], 60)
+        self.assertIn("pool", pooled["OPTIONS"])
+        self.assertEqual(pooled["CONN_MAX_AGE"], 0)
+
+    def test_unknown_engine_is_rejected(self):
+        with mock.patch.dict("os.environ", {"DATABASE_ENGINE": "mysql"}):
+            with self.assertRaises(ValueError):
+                databases(Path("/srv"))
+
+
+class AsgiStreamingTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.category = Category.objects.create(name="News")
+        author = create_user("author")
+        for title in ("First", "Second"):
+            create_post(author, title=title, category=cls.category)
+
+    async def test_category_stream_is_async_under_asgi(self):
+        url = reverse("post-by-category", kwargs={"slug": self.category.slug})
+        response = await self.async_client.get(url, {"stream": "1"})
+        self.assertTrue(response.is_async)
+        body = json.loads(
+            b"".join([chunk async for chunk in response.streaming_content])
+        )
+        self.assertEqual([post["title"] for post in body["posts"]], ["Second", "First"])
+
+    async def test_export_is_async_under_asgi(self):
+        staff = await get_user_model().objects.acreate(username="staff", is_staff=True)
+        token = await sync_to_async(RefreshToken.for_user)(staff)
+        post = await Post.objects.aget(title="First")
+        await Comment.objects.acreate(post=post, author=staff, content="Hi")
+        response = await self.async_client.get(
+            reverse("export-posts"),
+            {"comments": "1"},
+            headers={"Authorization": f"Bearer {token.access_token}"},
+        )
+        self.assertTrue(response.is_async)
+        lines = b"".join([chunk async for chunk in response.streaming_content])
+        rows = [json.loads(line) for line in lines.splitlines()]
+        self.assertEqual([len(row["comments"]) for row in rows], [1, 0])
+
+
+class PostSaveTests(TestCase):
+    def test_full_save_keeps_counters(self):
+        post = create_post(create_user("author"))
+        Post.objects.filter(pk=post.pk).update(views_count=5, comments_count=2)
+        post.title = "Edited"
+        post.save()
+        post.refresh_from_db()
+        self.assertEqual(post.title, "Edited")
+        self.assertEqual((post.views_count, post.comments_count), (5, 2))
+
+
+@override_settings(FEED_FANOUT_LIMIT=1)
+class FeedFanOutTests(TestCase):
+    def test_unsubscribe_back_under_limit_backfills_timelines(self):
+        category = Category.objects.create(name="News")
+        reader, leaver = create_user("reader"), create_user("leaver")
+        subscribe(reader, category)
+        subscribe(leaver, category)
+        post = create_post(create_user("author"), category=category)
+        fan_out([post.pk])
+        self.assertFalse(FeedEntry.objects.exists())
+
+        unsubscribe(leaver, category)
+        self.assertEqual(
+            list(FeedEntry.objects.values_list("user", "post")),
+            [(reader.pk, post.pk)],
+        )
+
+
+@override_settings(VIEW_COUNT_FLUSH_INTERVAL=3600)
+class ViewCountBufferTests(TestCase):
+    def setUp(self):
+        view_counts.drain()
+        patcher = mock.patch.object(view_counts, "_ensure_worker")
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_views_are_written_on_flush(self):
+        author = create_user("author")
+        post, other = create_post(author), create_post(author)
+        url = reverse("post-detail", kwargs={"slug": post.slug})
+        with self.assertNumQueries(2):
+            self.assertEqual(self.client.get(url).json()["views_count"], 1)
+        self.client.get(url)
+        view_counts.add(other.pk)
+        self.assertEqual(view_counts.pending(post.pk), 2)
+        self.assertEqual(Post.objects.get(pk=post.pk).views_count, 0)
+
+        self.assertEqual(view_counts.flush(), 3)
+        self.assertEqual(
+            dict(Post.objects.values_list("pk", "views_count")),
+            {post.pk: 2, other.pk: 1},
+        )
+        self.assertEqual(view_counts.flush(), 0)
+
+    def test_failed_flush_is_requeued_without_counting_views(self):
+        post = create_post(create_user("author"))
+        view_counts.add(post.pk, 3)
+        with mock.patch(
+            "apps.main.trending.PostActivity.objects.bulk_create",
+            side_effect=DatabaseError,
+        ):
+            with self.assertRaises(DatabaseError):
+                view_counts.flush()
+        self.assertEqual(Post.objects.get(pk=post.pk).views_count, 0)
+        self.assertEqual(view_counts.flush(), 3)
+        self.assertEqual(Post.objects.get(pk=post.pk).views_count, 3)
+
+
+class CategoryPostsCountTests(TestCase):
+    def test_list_counts_published_posts_without_a_query_per_row(self):
+        author = create_user("author")
+        news, sport = (Category.objects.create(name=name) for name in ("News", "Sport"))
+        create_post(author, category=news)
+        create_post(author, category=news, status="draft")
+        # The page count and one annotated SELECT
+        with self.assertNumQueries(2):
+            response = self.client.get(reverse("category-list-create"))
+        rows = response.json()["results"]
+        self.assertEqual(
+            {row["slug"]: row["posts_count"] for row in rows},
+            {news.slug: 1, sport.slug: 0},
+        )
+
+
+@mock.patch.object(KeysetPagination, "page_size", 2)
+class KeysetPaginationTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        author = create_user("author")
+        cls.titles = [create_post(author).title for _ in range(3)][::-1]
+
+    def test_cursor_pages_walk_both_ways(self):
+        first = self.client.get(reverse("post-list"), {"pagination": "cursor"}).json()
+        self.assertNotIn("count", first)
+        self.assertIsNone(first["previous"])
+        self.assertEqual([post["title"] for post in first["results"]], self.titles[:2])
+
+        second = self.client.get(first["next"]).json()
+        self.assertEqual([post["title"] for post in second["results"]], self.titles[2:])
+        self.assertIsNone(second["next"])
+
+        back = self.client.get(second["previous"]).json()
+        self.assertEqual([post["title"] for post in back["results"]], self.titles[:2])
+
+    def test_invalid_cursor_is_not_found(self):
+        response = self.client.get(reverse("post-list"), {"cursor": "bogus"})
+        self.assertEqual(response.status_code, 404)
+
+
+class PostSearchTests(TestCase):
+    def search(self, query):
+        response = self.client.get(reverse("post-list"), {"search": query})
+        return [post["title"] for post in response.json()["results"]]
+
+    def test_search_ranks_title_matches_and_follows_edits(self):
+        author = create_user("author")
+        create_post(author, title="Notes", content="All about caching layers.")
+        post = create_post(author, title="Caching guide")
+        create_post(author, title="Unrelated")
+        self.assertEqual(self.search("cach"), ["Caching guide", "Notes"])
+
+        post.title = "Queues"
+        post.save()
+        self.assertEqual(self.search("cach"), ["Notes"])
+        self.assertEqual(self.search("queue"), ["Queues"])
+        post.delete()
+        self.assertEqual(self.search("queue"), [])
+
+
+class PostsCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_recent_posts_are_cached_until_a_post_changes(self):
+        author = create_user("author")
+        create_post(author, title="Old")
+        url = reverse("recent-posts")
+        self.client.get(url)
+        with self.assertNumQueries(0):
+            self.assertEqual(
+                [post["title"] for post in self.client.get(url).json()], ["Old"]
+            )
+
+        with self.captureOnCommitCallbacks(execute=True):
+            create_post(author, title="New")
+        titles = [post["title"] for post in self.client.get(url).json()]
+        self.assertEqual(titles, ["New", "Old"])
+
+
+@override_settings(
+    TRENDING_WINDOW_HOURS=48, TRENDING_HALF_LIFE_HOURS=12, TRENDING_COMMENT_WEIGHT=5
+)
+class TrendingScoreTests(TestCase):
+    def test_scores_decay_with_age_and_weigh_comments(self):
+        cache.clear()
+        now = hour_bucket()
+        author = create_user("author")
+        old, viewed, discussed, expired, draft = (
+            create_post(author, title=title)
+            for title in ("Old", "Viewed", "Discussed", "Expired", "Draft")
+        )
+        Post.objects.filter(pk=draft.pk).update(status="draft")
+        record_activity({old.pk: 10}, "views", now - timedelta(hours=24))
+        record_activity({viewed.pk: 4, draft.pk: 100}, "views", now)
+        record_activity({discussed.pk: 1}, "comments", now)
+        record_activity({expired.pk: 100}, "views", now - timedelta(hours=49))
+
+        self.assertEqual(compute_scores(now), 3)
+        scores = dict(TrendingScore.objects.values_list("post__title", "score"))
+        self.assertEqual(scores, {"Discussed": 5.0, "Viewed": 4.0, "Old": 2.5})
+        self.assertFalse(PostActivity.objects.filter(post=expired).exists())
+        response = self.client.get(reverse("trending-posts"))
+        self.assertEqual(
+            [post["title"] for post in response.json()], ["Discussed", "Viewed", "Old"]
+        )
+
+        record_activity({old.pk: 10}, "views", now)
+        with self.captureOnCommitCallbacks(execute=True):
+            compute_scores(now)
+        response = self.client.get(reverse("trending-posts"))
+        self.assertEqual(response.json()[0]["title"], "Old")
+
+    def test_activity_is_written_per_amount_not_per_post(self):
+        author = create_user("author")
+        posts = [create_post(author) for _ in range(5)]
+        counts = {post.pk: 2 for post in posts}
+        counts[posts[0].pk] = 7
+        # Existing posts, the empty buckets and one UPDATE per amount
+        with self.assertNumQueries(4):
+            record_activity(counts, "views")
+        record_activity({posts[0].pk: 1, 0: 1}, "views")
+        self.assertEqual(
+            dict(PostActivity.objects.values_list("post", "views")),
+            {**counts, posts[0].pk: 8},
+        )
+
+
+class PostExcerptTests(TestCase):
+    def test_lists_serve_the_stored_excerpt_without_content(self):
+        post = create_post(create_user("author"), content="x" * 300)
+        self.assertEqual(post.excerpt, "x" * EXCERPT_LENGTH + "...")
+        with CaptureQueriesContext(connection) as captured:
+            response = self.client.get(reverse("post-list"))
+        self.assertEqual(response.json()["results"][0]["content"], post.excerpt)
+        self.assertFalse(any('"posts"."content"' in query["sql"] for query in captured))
+
+        post.content = "Short"
+        post.save(update_fields=["content"])
+        self.assertEqual(Post.objects.get(pk=post.pk).excerpt, "Short")
+
+
+class PostImageVariantsTests(TestCase):
+    def setUp(self):
+        media = tempfile.TemporaryDirectory()
+        self.addCleanup(media.cleanup)
+        self.enterContext(override_settings(MEDIA_ROOT=media.name))
+        # Run jobs inline, as with IMAGE_WORKERS=0
+        self.enterContext(mock.patch.object(variant_pool, "_executor", None))
+
+    def test_upload_renders_variants_after_commit(self):
+        buffer = BytesIO()
+        Image.new("RGB", (2000, 1000), "red").save(buffer, "PNG")
+        upload = SimpleUploadedFile("photo.png", buffer.getvalue())
+        with self.captureOnCommitCallbacks(execute=True):
+            post = create_post(create_user("author"), image=upload)
+
+        post.refresh_from_db()
+        self.assertEqual(set(post.image_variants), set(POST_IMAGE_SIZES))
+        with default_storage.open(post.image_variants["thumb"]["webp"]) as thumb:
+            self.assertEqual(Image.open(thumb).size, (320, 160))
+        self.assertEqual(set(post.image_variants["large"]), {"webp", "jpeg"})
+
+
+@override_settings(
+    INSTRUMENTATION_SAMPLE_RATE=1,
+    INSTRUMENTATION_DUPLICATE_THRESHOLD=1,
+    QUERY_BUDGETS="off",
+)
+class QueryInstrumentationTests(TestCase):
+    def test_sampled_requests_get_server_timing_and_a_log_line(self):
+        create_post(create_user("author"))
+        with self.assertLogs("config.middleware", "INFO") as logs:
+            response = self.client.get(reverse("post-list"))
+        timing = response["Server-Timing"]
+        self.assertRegex(timing, r'^db;dur=[\d.]+;desc="2 queries", serializer;dur=')
+        self.assertIn("total;dur=", timing)
+        self.assertIn("GET post-list 200 queries=2", logs.output[0])
+        self.assertIn("possible N+1", logs.output[1])
+
+    @override_settings(INSTRUMENTATION_SAMPLE_RATE=0)
+    def test_sample_rate_zero_removes_the_middleware(self):
+        response = self.client.get(reverse("post-list"))
+        self.assertFalse(response.has_header("Server-Timing"))
+
+
+class SeedTests(TestCase):
+    def test_seed_is_reproducible_with_consistent_counters(self):
+        counts = seed(users=4, categories=2, posts=20, comments=60, prefix="a")
+        self.assertEqual(
+            {name: counts[name] for name in ("users", "categories", "posts")},
+            {"users": 4, "categories": 2, "posts": 20},
+        )
+        self.assertTrue(get_user_model().objects.get(username="a0").is_staff)
+        posts = Post.objects.annotate(
+            active=Count("comments", filter=Q(comments__is_active=True))
+        )
+        self.assertFalse(posts.exclude(comments_count=F("active")).exists())
+
+        seed(users=4, categories=2, posts=20, comments=60, prefix="b")
+        titles = Post.objects.order_by("pk").values_list("title", flat=True)
+        self.assertEqual(list(titles[:20]), list(titles[20:]))
+
+
+class ImportPostsTests(TestCase):
+    def test_csv_rows_are_imported_in_batches_skipping_bad_rows(self):
+        create_user("author")
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "posts.csv")
+            with open(path, "w", newline="") as f:
+                writer = csv.writer(f)
+                writer.writerow(["title", "content", "author", "category"])
+                writer.writerow(["Same title", "First", "author", "News"])
+                writer.writerow(["Same title", "Second", "author", "News"])
+                writer.writerow(["Lost", "Third", "nobody", ""])
+                writer.writerow(["Caching", "Fourth", "author", ""])
+            stdout, stderr = StringIO(), StringIO()
+            call_command(
+                "import_posts",
+                path,
+                "--create-categories",
+                "--batch-size",
+                "2",
+                stdout=stdout,
+                stderr=stderr,
+            )
+
+        self.assertIn("Imported 3 posts, skipped 1 rows.", stdout.getvalue())
+        self.assertIn("Line 4: author: Unknown user 'nobody'.", stderr.getvalue())
+        self.assertEqual(
+            list(Post.objects.order_by("pk").values_list("slug", "category__name")),
+            [("same-title", "News"), ("same-title-2", "News"), ("caching", None)],
+        )
+        response = self.client.get(reverse("post-list"), {"search": "cach"})
+        self.assertEqual(response.json()["count"], 1)
+
+
+class ExportPostsTests(TestCase):
+    def test_command_exports_filtered_posts_with_threads(self):
+        author = create_user("author")
+        first, second = create_post(author), create_post(author)
+        create_post(author, status="draft")
+        root = Comment.objects.create(post=first, author=author, content="Root")
+        Comment.objects.create(
+            post=first, author=author, parent=root, content="Reply", is_active=False
+        )
+        Comment.objects.create(post=second, author=author, content="Other")
+
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, "posts.ndjson")
+            stdout = StringIO()
+            call_command(
+                "export_posts",
+                "--output",
+                path,
+                "--status",
+                "published",
+                "--comments",
+                "--chunk-size",
+                "1",
+                stdout=stdout,
+            )
+            with open(path) as f:
+                rows = [json.loads(line) for line in f]
+
+        self.assertIn("Exported 2 posts", stdout.getvalue())
+        self.assertEqual([row["id"] for row in rows], [first.pk, second.pk])
+        threads = rows[0]["comments"]
+        self.assertEqual(threads[0]["content"], "Root")
+        self.assertEqual(
+            [(reply["content"], reply["is_active"]) for reply in threads[0]["replies"]],
+            [("Reply", False)],
+        )
+        self.assertEqual(rows[1]["comments"][0]["content"], "Other")
+
+    def test_command_writes_to_captured_stdout(self):
+        author = create_user("author")
+        post = create_post(author, title="Caf\u00e9")
+        stdout = StringIO()
+        call_command("export_posts", stdout=stdout)
+        rows = [json.loads(line) for line in stdout.getvalue().splitlines()]
+        self.assertEqual(
+            [(row["id"], row["title"]) for row in rows], [(post.pk, "Caf\u00e9")]
+        )
+
+
+@mock.patch.object(KeysetPagination, "page_size", 2)
+class PostByCategoryTests(TestCase):
+    def test_category_posts_are_keyset_paginated(self):
+        category = Category.objects.create(name="News")
+        author = create_user("author")
+        titles = [create_post(author, category=category).title for _ in range(3)][::-1]
+        url = reverse("post-by-category", kwargs={"slug": category.slug})
+
+        first = self.client.get(url).json()
+        self.assertEqual(first["category"]["posts_count"], 3)
+        self.assertEqual([post["title"] for post in first["posts"]], titles[:2])
+        second = self.client.get(first["next"]).json()
+        self.assertEqual([post["title"] for post in second["posts"]], titles[2:])
+        self.assertIsNone(second["next"])
@@ -0,0 +1,92 @@
+from collections import defaultdict
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import F
+from django.utils import timezone
+
+from .cache import invalidate_posts
+from .counters import group_by_amount
+from .models import Post, PostActivity, TrendingScore
+
+
+def hour_bucket(when=None):
+    when = when or timezone.now()
+    return when.replace(minute=0, second=0, microsecond=0)
+
+
+def record_activity(counts, field, when=None):
+    """Add {post_id: n} to the views or comments of the current hour bucket.
+
+    Missing buckets of posts that still exist are inserted empty in one
+    statement, then every bucket is incremented with one UPDATE per
+    distinct amount.
+    """
+
+    by_amount = group_by_amount(counts)
+    if not by_amount:
+        return
+    bucket = hour_bucket(when)
+    post_ids = [post_id for group in by_amount.values() for post_id in group]
+    PostActivity.objects.bulk_create(
+        [
+            PostActivity(post_id=post_id, bucket=bucket)
+            for post_id in Post.objects.filter(pk__in=post_ids).values_list(
+                "pk", flat=True
+            )
+        ],
+        ignore_conflicts=True,
+    )
+    for amount, group in by_amount.items():
+        PostActivity.objects.filter(post_id__in=group, bucket=bucket).update(
+            **{field: F(field) + amount}
+        )
+
+
+def compute_scores(now=None, chunk_size=1000):
+    """Recompute trending scores from the activity window, returns posts scored.
+
+    Each bucket contributes ``views + comment_weight * comments`` halved
+    every TRENDING_HALF_LIFE_HOURS. Only buckets inside the window are read,
+    so the job costs the same however many posts exist; buckets and scores
+    that fall out of the window are pruned.
+    """
+
+    now = now or timezone.now()
+    window_start = now - timedelta(hours=settings.TRENDING_WINDOW_HOURS)
+    half_life = settings.TRENDING_HALF_LIFE_HOURS * 3600
+    comment_weight = settings.TRENDING_COMMENT_WEIGHT
+
+    scores = defaultdict(float)
+    activity = PostActivity.objects.filter(bucket__gte=window_start).values_list(
+        "post_id", "bucket", "views", "comments"
+    )
+    for post_id, bucket, views, comments in activity.iterator(chunk_size=chunk_size):
+        age = max((now - bucket).total_seconds(), 0)
+        scores[post_id] += (views + comment_weight * comments) * 0.5 ** (
+            age / half_life
+        )
+
+    post_ids = list(scores)
+    scored = 0
+    with transaction.atomic():
+        for start in range(0, len(post_ids), chunk_size):
+            chunk = post_ids[start : start + chunk_size]
+            published = Post.objects.filter(pk__in=chunk, status="published")
+            rows = [
+                TrendingScore(post_id=post_id, score=scores[post_id], updated_at=now)
+                for post_id in published.values_list("pk", flat=True)
+            ]
+            TrendingScore.objects.bulk_create(
+                rows,
+                update_conflicts=True,
+                unique_fields=["post"],
+                update_fields=["score", "updated_at"],
+            )
+            scored += len(rows)
+        TrendingScore.objects.filter(updated_at__lt=now).delete()
+        PostActivity.objects.filter(bucket__lt=window_start).delete()
+        # /trending/ is served from the posts cache
+        transaction.on_commit(invalidate_posts)
+    return scored
@@ -1,23 +1,47 @@
+from django.conf import settings
 from django.urls import path
 from . import views
 
+if settings.ASYNC_VIEWS:
+    from . import async_views as read_views
+
+    post_detail = read_views.post_detail
+else:
+    read_views = views
+    post_detail = views.PostDetailAPIView.as_view()
+
 urlpatterns = [
     path(
         "categories/",
         views.CategoryListCreateAPIView.as_view(),
         name="category-list-create",
     ),
+    path(
+        "categories/subscribed/",
+        views.SubscribedCategoriesView.as_view(),
+        name="subscribed-categories",
+    ),
     path(
         "categories/<slug:slug>/",
         views.CategoryDetailAPIView.as_view(),
         name="category-detail",
     ),
     path(
-        "categories/<slug:slug>/posts/", views.post_by_category, name="post-by-category"
+        "categories/<slug:slug>/posts/",
+        read_views.post_by_category,
+        name="post-by-category",
+    ),
+    path(
+        "categories/<slug:slug>/subscribe/",
+        views.category_subscription,
+        name="category-subscription",
     ),
     path("", views.PostListCreateAPIView.as_view(), name="post-list"),
     path("my-posts/", views.MyPostsView.as_view(), name="my-posts"),
-    path("popular/", views.popular_posts, name="popular-posts"),
-    path("recent/", views.recent_posts, name="recent-posts"),
-    path("<slug:slug>/", views.PostDetailAPIView.as_view(), name="post-detail"),
+    path("feed/", views.feed, name="feed"),
+    path("popular/", read_views.popular_posts, name="popular-posts"),
+    path("recent/", read_views.recent_posts, name="recent-posts"),
+    path("trending/", views.trending_posts, name="trending-posts"),
+    path("export/", views.export_posts, name="export-posts"),
+    path("<slug:slug>/", post_detail, name="post-detail"),
 ]
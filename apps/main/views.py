@@ -1,16 +1,31 @@
 from rest_framework import generics, status, permissions, filters
 from rest_framework.decorators import api_view, permission_classes
+from rest_framework.exceptions import ValidationError
+from rest_framework.renderers import JSONRenderer
 from rest_framework.response import Response
 from django_filters.rest_framework import DjangoFilterBackend
-from django.db.models import Q
+from django.db import transaction
 from django.shortcuts import get_object_or_404
+from apps.comments.counters import batch_deletes
 from . import models
 from . import serializers
+from .budgets import query_budget
+from .cache import get_or_build, posts_cache_key
+from .counters import view_counts
+from .exporting import PostExportFilter, export_rows, ndjson_lines
+from .feeds import FeedPagination, subscribe, unsubscribe
+from .mixins import ConditionalRetrieveMixin
+from .pagination import KeysetPagination, OptionalCursorPagination
 from .permissions import IsAuthorOrReadOnly
+from .search import FullTextSearchFilter, posts_index
+from .streaming import json_array_stream, streaming_response
+
+STREAM_CHUNK_SIZE = 500
 
 
 class CategoryListCreateAPIView(generics.ListCreateAPIView):
-    queryset = models.Category.objects.all()
+    query_budget = {"GET": 3, "POST": 4}
+    queryset = models.Category.objects.with_posts_count()
     serializer_class = serializers.CategorySerializer
     permission_classes = (permissions.IsAuthenticatedOrReadOnly, IsAuthorOrReadOnly)
     filter_backends = (filters.SearchFilter, filters.OrderingFilter)
@@ -20,35 +35,65 @@ class CategoryListCreateAPIView(generics.ListCreateAPIView):
 
 
 class CategoryDetailAPIView(generics.RetrieveUpdateDestroyAPIView):
-    queryset = models.Category.objects.all()
+    query_budget = {"GET": 2, "PUT": 4, "PATCH": 4, "DELETE": 10}
+    queryset = models.Category.objects.with_posts_count()
     serializer_class = serializers.CategorySerializer
     permission_classes = (permissions.IsAuthenticatedOrReadOnly, IsAuthorOrReadOnly)
     lookup_field = "slug"
 
 
+class SubscribedCategoriesView(generics.ListAPIView):
+    query_budget = 3
+    serializer_class = serializers.CategorySerializer
+    permission_classes = (permissions.IsAuthenticated,)
+
+    def get_queryset(self):
+        return (
+            models.Category.objects.with_posts_count()
+            .filter(subscriptions__user=self.request.user)
+            .order_by("name")
+        )
+
+
+@query_budget({"POST": 10, "DELETE": 6})
+@api_view(["POST", "DELETE"])
+@permission_classes([permissions.IsAuthenticated])
+def category_subscription(request, slug):
+    """Subscribe to a category's posts in the feed, or unsubscribe"""
+
+    category = get_object_or_404(models.Category, slug=slug)
+    if request.method == "DELETE":
+        unsubscribe(request.user, category)
+        return Response(status=status.HTTP_204_NO_CONTENT)
+    created = subscribe(request.user, category)
+    return Response(
+        {"category": category.slug, "subscribed": True},
+        status=status.HTTP_201_CREATED if created else status.HTTP_200_OK,
+    )
+
+
 class PostListCreateAPIView(generics.ListCreateAPIView):
+    query_budget = {"GET": 3, "POST": 12}
     serializer_class = serializers.PostSerializer
+    pagination_class = OptionalCursorPagination
     permission_classes = (permissions.IsAuthenticatedOrReadOnly, IsAuthorOrReadOnly)
     filter_backends = (
         DjangoFilterBackend,
-        filters.SearchFilter,
         filters.OrderingFilter,
+        FullTextSearchFilter,
     )
     filterset_fields = ("category", "author", "status")
     search_fields = ("title", "content")
+    search_index = posts_index
     ordering_fields = ("created_at", "updated_at", "views_count", "title")
     ordering = ("-created_at",)
 
     def get_queryset(self):
-        queryset = models.Post.objects.select_related("author", "category")
-
-        if not self.request.user.is_authenticated:
-            queryset = queryset.filter(status="published")
-        else:
-            queryset = queryset.filter(
-                Q(author=self.request.user) | Q(status="published")
-            )
-        return queryset
+        return (
+            models.Post.objects.visible_to(self.request.user)
+            .select_related("author", "category")
+            .defer("content")
+        )
 
     def get_serializer_class(self):
         if self.request.method == "POST":
@@ -56,11 +101,19 @@ class PostListCreateAPIView(generics.ListCreateAPIView):
         return serializers.PostSerializer
 
 
-class PostDetailAPIView(generics.RetrieveUpdateDestroyAPIView):
-    queryset = models.Post.objects.select_related("author", "category")
+class PostDetailAPIView(
+    ConditionalRetrieveMixin, generics.RetrieveUpdateDestroyAPIView
+):
+    query_budget = {"GET": 6, "PUT": 12, "PATCH": 12, "DELETE": 13}
     serializer_class = serializers.PostDetailSerializer
-    permissions_classes = (IsAuthorOrReadOnly,)
+    permission_classes = (permissions.IsAuthenticatedOrReadOnly, IsAuthorOrReadOnly)
     lookup_field = "slug"
+    etag_fields = ("updated_at", "comments_count")
+
+    def get_queryset(self):
+        return models.Post.objects.visible_to(self.request.user).select_related(
+            "author", "category"
+        )
 
     def get_serializer_class(self):
         if self.request.method in ["PUT", "PATCH"]:
@@ -68,77 +121,198 @@ class PostDetailAPIView(generics.RetrieveUpdateDestroyAPIView):
         return serializers.PostDetailSerializer
 
     def retrieve(self, request, *args, **kwargs):
+        version = self.get_version()
+        not_modified = self.get_not_modified_response(request, version)
+        if not_modified is not None:
+            if request.method == "GET":
+                view_counts.add(version["pk"])
+            return not_modified
+
         instance = self.get_object()
 
         if request.method == "GET":
             instance.increase_views_count()
 
         serializer = self.get_serializer(instance)
-        return Response(serializer.data)
+        return self.set_validators(Response(serializer.data), version)
+
+    def perform_destroy(self, instance):
+        with transaction.atomic(), batch_deletes():
+            instance.delete()
 
 
 class MyPostsView(generics.ListAPIView):
+    query_budget = 3
     serializer_class = serializers.PostSerializer
+    pagination_class = OptionalCursorPagination
     permission_classes = (permissions.IsAuthenticatedOrReadOnly, IsAuthorOrReadOnly)
     filter_backends = (
         DjangoFilterBackend,
-        filters.SearchFilter,
         filters.OrderingFilter,
+        FullTextSearchFilter,
     )
     filterset_fields = ("category", "author", "status")
     search_fields = ("title", "content")
+    search_index = posts_index
     ordering_fields = ("created_at", "updated_at", "views_count", "title")
     ordering = ("-created_at",)
 
     def get_queryset(self):
-        return models.Post.objects.filter(author=self.request.user).select_related(
-            "author", "category"
+        return (
+            models.Post.objects.filter(author=self.request.user)
+            .select_related("author", "category")
+            .defer("content")
         )
 
 
+@query_budget(3)
 @api_view(["GET"])
 @permission_classes([permissions.AllowAny])
 def post_by_category(request, slug):
-    category = get_object_or_404(models.Category, slug=slug)
+    """Category posts, keyset paginated or streamed whole with ``?stream=1``"""
+
+    category = get_object_or_404(models.Category.objects.with_posts_count(), slug=slug)
     posts = (
         models.Post.objects.filter(category=category, status="published")
         .select_related("author", "category")
-        .order_by("-created_at")
+        .defer("content")
     )
+    category_data = serializers.CategorySerializer(category).data
+
+    if request.query_params.get("stream") in ("1", "true"):
+        serializer = serializers.PostSerializer(context={"request": request})
+        prefix = b'{"category":' + JSONRenderer().render(category_data) + b',"posts":['
+        return streaming_response(
+            request,
+            json_array_stream(
+                posts.order_by("-created_at", "-pk").iterator(
+                    chunk_size=STREAM_CHUNK_SIZE
+                ),
+                serializer.to_representation,
+                prefix=prefix,
+                suffix=b"]}",
+            ),
+            content_type="application/json",
+        )
+
+    paginator = KeysetPagination()
+    page = paginator.paginate_queryset(posts, request)
     serializer = serializers.PostSerializer(
-        posts, many=True, context={"request": request}
+        page, many=True, context={"request": request}
     )
     return Response(
         {
-            "category": serializers.CategorySerializer(category).data,
+            "category": category_data,
+            "next": paginator.get_next_link(),
+            "previous": paginator.get_previous_link(),
             "posts": serializer.data,
         }
     )
 
 
+@query_budget(6)
 @api_view(["GET"])
-@permission_classes([permissions.AllowAny])
-def popular_posts(request):
+@permission_classes([permissions.IsAuthenticated])
+def feed(request):
+    """Published posts of the user's subscribed categories, newest first"""
+
     posts = (
         models.Post.objects.filter(status="published")
         .select_related("author", "category")
-        .order_by("-views_count")[:10]
+        .defer("content")
     )
+    paginator = FeedPagination()
+    page = paginator.paginate_feed(request.user, posts, request)
     serializer = serializers.PostSerializer(
-        posts, many=True, context={"request": request}
+        page, many=True, context={"request": request}
     )
-    return Response(serializer.data)
+    return paginator.get_paginated_response(serializer.data)
 
 
+@query_budget(2)
+@api_view(["GET"])
+@permission_classes([permissions.AllowAny])
+def popular_posts(request):
+    def build():
+        posts = (
+            models.Post.objects.filter(status="published")
+            .select_related("author", "category")
+            .defer("content")
+            .order_by("-views_count")[:10]
+        )
+        serializer = serializers.PostSerializer(
+            posts, many=True, context={"request": request}
+        )
+        return list(serializer.data)
+
+    return Response(get_or_build(posts_cache_key("popular", request), build))
+
+
+@query_budget(2)
 @api_view(["GET"])
 @permission_classes([permissions.AllowAny])
 def recent_posts(request):
-    posts = (
-        models.Post.objects.filter(status="published")
-        .select_related("author", "category")
-        .order_by("-created_at")[:10]
+    def build():
+        posts = (
+            models.Post.objects.filter(status="published")
+            .select_related("author", "category")
+            .defer("content")
+            .order_by("-created_at")[:10]
+        )
+        serializer = serializers.PostSerializer(
+            posts, many=True, context={"request": request}
+        )
+        return list(serializer.data)
+
+    return Response(get_or_build(posts_cache_key("recent", request), build))
+
+
+@query_budget(2)
+@api_view(["GET"])
+@permission_classes([permissions.AllowAny])
+def trending_posts(request):
+    """Top published posts by precomputed time-decayed score"""
+
+    try:
+        limit = max(1, min(int(request.query_params.get("limit", 10)), 50))
+    except ValueError:
+        limit = 10
+
+    def build():
+        posts = (
+            models.Post.objects.filter(status="published", trending_score__isnull=False)
+            .select_related("author", "category")
+            .defer("content")
+            .order_by("-trending_score__score")[:limit]
+        )
+        serializer = serializers.PostSerializer(
+            posts, many=True, context={"request": request}
+        )
+        return list(serializer.data)
+
+    return Response(get_or_build(posts_cache_key(f"trending:{limit}", request), build))
+
+
+@query_budget(3)
+@api_view(["GET"])
+@permission_classes([permissions.IsAdminUser])
+def export_posts(request):
+    """Posts as NDJSON, filtered like the post list, threads with ``?comments=1``"""
+
+    filterset = PostExportFilter(
+        request.query_params, queryset=models.Post.objects.all()
     )
-    serializer = serializers.PostSerializer(
-        posts, many=True, context={"request": request}
+    if not filterset.is_valid():
+        raise ValidationError(filterset.errors)
+    response = streaming_response(
+        request,
+        ndjson_lines(
+            export_rows(
+                filterset.qs,
+                comments=request.query_params.get("comments") in ("1", "true"),
+            )
+        ),
+        content_type="application/x-ndjson",
     )
-    return Response(serializer.data)
+    response["Content-Disposition"] = 'attachment; filename="posts.ndjson"'
+    return response
@@ -12,5 +12,8 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault("DJANGO_SETTINGS_MODULE", "config.settings")
+os.environ.setdefault("ASYNC_VIEWS", "true")
+# Turns persistent database connections off, see config/database.py
+os.environ["ASGI"] = "true"
 
 application = get_asgi_application()
@@ -0,0 +1,265 @@
+import logging
+import random
+import re
+from collections import Counter
+from contextlib import ExitStack
+from time import perf_counter
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction, sync_to_async
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+from django.http import HttpResponse
+
+from apps.accounts.hashing import HashingBusy
+
+logger = logging.getLogger(__name__)
+
+LITERAL = re.compile(r"'(?:[^']|'')*'|\b\d+(?:\.\d+)?\b")
+IN_LIST = re.compile(r"\((?:(?:%s|\?), )+(?:%s|\?)\)")
+
+
+def sql_template(sql):
+    """SQL with literals and IN (...) lists collapsed, for grouping queries"""
+
+    return IN_LIST.sub("(?, ...)", LITERAL.sub("?", sql)).replace("%s", "?")
+
+
+class RequestMetrics:
+    """SQL count and time of one request, used as a DB execute wrapper"""
+
+    def __init__(self):
+        self.started = perf_counter()
+        self.queries = 0
+        self.db_time = 0.0
+        self.templates = Counter()
+        self.view_finished = self.view_db_time = self.rendered = None
+
+    def __call__(self, execute, sql, params, many, context):
+        started = perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db_time += perf_counter() - started
+            self.queries += 1
+            self.templates[sql_template(sql)] += 1
+
+    def finish_view(self):
+        self.view_finished = perf_counter()
+        self.view_db_time = self.db_time
+
+    def finish_render(self, response):
+        self.rendered = perf_counter()
+
+    def timings(self):
+        """(db, serializer, render, total) milliseconds.
+
+        Serializer time is the view's time outside SQL, which for the API
+        views is mostly serialization; render is the deferred rendering of
+        DRF responses (async views render inside the view).
+        """
+
+        finished = perf_counter()
+        view_finished = self.view_finished or finished
+        view_db_time = self.db_time if self.view_finished is None else self.view_db_time
+        serializer = view_finished - self.started - view_db_time
+        render = (self.rendered - view_finished) if self.rendered else 0.0
+        return tuple(
+            round(seconds * 1000, 2)
+            for seconds in (self.db_time, serializer, render, finished - self.started)
+        )
+
+    def duplicates(self, threshold):
+        return [
+            (template, count)
+            for template, count in self.templates.most_common()
+            if count >= threshold
+        ]
+
+
+class QueryInstrumentationMiddleware:
+    """Time a sample of requests and count their SQL queries.
+
+    Sampled requests get a ``Server-Timing`` header and a log line with the
+    route, query count, and DB, serializer, render and total milliseconds.
+    SQL templates run INSTRUMENTATION_DUPLICATE_THRESHOLD times or more are
+    logged as likely N+1 patterns. With INSTRUMENTATION_SAMPLE_RATE at 0 the
+    middleware removes itself.
+    """
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.configure()
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+            self.process_template_response = self.aprocess_template_response
+
+    def __call__(self, request):
+        if iscoroutinefunction(self):
+            return self.__acall__(request)
+        if not self.sampled():
+            return self.get_response(request)
+        metrics = request._metrics = RequestMetrics()
+        with ExitStack() as stack:
+            self.install(stack, metrics)
+            response = self.get_response(request)
+        self.report(request, response, metrics)
+        return response
+
+    async def __acall__(self, request):
+        if not self.sampled():
+            return await self.get_response(request)
+        metrics = request._metrics = RequestMetrics()
+        # Queries run in the request's sync_to_async thread, whose
+        # connections are not the event loop thread's
+        stack = ExitStack()
+        await sync_to_async(self.install)(stack, metrics)
+        try:
+            response = await self.get_response(request)
+        finally:
+            await sync_to_async(stack.close)()
+        self.report(request, response, metrics)
+        return response
+
+    def process_template_response(self, request, response):
+        return self.time_render(request, response)
+
+    async def aprocess_template_response(self, request, response):
+        return self.time_render(request, response)
+
+    @staticmethod
+    def time_render(request, response):
+        metrics = getattr(request, "_metrics", None)
+        if metrics is not None:
+            metrics.finish_view()
+            response.add_post_render_callback(metrics.finish_render)
+        return response
+
+    def configure(self):
+        self.sample_rate = settings.INSTRUMENTATION_SAMPLE_RATE
+        if self.sample_rate <= 0:
+            raise MiddlewareNotUsed
+        self.duplicate_threshold = settings.INSTRUMENTATION_DUPLICATE_THRESHOLD
+
+    def sampled(self):
+        return self.sample_rate >= 1 or random.random() < self.sample_rate
+
+    @staticmethod
+    def install(stack, metrics):
+        for connection in connections.all():
+            stack.enter_context(connection.execute_wrapper(metrics))
+
+    def report(self, request, response, metrics):
+        db, serializer, render, total = metrics.timings()
+        match = request.resolver_match
+        route = match.view_name if match else request.path_info
+        duplicates = metrics.duplicates(self.duplicate_threshold)
+
+        timing = ", ".join(
+            (
+                f'db;dur={db};desc="{metrics.queries} queries"',
+                f"serializer;dur={serializer}",
+                f"render;dur={render}",
+                f"total;dur={total}",
+            )
+        )
+        if response.has_header("Server-Timing"):
+            timing = f"{response['Server-Timing']}, {timing}"
+        response["Server-Timing"] = timing
+
+        logger.info(
+            "%s %s %s queries=%d db_ms=%s serializer_ms=%s render_ms=%s total_ms=%s",
+            request.method,
+            route,
+            response.status_code,
+            metrics.queries,
+            db,
+            serializer,
+            render,
+            total,
+            extra={
+                "route": route,
+                "method": request.method,
+                "status": response.status_code,
+                "queries": metrics.queries,
+                "db_ms": db,
+                "serializer_ms": serializer,
+                "render_ms": render,
+                "total_ms": total,
+                "duplicate_queries": len(duplicates),
+            },
+        )
+        for template, count in duplicates:
+            logger.warning(
+                "%s ran the same query %d times (possible N+1): %s",
+                route,
+                count,
+                template,
+                extra={"route": route, "count": count, "sql": template},
+            )
+
+
+class QueryBudgetMiddleware(QueryInstrumentationMiddleware):
+    """Check every request against its view's declared query budget.
+
+    With QUERY_BUDGETS set to "warn" an over-budget request logs the report
+    of its SQL grouped by template, with "raise" it fails with
+    QueryBudgetExceeded; "off" removes the middleware.
+    """
+
+    def configure(self):
+        self.mode = settings.QUERY_BUDGETS
+        if self.mode == "off":
+            raise MiddlewareNotUsed
+
+    def sampled(self):
+        return True
+
+    def report(self, request, response, metrics):
+        from apps.main.budgets import (
+            QueryBudgetExceeded,
+            budget_for,
+            budget_report,
+            budgeted,
+        )
+
+        match = request.resolver_match
+        budget = budget_for(match.func, request.method) if match else None
+        if budget is None:
+            return
+        templates = budgeted(metrics.templates)
+        if sum(templates.values()) <= budget:
+            return
+        report = budget_report(f"{request.method} {match.view_name}", templates, budget)
+        if self.mode == "raise":
+            raise QueryBudgetExceeded(report)
+        logger.error(report)
+
+
+class HashingBusyMiddleware:
+    """Answer HashingBusy raised by views outside DRF, like the admin login,
+    with the 503 the DRF views send rather than a server error"""
+
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if iscoroutinefunction(get_response):
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        return self.get_response(request)
+
+    def process_exception(self, request, exception):
+        if not isinstance(exception, HashingBusy):
+            return None
+        return HttpResponse(
+            str(exception.detail),
+            status=exception.status_code,
+            content_type="text/plain",
+            headers={"Retry-After": str(exception.wait)},
+        )
@@ -3,6 +3,8 @@ from email.policy import default
 from pathlib import Path
 from decouple import config
 
+from .database import databases
+
 BASE_DIR = Path(__file__).resolve().parent.parent
 print(BASE_DIR)
 
@@ -36,6 +38,8 @@ LOCAL_APPS = [
 INSTALLED_APPS = DJANGO_APPS + THIRD_PARTY_APPS + LOCAL_APPS
 
 MIDDLEWARE = [
+    "config.middleware.QueryInstrumentationMiddleware",
+    "config.middleware.QueryBudgetMiddleware",
     "corsheaders.middleware.CorsMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
@@ -44,6 +48,7 @@ MIDDLEWARE = [
     "django.contrib.auth.middleware.AuthenticationMiddleware",
     "django.contrib.messages.middleware.MessageMiddleware",
     "django.middleware.clickjacking.XFrameOptionsMiddleware",
+    "config.middleware.HashingBusyMiddleware",
 ]
 
 ROOT_URLCONF = "config.urls"
@@ -65,14 +70,32 @@ TEMPLATES = [
 
 WSGI_APPLICATION = "config.wsgi.application"
 
-# Database
-DATABASES = {
+# Database: DATABASE_ENGINE selects the SQLite or PostgreSQL profile in
+# config/database.py, tuned through its environment variables
+DATABASES = databases(BASE_DIR)
+
+# Cache
+# LocMemCache is per process; use a shared backend when running several
+# workers, cached request users are only invalidated within one cache
+CACHES = {
     "default": {
-        "ENGINE": "django.db.backends.sqlite3",
-        "NAME": BASE_DIR / "db.sqlite3",
+        "BACKEND": config(
+            "CACHE_BACKEND", default="django.core.cache.backends.locmem.LocMemCache"
+        ),
+        "LOCATION": config("CACHE_LOCATION", default=""),
     }
 }
 
+AUTHENTICATION_BACKENDS = ["apps.accounts.backends.ModelBackend"]
+
+PASSWORD_HASHERS = [
+    "apps.accounts.hashing.PBKDF2PasswordHasher",
+    "django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher",
+    "django.contrib.auth.hashers.Argon2PasswordHasher",
+    "django.contrib.auth.hashers.BCryptSHA256PasswordHasher",
+    "django.contrib.auth.hashers.ScryptPasswordHasher",
+]
+
 # Password validation
 AUTH_PASSWORD_VALIDATORS = [
     {
@@ -106,7 +129,7 @@ MEDIA_ROOT = BASE_DIR / config("MEDIA_ROOT", default="media", cast=Path)
 # REST Framework Configuration
 REST_FRAMEWORK = {
     'DEFAULT_AUTHENTICATION_CLASSES': [
-        'rest_framework_simplejwt.authentication.JWTAuthentication',
+        'apps.accounts.authentication.CachedJWTAuthentication',
     ],
     'DEFAULT_PERMISSION_CLASSES': [
         'rest_framework.permissions.IsAuthenticated',
@@ -128,6 +151,78 @@ REST_FRAMEWORK = {
     ],
 }
 
+# Buffered post views, flushed every N seconds (0 writes on every view)
+VIEW_COUNT_FLUSH_INTERVAL = config("VIEW_COUNT_FLUSH_INTERVAL", default=10, cast=int)
+
+# Cached popular/recent post responses
+POSTS_CACHE_TIMEOUT = config("POSTS_CACHE_TIMEOUT", default=60, cast=int)
+POSTS_CACHE_LOCK_TIMEOUT = config("POSTS_CACHE_LOCK_TIMEOUT", default=5, cast=int)
+
+# Trending posts
+TRENDING_WINDOW_HOURS = config("TRENDING_WINDOW_HOURS", default=72, cast=int)
+TRENDING_HALF_LIFE_HOURS = config("TRENDING_HALF_LIFE_HOURS", default=12, cast=float)
+TRENDING_COMMENT_WEIGHT = config("TRENDING_COMMENT_WEIGHT", default=5, cast=float)
+
+# Personal feeds: categories with more subscribers than this are merged into
+# feeds on read instead of copied into every timeline, and how many recent
+# posts a new subscription copies in
+FEED_FANOUT_LIMIT = config("FEED_FANOUT_LIMIT", default=5000, cast=int)
+FEED_BACKFILL = config("FEED_BACKFILL", default=100, cast=int)
+
+# Image variant workers (0 renders inline) and waiting job limit
+IMAGE_WORKERS = config("IMAGE_WORKERS", default=2, cast=int)
+IMAGE_QUEUE_SIZE = config("IMAGE_QUEUE_SIZE", default=32, cast=int)
+
+# Password hashing threads and how many hashes may wait before new logins
+# are turned away with 503
+HASHING_WORKERS = config("HASHING_WORKERS", default=4, cast=int)
+HASHING_QUEUE_SIZE = config("HASHING_QUEUE_SIZE", default=64, cast=int)
+
+# Serve login, registration and the public read endpoints from async views
+# (config/asgi.py turns this on)
+ASYNC_VIEWS = config("ASYNC_VIEWS", default=False, cast=bool)
+
+# Seconds an authenticated user stays cached between DB lookups
+AUTH_USER_CACHE_TIMEOUT = config("AUTH_USER_CACHE_TIMEOUT", default=60, cast=int)
+
+# Revoked refresh tokens: seconds between picking up revocations from other
+# processes, seconds between full Bloom filter rebuilds (which also prune
+# expired rows), and the filter's initial capacity and false positive rate
+REVOKED_TOKENS_SYNC_INTERVAL = config("REVOKED_TOKENS_SYNC_INTERVAL", default=2, cast=int)
+REVOKED_TOKENS_REBUILD_INTERVAL = config(
+    "REVOKED_TOKENS_REBUILD_INTERVAL", default=3600, cast=int
+)
+REVOKED_TOKENS_CAPACITY = config("REVOKED_TOKENS_CAPACITY", default=100000, cast=int)
+REVOKED_TOKENS_ERROR_RATE = config("REVOKED_TOKENS_ERROR_RATE", default=0.001, cast=float)
+
+# Request instrumentation: share of requests timed with a Server-Timing
+# header and log line (0 removes the middleware), and how many runs of one
+# SQL statement in a request are reported as an N+1 pattern
+INSTRUMENTATION_SAMPLE_RATE = config(
+    "INSTRUMENTATION_SAMPLE_RATE", default=1.0 if DEBUG else 0.0, cast=float
+)
+INSTRUMENTATION_DUPLICATE_THRESHOLD = config(
+    "INSTRUMENTATION_DUPLICATE_THRESHOLD", default=5, cast=int
+)
+# Per-view query budgets checked on every request: "warn" logs a report of
+# over-budget requests, "raise" fails them, "off" removes the check
+QUERY_BUDGETS = config("QUERY_BUDGETS", default="warn" if DEBUG else "off")
+
+LOGGING = {
+    "version": 1,
+    "disable_existing_loggers": False,
+    "handlers": {
+        "console": {"class": "logging.StreamHandler"},
+    },
+    "loggers": {
+        "config.middleware": {
+            "handlers": ["console"],
+            "level": config("INSTRUMENTATION_LOG_LEVEL", default="INFO"),
+            "propagate": False,
+        },
+    },
+}
+
 # CORS Configuration
 CORS_ALLOWED_ORIGINS = [
 
@@ -148,6 +243,7 @@ SIMPLE_JWT = {
     'AUTH_HEADER_NAME': 'HTTP_AUTHORIZATION',
     'USER_ID_FIELD': 'id',
     'USER_ID_CLAIM': 'user_id',
+    'TOKEN_REFRESH_SERIALIZER': 'apps.accounts.serializers.TokenRefreshSerializer',
 }
 
 # Security Settings
@@ -7,6 +7,7 @@ urlpatterns = [
     path("admin/", admin.site.urls),
     path("api/v1/auth/", include("apps.accounts.urls")),
     path('api/v1/posts/', include("apps.main.urls")),
+    path("api/v1/comments/", include("apps.comments.urls")),
 ]
 
 if settings.DEBUG: